@@ -13,10 +13,13 @@ end FIR_HPF_UART;
 
 architecture RTL of FIR_HPF_UART is
   constant CLKS_PER_BIT : integer := 25;
+  constant FRAME_FORMAT : integer := 0;  -- 0 = FRAMING (6 byte/frame), 1 = FRAMING_PACKED
+  constant PACKED_SETS  : integer := 8;  -- Set sampel per frame FRAMING_PACKED
 
   constant SAMPLE_CLOCK_DIV : integer := 2500;
   signal sample_clock_counter : integer range 0 to SAMPLE_CLOCK_DIV-1 := 0;
   signal sample_enable : std_logic := '0';
+  signal sample_enable_d : std_logic := '0';
 
   type state_type is (STATE_0, STATE_1, STATE_2, STATE_3);
   signal state : state_type := STATE_0;
@@ -87,6 +90,23 @@ architecture RTL of FIR_HPF_UART is
     );
   end component;
 
+  component FRAMING_PACKED
+    generic (
+      CHANNELS : integer;
+      SETS     : integer
+    );
+    port (
+      CLOCK     : in  std_logic;
+      RESET     : in  std_logic;
+      DATA      : in  std_logic_vector(CHANNELS*12-1 downto 0);
+      SAMPLE_EN : in  std_logic;
+      TX_DV     : out std_logic;
+      TX_BYTE   : out std_logic_vector(7 downto 0);
+      TX_DONE   : in  std_logic;
+      TX_ACTIVE : in  std_logic
+    );
+  end component;
+
 begin
   -- Debug LEDR output
   LEDR <= adc_ch0_sampled(11 downto 4);
@@ -126,17 +146,39 @@ begin
       EN => sample_enable
     );
 
-  U_FRAMING : FRAMING
-    port map (
-      CLOCK     => CLK_50,
-      RESET     => RESET,
-      DATA0     => adc_ch0,    
-      DATA1     => adc_filtered,
-      TX_DV     => tx_dv,
-      TX_BYTE   => tx_byte,
-      TX_DONE   => tx_done,
-      TX_ACTIVE => tx_active
-    );
+  GEN_FRAMING : if FRAME_FORMAT = 0 generate
+    U_FRAMING : FRAMING
+      port map (
+        CLOCK     => CLK_50,
+        RESET     => RESET,
+        DATA0     => adc_ch0,    
+        DATA1     => adc_filtered,
+        TX_DV     => tx_dv,
+        TX_BYTE   => tx_byte,
+        TX_DONE   => tx_done,
+        TX_ACTIVE => tx_active
+      );
+  end generate;
+
+  -- Packed: ch0 diambil saat sample_enable, output FIR satu clock kemudian
+  -- (setelah sampel yang sama masuk ke signal_buffer)
+  GEN_FRAMING_PACKED : if FRAME_FORMAT = 1 generate
+    U_FRAMING : FRAMING_PACKED
+      generic map (
+        CHANNELS => 2,
+        SETS     => PACKED_SETS
+      )
+      port map (
+        CLOCK     => CLK_50,
+        RESET     => RESET,
+        DATA      => adc_filtered & adc_ch0_sampled,
+        SAMPLE_EN => sample_enable_d,
+        TX_DV     => tx_dv,
+        TX_BYTE   => tx_byte,
+        TX_DONE   => tx_done,
+        TX_ACTIVE => tx_active
+      );
+  end generate;
 
   -- Clock Divider Sampling
   process(CLK_50, RESET)
@@ -145,8 +187,13 @@ begin
       if RESET = '0' then
         sample_clock_counter <= 0;
         sample_enable <= '0';
+        sample_enable_d <= '0';
       else
         sample_enable <= '0';
+        sample_enable_d <= sample_enable;
+        if sample_enable = '1' then
+          adc_ch0_sampled <= adc_ch0;
+        end if;
         if sample_clock_counter = SAMPLE_CLOCK_DIV-1 then
           sample_clock_counter <= 0;
           sample_enable <= '1';
@@ -0,0 +1,195 @@
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+
+-- Frame packed: SETS set sampel (CHANNELS x 12-bit) per frame
+--   A5 5A | SEQ | INFO | payload | CRC
+--   INFO    = (CHANNELS-1) & (SETS-1)
+--   payload = sampel berurutan per set lalu per channel, setiap pasangan (a, b)
+--             menjadi 3 byte: a[11:4], a[3:0] & b[11:8], b[7:0]
+--             (jumlah sampel ganjil: b terakhir = 0)
+--   CRC     = CRC-8 poly 0x07, init 0x00, dari SEQ sampai byte payload terakhir
+-- Sampel diambil saat SAMPLE_EN = '1'. SEQ bertambah untuk setiap frame yang
+-- terkumpul; frame yang selesai saat frame sebelumnya masih dikirim dibuang,
+-- sehingga host menghitung frame hilang dari loncatan SEQ.
+
+entity FRAMING_PACKED is
+    generic (
+        CHANNELS : integer range 1 to 16 := 2;
+        SETS     : integer range 1 to 16 := 8
+    );
+    port (
+        CLOCK     : in  std_logic;
+        RESET     : in  std_logic;
+        DATA      : in  std_logic_vector(CHANNELS*12-1 downto 0); -- channel c = DATA(12*c+11 downto 12*c)
+        SAMPLE_EN : in  std_logic;
+        TX_DV     : out std_logic;
+        TX_BYTE   : out std_logic_vector(7 downto 0);
+        TX_DONE   : in  std_logic;
+        TX_ACTIVE : in  std_logic
+    );
+end entity FRAMING_PACKED;
+
+architecture RTL of FRAMING_PACKED is
+    constant PAIRS       : integer := (CHANNELS * SETS + 1) / 2;
+    constant BANK_SIZE   : integer := 2 * PAIRS;
+    constant FRAME_BYTES : integer := 4 + 3 * PAIRS + 1;
+    constant SYNC0       : std_logic_vector(7 downto 0) := x"A5";
+    constant SYNC1       : std_logic_vector(7 downto 0) := x"5A";
+    constant INFO        : std_logic_vector(7 downto 0) :=
+        std_logic_vector(to_unsigned(CHANNELS - 1, 4)) & std_logic_vector(to_unsigned(SETS - 1, 4));
+
+    type state_type is (IDLE, SEND_BYTE, WAIT_TX_COMPLETE);
+    signal state : state_type := IDLE;
+
+    -- Dua bank: satu diisi sampel, satu dikirim
+    type sample_array is array (0 to 2*BANK_SIZE-1) of std_logic_vector(11 downto 0);
+    signal sample_buf : sample_array := (others => (others => '0'));
+    signal wr_bank    : integer range 0 to 1 := 0;
+    signal rd_bank    : integer range 0 to 1 := 0;
+    signal set_index  : integer range 0 to SETS-1 := 0;
+    signal frame_seq  : unsigned(7 downto 0) := (others => '0');
+    signal ready_seq  : std_logic_vector(7 downto 0) := (others => '0');
+    signal frame_ready : std_logic := '0';   -- '1' sampai frame selesai dikirim
+
+    signal tx_dv_reg    : std_logic := '0';
+    signal byte_to_send : std_logic_vector(7 downto 0);
+    signal byte_index   : integer range 0 to FRAME_BYTES-1 := 0;
+    signal pair_index   : integer range 0 to PAIRS-1 := 0;
+    signal pair_phase   : integer range 0 to 2 := 0;
+    signal crc          : std_logic_vector(7 downto 0) := (others => '0');
+    signal tx_done_prev : std_logic := '0';
+
+    function crc8(crc_in : std_logic_vector(7 downto 0); data : std_logic_vector(7 downto 0))
+        return std_logic_vector is
+        variable c : std_logic_vector(7 downto 0);
+    begin
+        c := crc_in xor data;
+        for i in 0 to 7 loop
+            if c(7) = '1' then
+                c := (c(6 downto 0) & '0') xor x"07";
+            else
+                c := c(6 downto 0) & '0';
+            end if;
+        end loop;
+        return c;
+    end function;
+
+begin
+
+    TX_DV   <= tx_dv_reg;
+    TX_BYTE <= byte_to_send;
+
+    process(CLOCK)
+        variable next_index : integer range 0 to FRAME_BYTES;
+        variable next_byte  : std_logic_vector(7 downto 0);
+        variable sample_a   : std_logic_vector(11 downto 0);
+        variable sample_b   : std_logic_vector(11 downto 0);
+    begin
+        if rising_edge(CLOCK) then
+            if RESET = '0' then
+                state        <= IDLE;
+                tx_dv_reg    <= '0';
+                byte_to_send <= x"00";
+                wr_bank      <= 0;
+                rd_bank      <= 0;
+                set_index    <= 0;
+                frame_seq    <= (others => '0');
+                frame_ready  <= '0';
+                byte_index   <= 0;
+                pair_index   <= 0;
+                pair_phase   <= 0;
+                crc          <= (others => '0');
+                tx_done_prev <= '0';
+            else
+                tx_done_prev <= TX_DONE;
+
+                -- Pengumpulan sampel, berjalan bersamaan dengan pengiriman
+                if SAMPLE_EN = '1' then
+                    for c in 0 to CHANNELS-1 loop
+                        sample_buf(wr_bank*BANK_SIZE + set_index*CHANNELS + c) <= DATA(12*c+11 downto 12*c);
+                    end loop;
+                    if set_index = SETS-1 then
+                        set_index <= 0;
+                        frame_seq <= frame_seq + 1;
+                        if frame_ready = '0' then
+                            ready_seq   <= std_logic_vector(frame_seq);
+                            rd_bank     <= wr_bank;
+                            wr_bank     <= 1 - wr_bank;
+                            frame_ready <= '1';
+                        end if;
+                        -- frame_ready = '1': bank yang sama ditimpa, frame ini hilang
+                    else
+                        set_index <= set_index + 1;
+                    end if;
+                end if;
+
+                case state is
+                    when IDLE =>
+                        if frame_ready = '1' and TX_ACTIVE = '0' then
+                            byte_to_send <= SYNC0;
+                            tx_dv_reg    <= '1';
+                            byte_index   <= 0;
+                            pair_index   <= 0;
+                            pair_phase   <= 0;
+                            crc          <= (others => '0');
+                            state        <= SEND_BYTE;
+                        end if;
+
+                    when SEND_BYTE =>
+                        if TX_ACTIVE = '1' then
+                            tx_dv_reg <= '0';
+                        end if;
+                        if TX_DONE = '1' and tx_done_prev = '0' then
+                            if byte_index = FRAME_BYTES-1 then
+                                state <= WAIT_TX_COMPLETE;   -- CRC terkirim
+                            else
+                                next_index := byte_index + 1;
+                                if next_index = 1 then
+                                    next_byte := SYNC1;
+                                elsif next_index = 2 then
+                                    next_byte := ready_seq;
+                                elsif next_index = 3 then
+                                    next_byte := INFO;
+                                elsif next_index = FRAME_BYTES-1 then
+                                    next_byte := crc;
+                                else
+                                    sample_a := sample_buf(rd_bank*BANK_SIZE + 2*pair_index);
+                                    sample_b := sample_buf(rd_bank*BANK_SIZE + 2*pair_index + 1);
+                                    if pair_phase = 0 then
+                                        next_byte  := sample_a(11 downto 4);
+                                        pair_phase <= 1;
+                                    elsif pair_phase = 1 then
+                                        next_byte  := sample_a(3 downto 0) & sample_b(11 downto 8);
+                                        pair_phase <= 2;
+                                    else
+                                        next_byte  := sample_b(7 downto 0);
+                                        pair_phase <= 0;
+                                        if pair_index < PAIRS-1 then
+                                            pair_index <= pair_index + 1;
+                                        end if;
+                                    end if;
+                                end if;
+                                if next_index >= 2 and next_index < FRAME_BYTES-1 then
+                                    crc <= crc8(crc, next_byte);
+                                end if;
+                                byte_index   <= next_index;
+                                byte_to_send <= next_byte;
+                                tx_dv_reg    <= '1';
+                            end if;
+                        end if;
+
+                    when WAIT_TX_COMPLETE =>
+                        if TX_ACTIVE = '0' then
+                            frame_ready <= '0';
+                            state       <= IDLE;
+                        end if;
+
+                    when others =>
+                        state <= IDLE;
+                end case;
+            end if;
+        end if;
+    end process;
+
+end RTL;
@@ -0,0 +1,410 @@
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+import numpy as np
+
+# --------- Config ---------
+CHUNK_SAMPLES = 65536       # Sampel per chunk (per channel)
+QUEUE_BLOCKS = 4096         # Blok decoder maksimal yang menunggu kompresi
+ROTATE_BYTES = 256 << 20    # File baru setelah ukuran ini (byte)
+ROTATE_SECONDS = 3600       # File baru setelah durasi ini (detik)
+COMPRESS_LEVEL = 1          # Level zlib (1 = paling cepat, 0 = tanpa kompresi)
+FILE_PREFIX = "samples"
+# --------------------------
+
+# Format file arsip (satu file per rotasi, nama <prefix>_<waktu mulai>.fha):
+#   header (64 byte) | chunk* | index | footer (16 byte)
+#   chunk  = CHUNK_HEADER + per channel COLUMN (min, max, panjang) + kolom terkompresi
+#   kolom  = selisih int16 antar sampel berurutan (delta), byte rendah lalu byte
+#            tinggi semua sampel (byte tinggi delta hampir selalu 0x00/0xFF), zlib
+# Waktu dalam nanodetik wall clock (time.time_ns) untuk sampel pertama dan
+# terakhir chunk; sampel di antaranya dianggap berjarak sama. Index di akhir
+# file memuat metadata semua chunk sehingga query hanya membaca chunk yang
+# dibutuhkan; jika file tidak ditutup dengan benar, index dibangun ulang.
+FILE_MAGIC = b"FHARC001"
+CHUNK_MAGIC = b"ACHK"
+FOOTER_MAGIC = b"FHAIX001"
+HEADER = struct.Struct("<8sHHIdq36x")           # magic, channels, level, chunk_samples, rate, start_ns
+CHUNK_HEADER = struct.Struct("<4sIqqq")         # magic, n, first_index, t_first_ns, t_last_ns
+COLUMN = struct.Struct("<hhI")                  # min, max, panjang kolom terkompresi
+FOOTER = struct.Struct("<Q8s")                  # index_offset, magic
+FILE_SUFFIX = ".fha"
+
+
+def index_dtype(channels):
+    return np.dtype([('offset', '<u8'), ('n', '<u4'), ('first_index', '<i8'), ('t_first_ns', '<i8'),
+                     ('t_last_ns', '<i8'), ('min', '<i2', (channels,)), ('max', '<i2', (channels,))])
+
+
+def _encode_column(values, level):
+    delta = np.diff(values, prepend=values[:1] * 0).astype('<i2')   # Wrap int16 dibalik saat decode
+    planes = delta.view(np.uint8).reshape(-1, 2).T
+    return zlib.compress(planes.tobytes(), level)
+
+
+def _decode_column(payload, n):
+    planes = np.frombuffer(zlib.decompress(payload), np.uint8, 2 * n).reshape(2, n)
+    delta = np.ascontiguousarray(planes.T).view('<i2').ravel()
+    return np.cumsum(delta, dtype=np.int16)
+
+
+class ArchiveWriter:
+    """Simpan semua sampel hasil decoder ke file chunk terkompresi dengan rotasi
+
+    `write()` dipanggil reader UART per blok dan hanya memasukkan blok ke
+    queue (tidak pernah blok). Thread writer mengumpulkan blok menjadi
+    chunk CHUNK_SAMPLES sampel, mengompres setiap channel sebagai kolom
+    terpisah, lalu menulis chunk beserta min/max dan timestamp. Jika queue
+    penuh, blok dibuang dan dihitung di `dropped_samples`; index sampel
+    tetap berjalan sehingga celah terlihat dari `first_index` chunk. Jika
+    thread writer mati (mis. disk penuh), exception-nya disimpan di `error`
+    dan blok berikutnya dibuang.
+    """
+
+    def __init__(self, directory, channels=2, rate=0.0, prefix=FILE_PREFIX, chunk_samples=CHUNK_SAMPLES,
+                 rotate_bytes=ROTATE_BYTES, rotate_seconds=ROTATE_SECONDS, level=COMPRESS_LEVEL):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.channels = channels
+        self.rate = rate
+        self.prefix = prefix
+        self.chunk_samples = chunk_samples
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.level = level
+        self.files = []             # Path file yang sudah/sedang ditulis
+        self.dropped_samples = 0
+        self.samples_written = 0
+        self.bytes_written = 0
+        self.error = None           # Exception yang menghentikan thread writer
+        self._index = 0             # Index sampel berikutnya yang diterima write()
+        self._queue = queue.Queue(maxsize=QUEUE_BLOCKS)
+        self._file = None
+        self._thread = threading.Thread(target=self._writer, daemon=True)
+        self._thread.start()
+
+    def write(self, block, t_ns=None):
+        """Antri satu blok (channels, n); t_ns = waktu sampel terakhir (default: sekarang)"""
+        n = block.shape[1]
+        if n == 0:
+            return
+        t_ns = time.time_ns() if t_ns is None else t_ns
+        if self.error is not None:
+            self.dropped_samples += n
+            self._index += n
+            return
+        try:
+            self._queue.put_nowait((self._index, t_ns, np.array(block, dtype=np.int16)))
+        except queue.Full:
+            self.dropped_samples += n
+        self._index += n
+
+    # ---- Thread writer ----
+
+    def _writer(self):
+        """Thread writer: kumpulkan blok menjadi chunk dan tulis, exception disimpan di `error`"""
+        try:
+            self._write_loop()
+        except Exception as e:
+            self.error = e
+            if self._file is not None:
+                # Tanpa footer: index dibangun ulang saat dibaca
+                try:
+                    self._file.close()
+                except OSError:
+                    pass                # Sisa buffer juga gagal ditulis
+                self._file = None
+
+    def _write_loop(self):
+        pending, times = [], []     # Blok yang belum mengisi satu chunk, (index akhir, t_ns) per blok
+        first = None
+        size = 0
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            index, t_ns, block = item
+            if first is not None and index != first + size:
+                # Celah (blok dibuang): tutup chunk yang sedang dikumpulkan
+                self._flush(pending, times, first)
+                pending, times, size = [], [], 0
+            if not pending:
+                first = index
+            pending.append(block)
+            times.append((index + block.shape[1] - 1, t_ns))
+            size += block.shape[1]
+            while size >= self.chunk_samples:
+                data = np.concatenate(pending, axis=1)
+                self._flush([data[:, :self.chunk_samples]], times, first)
+                rest = data[:, self.chunk_samples:]
+                first += self.chunk_samples
+                pending = [rest] if rest.shape[1] else []
+                times = [t for t in times if t[0] >= first]
+                size = rest.shape[1]
+        if pending:
+            self._flush(pending, times, first)
+        self._close_file()
+
+    def _sample_time(self, times, index):
+        """Waktu sampel `index` dari timestamp blok terdekat (jarak sampel 1 / rate)"""
+        last, t_ns = min(times, key=lambda t: abs(t[0] - index))
+        period = 1e9 / self.rate if self.rate else 0.0
+        return int(t_ns - (last - index) * period)
+
+    def _flush(self, blocks, times, first):
+        data = np.concatenate(blocks, axis=1) if len(blocks) > 1 else blocks[0]
+        n = data.shape[1]
+        if n == 0:
+            return
+        t_first = self._sample_time(times, first)
+        t_last = self._sample_time(times, first + n - 1)
+        self._rotate_if_needed(t_first)
+
+        columns = [_encode_column(data[c], self.level) for c in range(self.channels)]
+        lo, hi = data.min(axis=1), data.max(axis=1)
+        offset = self._file.tell()
+        self._file.write(CHUNK_HEADER.pack(CHUNK_MAGIC, n, first, t_first, t_last))
+        for c in range(self.channels):
+            self._file.write(COLUMN.pack(int(lo[c]), int(hi[c]), len(columns[c])))
+        for column in columns:
+            self._file.write(column)
+        self._file_index.append((offset, n, first, t_first, t_last, lo, hi))
+        self.samples_written += n
+        self.bytes_written += self._file.tell() - offset
+
+    def _rotate_if_needed(self, t_ns):
+        if self._file is not None:
+            too_big = self._file.tell() >= self.rotate_bytes
+            too_old = (t_ns - self._file_start) / 1e9 >= self.rotate_seconds
+            if not (too_big or too_old):
+                return
+            self._close_file()
+        stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(t_ns / 1e9))
+        path = os.path.join(self.directory, f"{self.prefix}_{stamp}_{len(self.files):04d}{FILE_SUFFIX}")
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(FILE_MAGIC, self.channels, self.level, self.chunk_samples,
+                                     float(self.rate), t_ns))
+        self._file_start = t_ns
+        self._file_index = []
+        self.files.append(path)
+
+    def _close_file(self):
+        if self._file is None:
+            return
+        index_offset = self._file.tell()
+        self._file.write(np.array(self._file_index, dtype=index_dtype(self.channels)).tobytes())
+        self._file.write(FOOTER.pack(index_offset, FOOTER_MAGIC))
+        self._file.close()
+        self._file = None
+
+    def close(self):
+        """Tunggu queue kosong, tulis chunk terakhir lalu index dan footer"""
+        # put() biasa blok selamanya jika writer sudah mati dengan queue penuh
+        while self._thread.is_alive():
+            try:
+                self._queue.put(None, timeout=0.1)
+                break
+            except queue.Full:
+                pass
+        self._thread.join()
+
+
+class ArchiveFile:
+    """Satu file arsip lewat memory-map; hanya header dan index yang dibaca saat dibuka"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.channels, self.level, self.chunk_samples, self.rate, self.start_ns = \
+            HEADER.unpack_from(self._mm, 0)
+        if magic != FILE_MAGIC:
+            raise ValueError(f"{path} bukan file arsip")
+        self.dtype = index_dtype(self.channels)
+        self.index = self._read_index()
+
+    def _read_index(self):
+        size = len(self._mm)
+        if size >= HEADER.size + FOOTER.size:
+            index_offset, magic = FOOTER.unpack_from(self._mm, size - FOOTER.size)
+            if magic == FOOTER_MAGIC:
+                count = (size - FOOTER.size - index_offset) // self.dtype.itemsize
+                return np.frombuffer(self._mm, self.dtype, count, index_offset)
+
+        # File masih ditulis atau tidak ditutup dengan benar: telusuri header chunk
+        entries = []
+        offset = HEADER.size
+        while offset + CHUNK_HEADER.size + self.channels * COLUMN.size <= size:
+            magic, n, first, t_first, t_last = CHUNK_HEADER.unpack_from(self._mm, offset)
+            if magic != CHUNK_MAGIC:
+                break
+            columns = [COLUMN.unpack_from(self._mm, offset + CHUNK_HEADER.size + c * COLUMN.size)
+                       for c in range(self.channels)]
+            end = offset + CHUNK_HEADER.size + self.channels * COLUMN.size + sum(c[2] for c in columns)
+            if end > size:
+                break
+            entries.append((offset, n, first, t_first, t_last,
+                            [c[0] for c in columns], [c[1] for c in columns]))
+            offset = end
+        return np.array(entries, dtype=self.dtype)
+
+    def read_chunk(self, i, channels=None):
+        """Dekompresi chunk ke-i, return int16 (len(channels), n); hanya kolom yang diminta"""
+        channels = range(self.channels) if channels is None else channels
+        offset, n = int(self.index['offset'][i]), int(self.index['n'][i])
+        pos = offset + CHUNK_HEADER.size
+        lengths = [COLUMN.unpack_from(self._mm, pos + c * COLUMN.size)[2] for c in range(self.channels)]
+        starts = np.concatenate(([0], np.cumsum(lengths))) + pos + self.channels * COLUMN.size
+        return np.vstack([_decode_column(self._mm[starts[c]:starts[c] + lengths[c]], n) for c in channels])
+
+    def close(self):
+        self.index = None
+        try:
+            self._mm.close()
+        except BufferError:
+            pass    # Masih ada view index yang dipakai, mmap dilepas saat view dihapus
+        self._file.close()
+
+
+class ArchiveReader:
+    """Query arsip (semua file di direktori) berdasarkan waktu atau index sampel
+
+    Seleksi chunk memakai index file saja; hanya chunk yang beririsan dengan
+    range yang didekompresi. `overview` memakai min/max metadata tanpa
+    membaca data sama sekali.
+    """
+
+    def __init__(self, directory, prefix=FILE_PREFIX):
+        names = sorted(f for f in os.listdir(directory) if f.startswith(prefix) and f.endswith(FILE_SUFFIX))
+        self.files = [ArchiveFile(os.path.join(directory, name)) for name in names]
+        self.chunks_read = 0        # Chunk yang didekompresi oleh query terakhir
+
+    @property
+    def channels(self):
+        return self.files[0].channels if self.files else 0
+
+    def _select(self, by, lo, hi):
+        """(file, nomor chunk) yang beririsan dengan [lo, hi]; by = 'time' atau 'index'"""
+        for file in self.files:
+            index = file.index
+            if by == 'time':
+                first, last = index['t_first_ns'], index['t_last_ns']
+            else:
+                first = index['first_index']
+                last = first + index['n'].astype(np.int64) - 1
+            for i in np.flatnonzero((last >= lo) & (first <= hi)).tolist():
+                yield file, i
+
+    def query(self, t_start_ns, t_end_ns, channels=None):
+        """Sampel dengan waktu dalam [t_start_ns, t_end_ns]
+
+        Return (data int16 (channels, n), index sampel (n,), waktu ns (n,)).
+        """
+        parts, indices, times = [], [], []
+        self.chunks_read = 0
+        for file, i in self._select('time', t_start_ns, t_end_ns):
+            entry = file.index[i]
+            n = int(entry['n'])
+            t = np.linspace(entry['t_first_ns'], entry['t_last_ns'], n) if n > 1 else \
+                np.array([entry['t_first_ns']], dtype=np.float64)
+            keep = (t >= t_start_ns) & (t <= t_end_ns)
+            data = file.read_chunk(i, channels)
+            self.chunks_read += 1
+            parts.append(data[:, keep])
+            indices.append(np.arange(entry['first_index'], entry['first_index'] + n)[keep])
+            times.append(t[keep].astype(np.int64))
+        return self._join(parts, indices, times, channels)
+
+    def query_index(self, start, stop, channels=None):
+        """Sampel dengan index [start, stop), return (data, index sampel, waktu ns)"""
+        parts, indices, times = [], [], []
+        self.chunks_read = 0
+        for file, i in self._select('index', start, stop - 1):
+            entry = file.index[i]
+            n = int(entry['n'])
+            first = int(entry['first_index'])
+            a, b = max(start - first, 0), min(stop - first, n)
+            data = file.read_chunk(i, channels)
+            self.chunks_read += 1
+            t = np.linspace(entry['t_first_ns'], entry['t_last_ns'], n) if n > 1 else \
+                np.array([entry['t_first_ns']], dtype=np.float64)
+            parts.append(data[:, a:b])
+            indices.append(np.arange(first + a, first + b))
+            times.append(t[a:b].astype(np.int64))
+        return self._join(parts, indices, times, channels)
+
+    def _join(self, parts, indices, times, channels):
+        count = self.channels if channels is None else len(channels)
+        if not parts:
+            return np.empty((count, 0), np.int16), np.empty(0, np.int64), np.empty(0, np.int64)
+        return np.concatenate(parts, axis=1), np.concatenate(indices), np.concatenate(times)
+
+    def overview(self, t_start_ns=None, t_end_ns=None):
+        """Metadata chunk (t_first_ns, t_last_ns, first_index, n, min, max) tanpa dekompresi"""
+        lo = -(1 << 63) if t_start_ns is None else t_start_ns
+        hi = (1 << 63) - 1 if t_end_ns is None else t_end_ns
+        rows = [file.index[i] for file, i in self._select('time', lo, hi)]
+        return np.array(rows, dtype=self.files[0].dtype) if rows else None
+
+    def close(self):
+        for file in self.files:
+            file.close()
+
+
+if __name__ == "__main__":
+    import shutil
+    import sys
+    import tempfile
+
+    if len(sys.argv) > 1:
+        # Ringkasan arsip di direktori
+        reader = ArchiveReader(sys.argv[1])
+        for file in reader.files:
+            index = file.index
+            span = (index['t_last_ns'][-1] - index['t_first_ns'][0]) / 1e9 if len(index) else 0.0
+            samples = int(index['n'].sum())
+            print(f"{os.path.basename(file.path)}: {len(index)} chunk, {samples} sampel, {span:.1f} s, "
+                  f"{os.path.getsize(file.path) / max(samples * 2 * file.channels, 1) * 100:.1f}% ukuran mentah")
+        reader.close()
+        sys.exit(0)
+
+    # Round trip dengan rotasi dan query range waktu
+    rate = 20000
+    rng = np.random.default_rng(0)
+    t = np.arange(rate * 30)
+    ch0 = np.clip(2048 + 1800 * np.sin(2 * np.pi * 1000 * t / rate) + rng.normal(0, 8, len(t)), 0, 4095)
+    data = np.vstack((ch0, 4095 - ch0)).astype(np.int16)
+    directory = tempfile.mkdtemp()
+    writer = ArchiveWriter(directory, channels=2, rate=rate, rotate_bytes=1 << 20)
+    t0_ns = 1_700_000_000 * 10 ** 9
+    block = 333
+    durations = []
+    start = time.perf_counter()
+    for i in range(0, data.shape[1], block):
+        part = data[:, i:i + block]
+        t_last = t0_ns + (i + part.shape[1] - 1) * 10 ** 9 // rate
+        w0 = time.perf_counter()
+        writer.write(part, t_last)
+        durations.append(time.perf_counter() - w0)
+    writer.close()
+    elapsed = time.perf_counter() - start
+    size = sum(os.path.getsize(f) for f in writer.files)
+    print(f"{data.shape[1]} sampel x 2 channel dalam {elapsed * 1000:.0f} ms, write() p99 "
+          f"{np.percentile(durations, 99) * 1e6:.0f} us (terlama {max(durations) * 1e6:.0f} us, GIL), "
+          f"{len(writer.files)} file, {size / data.nbytes * 100:.1f}% ukuran mentah, dibuang {writer.dropped_samples}")
+
+    # Range 2 detik di tengah rekaman: hanya chunk yang beririsan yang dibaca
+    # (kebenaran round trip dan query diuji di tests/test_archive.py)
+    reader = ArchiveReader(directory)
+    a, b = t0_ns + 12 * 10 ** 9, t0_ns + 14 * 10 ** 9
+    t1 = time.perf_counter()
+    out, index, times = reader.query(a, b, channels=[1])
+    total = sum(len(f.index) for f in reader.files)
+    print(f"Query 2 s: {reader.chunks_read} dari {total} chunk didekompresi, {out.shape[1]} sampel "
+          f"dalam {(time.perf_counter() - t1) * 1000:.1f} ms")
+    reader.close()
+    shutil.rmtree(directory)
@@ -0,0 +1,347 @@
+import os
+
+# Headless: tanpa display, harus di-set sebelum matplotlib/pygame di-import
+os.environ.setdefault("MPLBACKEND", "Agg")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import numpy as np
+from frame_decoder import FramingDecoder, PairDecoder, encode_frames, encode_pairs
+from ring_buffer import RingBuffer
+from trigger import Trigger
+
+# --------- Config ---------
+SAMPLE_RATE = 20000         # Hz, dari SAMPLE_CLOCK_DIV = 2500
+SAMPLE_SIZES = (250, 1000, 4000)
+WAVE_COUNTS = (1, 5)
+REPEAT = 50
+RESULT_FILE = "benchmark_results.json"
+REGRESSION_THRESHOLD = 1.25 # Laporkan jika lebih lambat 25% dari hasil pembanding
+STARTUP_MODULES = ("scope", "dual_plotter", "optimized_plotter", "dynamic_wave_plotter")
+STARTUP_REPEAT = 5
+# --------------------------
+
+
+def measure(fn, repeat=REPEAT):
+    """Jalankan fn berulang, return statistik waktu dalam mikrodetik"""
+    fn()    # warm-up
+    times = np.empty(repeat)
+    for i in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times[i] = time.perf_counter() - t0
+    times *= 1e6
+    return {"median_us": float(np.median(times)), "p95_us": float(np.percentile(times, 95)),
+            "min_us": float(times.min())}
+
+
+def test_signal(n, channels=1, periods_per_1000=2.5, seed=0):
+    """Sinyal uji 12-bit (channels, n) dengan noise ADC"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n)
+    rows = [2048 + 1500 * np.sin(2 * np.pi * periods_per_1000 * (c + 1) * t / 1000)
+            + rng.normal(0, 6, n) for c in range(channels)]
+    return np.clip(np.array(rows), 0, 4095).astype(np.int16)
+
+
+def legacy_two_byte_decode(stream):
+    """Salinan loop per byte optimized_plotter.uart_reader sebelum PairDecoder"""
+    out = []
+    expecting_high = True
+    high_byte = 0
+    for byte_val in stream:
+        if expecting_high:
+            high_byte = byte_val
+            expecting_high = False
+        else:
+            out.append((high_byte << 4) | (byte_val >> 4))
+            expecting_high = True
+    return out
+
+
+def bench_decode(results):
+    """Frame/s untuk decoder setiap plotter"""
+    n = SAMPLE_RATE     # 1 detik data
+    data = test_signal(n, 2)
+    framed = encode_frames(data[0], data[1])
+    two_byte = encode_pairs(data[0])
+
+    def framing():
+        decoder = FramingDecoder()
+        for i in range(0, len(framed), 4096):
+            decoder.feed(framed[i:i + 4096])
+
+    stats = measure(framing, 10)
+    results.append({"plotter": "dual", "stage": "decode", "channels": 2,
+                    "frames_per_s": n / (stats["median_us"] / 1e6), **stats})
+
+    def pairs():
+        decoder = PairDecoder()
+        for i in range(0, len(two_byte), 4096):
+            decoder.feed(two_byte[i:i + 4096])
+
+    stats = measure(pairs, 10)
+    results.append({"plotter": "optimized", "stage": "decode", "channels": 1,
+                    "frames_per_s": n / (stats["median_us"] / 1e6), **stats})
+
+    # Pembanding: loop per byte sebelum PairDecoder
+    stats = measure(lambda: legacy_two_byte_decode(two_byte), 3)
+    results.append({"plotter": "optimized", "stage": "decode_per_byte", "channels": 1,
+                    "frames_per_s": n / (stats["median_us"] / 1e6), **stats})
+
+
+def bench_trigger(results, plotter, samples, channels):
+    """Latency pencarian trigger pada ring buffer 3 x SAMPLES_TO_SHOW"""
+    ring = RingBuffer(samples * 3, channels)
+    ring.append(test_signal(samples * 3, channels))
+    trigger = Trigger(2048, hysteresis=16)
+
+    def run():
+        window, start = ring.latest(len(ring))
+        trigger.locate(window[0], samples, start)
+
+    results.append({"plotter": plotter, "stage": "trigger", "samples": samples,
+                    "channels": channels, **measure(run)})
+
+
+def bench_render_matplotlib(results, plotter, samples, channels):
+    """Waktu set_data + blit satu frame animasi (seperti FuncAnimation blit=True)"""
+    try:
+        import matplotlib.pyplot as plt
+    except ImportError:
+        results.append({"plotter": plotter, "stage": "render", "skipped": "matplotlib tidak tersedia"})
+        return
+
+    fig, ax = plt.subplots(figsize=(14, 8) if channels > 1 else (12, 6))
+    colors = ['b-', 'r-']
+    lines = [ax.plot([], [], colors[c % 2], linewidth=1.5, animated=True)[0] for c in range(channels)]
+    ax.axhline(y=2048, color='g', linestyle='--', alpha=0.7)
+    ax.set_xlim(0, samples)
+    ax.set_ylim(0, 4096)
+    ax.grid(True, alpha=0.3)
+    fig.canvas.draw()
+    background = fig.canvas.copy_from_bbox(ax.bbox)
+
+    data = test_signal(samples, channels)
+    x_data = np.arange(samples)
+
+    def run():
+        fig.canvas.restore_region(background)
+        for c, line in enumerate(lines):
+            line.set_data(x_data, data[c])
+            ax.draw_artist(line)
+        fig.canvas.blit(ax.bbox)
+
+    results.append({"plotter": plotter, "stage": "render", "samples": samples,
+                    "channels": channels, **measure(run)})
+    return run
+
+
+def bench_render_pygame(results, samples, waves):
+    """Waktu satu frame dynamic_wave_plotter (background, draw_plot semua gelombang + flip)"""
+    try:
+        import dynamic_wave_plotter as dwp
+        pygame = dwp.load_pygame()
+    except ImportError as e:
+        results.append({"plotter": "dynamic", "stage": "render", "skipped": str(e)})
+        return
+
+    pygame.init()
+    screen = pygame.display.set_mode((dwp.WINDOW_WIDTH, dwp.WINDOW_HEIGHT))
+    data = test_signal(samples, waves)
+
+    def run():
+        dwp.draw_background(screen)
+        for i in range(waves):
+            y_pos = 50 + i * (dwp.PLOT_HEIGHT + 10)
+            dwp.draw_plot(screen, data[i], y_pos, dwp.COLORS[i % len(dwp.COLORS)], f"Wave {i+1}", 1.0)
+        dwp.draw_info(screen)
+        pygame.display.flip()
+
+    results.append({"plotter": "dynamic", "stage": "render", "samples": samples,
+                    "channels": waves, **measure(run, 20)})
+    return run
+
+
+def bench_render_phosphor(results, samples, waves):
+    """Waktu satu frame digital phosphor dynamic_wave_plotter (decay, 20 segmen per gelombang, render)"""
+    try:
+        import dynamic_wave_plotter as dwp
+        pygame = dwp.load_pygame()
+        from phosphor import PhosphorDisplay
+    except ImportError as e:
+        results.append({"plotter": "phosphor", "stage": "render", "skipped": str(e)})
+        return
+
+    pygame.init()
+    screen = pygame.display.set_mode((dwp.WINDOW_WIDTH, dwp.WINDOW_HEIGHT))
+    plot_width = dwp.WINDOW_WIDTH - 2 * dwp.PLOT_MARGIN
+    displays = [PhosphorDisplay(plot_width, dwp.PLOT_HEIGHT, dwp.COLORS[i % len(dwp.COLORS)])
+                for i in range(waves)]
+    segments = test_signal(samples * 20, waves).reshape(waves, 20, samples)
+
+    def run():
+        dwp.draw_background(screen)
+        for i, display in enumerate(displays):
+            display.decay()
+            display.add(segments[i])
+            display.render(screen, (dwp.PLOT_MARGIN, 50 + i * (dwp.PLOT_HEIGHT + 10)))
+        pygame.display.flip()
+
+    results.append({"plotter": "phosphor", "stage": "render", "samples": samples,
+                    "channels": waves, **measure(run, 20)})
+
+
+def bench_end_to_end(results, plotter, samples, channels, render):
+    """Latency sampel-ke-pixel: decode + trigger + render, ditambah umur sampel
+    terbaru yang tampil (trigger newest) terhadap sampel terbaru yang diterima"""
+    ring = RingBuffer(samples * 3, channels)
+    trigger = Trigger(2048, hysteresis=16)
+    block = SAMPLE_RATE // 20   # Data yang datang di antara dua update (50 ms)
+    signal = test_signal(block * 40, 2)
+    if plotter == "optimized":
+        # optimized_plotter menerima stream dua byte tanpa frame
+        decoder = PairDecoder()
+        stream = encode_pairs(signal[0])
+        frame_bytes = block * 2
+    else:
+        decoder = FramingDecoder()
+        stream = encode_frames(signal[0], signal[1])
+        frame_bytes = block * 6
+
+    latencies = []
+    for i in range(40):
+        t0 = time.perf_counter()
+        decoded = decoder.feed(stream[i * frame_bytes:(i + 1) * frame_bytes])
+        if plotter == "optimized":
+            rows = decoded[np.newaxis]
+        else:
+            data0, data1 = decoded
+            rows = np.vstack([data0, data1][:channels] + [data0] * max(0, channels - 2))
+        ring.append(rows)
+        if len(ring) < samples:
+            continue
+        window, start = ring.latest(len(ring))
+        tp = trigger.locate(window[0], samples, start)
+        if render is not None:
+            render()
+        elapsed = time.perf_counter() - t0
+        if tp is not None:
+            age = (ring.total - (start + tp + samples)) / SAMPLE_RATE
+            latencies.append(elapsed + age)
+
+    if latencies:
+        lat = np.array(latencies) * 1000
+        results.append({"plotter": plotter, "stage": "end_to_end", "samples": samples,
+                        "channels": channels, "median_ms": float(np.median(lat)),
+                        "p95_ms": float(np.percentile(lat, 95))})
+
+
+def bench_startup(results):
+    """Waktu start proses Python yang meng-import modul (import tidak boleh membuka port atau window)"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    for module in STARTUP_MODULES:
+        command = [sys.executable, "-c", f"import {module}"]
+
+        def run():
+            subprocess.run(command, cwd=here, check=True)
+
+        results.append({"plotter": module, "stage": "startup", **measure(run, STARTUP_REPEAT)})
+
+
+def close_figures():
+    if "matplotlib.pyplot" in sys.modules:
+        sys.modules["matplotlib.pyplot"].close("all")
+
+
+def run_all():
+    results = []
+    bench_startup(results)
+    bench_decode(results)
+    for samples in SAMPLE_SIZES:
+        for plotter, channels in (("optimized", 1), ("dual", 2)):
+            bench_trigger(results, plotter, samples, channels)
+            render = bench_render_matplotlib(results, plotter, samples, channels)
+            bench_end_to_end(results, plotter, samples, channels, render)
+            close_figures()
+        for waves in WAVE_COUNTS:
+            bench_trigger(results, "dynamic", samples, waves)
+            render = bench_render_pygame(results, samples, waves)
+            bench_render_phosphor(results, samples, waves)
+            bench_end_to_end(results, "dynamic", samples, waves, render)
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def result_key(r):
+    return (r["plotter"], r["stage"], r.get("samples"), r.get("channels"))
+
+
+def compare(results, baseline_path):
+    """Bandingkan dengan file hasil sebelumnya, return daftar regresi"""
+    with open(baseline_path) as f:
+        baseline = {result_key(r): r for r in json.load(f)["results"]}
+    regressions = []
+    for r in results:
+        old = baseline.get(result_key(r))
+        if old is None:
+            continue
+        for metric in ("median_us", "median_ms"):
+            if metric in r and metric in old and r[metric] > old[metric] * REGRESSION_THRESHOLD:
+                regressions.append(f"{'/'.join(str(k) for k in result_key(r))}: "
+                                   f"{old[metric]:.1f} -> {r[metric]:.1f} {metric}")
+    return regressions
+
+
+def main(output=RESULT_FILE, baseline=None):
+    """Jalankan semua benchmark, simpan ke `output`; return 1 jika ada regresi terhadap `baseline`"""
+    results = run_all()
+    for r in results:
+        name = "/".join(str(k) for k in result_key(r) if k is not None)
+        if "skipped" in r:
+            print(f"{name:<32} dilewati: {r['skipped']}")
+        elif "median_ms" in r:
+            print(f"{name:<32} {r['median_ms']:10.2f} ms  (p95 {r['p95_ms']:.2f})")
+        else:
+            extra = f"  {r['frames_per_s']:,.0f} frame/s" if "frames_per_s" in r else ""
+            print(f"{name:<32} {r['median_us']:10.1f} us  (p95 {r['p95_us']:.1f}){extra}")
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Hasil disimpan di {output}")
+
+    if baseline:
+        regressions = compare(results, baseline)
+        for line in regressions:
+            print(f"REGRESI {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark headless decode, trigger dan render")
+    parser.add_argument("-o", "--output", default=RESULT_FILE)
+    parser.add_argument("--compare", help="File hasil sebelumnya untuk deteksi regresi")
+    args = parser.parse_args()
+    raise SystemExit(main(args.output, args.compare))
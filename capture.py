@@ -0,0 +1,330 @@
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+import numpy as np
+
+# --------- Config ---------
+QUEUE_CHUNKS = 1024         # Maksimal chunk yang menunggu ditulis ke disk
+# --------------------------
+
+# Format file capture:
+#   header (64 byte) | chunk* | index | footer (16 byte)
+#   chunk  = CHUNK_HEADER (24 byte) + payload
+#   index  = satu entri (offset, n_items, t_ns, first_item) per chunk
+# Jika file tidak ditutup dengan benar (tidak ada footer), index dibangun
+# ulang dengan menelusuri header chunk.
+FILE_MAGIC = b"FHCAP001"
+CHUNK_MAGIC = b"CHNK"
+FOOTER_MAGIC = b"FHIDX001"
+HEADER = struct.Struct("<8sHHHHdq32x")          # magic, kind, channels, itemsize, reserved, rate, start_ns
+CHUNK_HEADER = struct.Struct("<4sIQQ")          # magic, payload_len, n_items, t_ns
+INDEX_DTYPE = np.dtype([('offset', '<u8'), ('n_items', '<u8'), ('t_ns', '<u8'), ('first_item', '<u8')])
+FOOTER = struct.Struct("<Q8s")                  # index_offset, magic
+
+KIND_RAW = 0                # Byte stream UART mentah
+KIND_CHANNELS = 1           # Array sampel int16 (channels, n) hasil decoder
+
+
+class CaptureWriter:
+    """Rekam byte UART atau array channel ke file capture
+
+    `write()` hanya memasukkan data ke queue (tidak pernah blok); thread
+    writer di belakang yang melakukan I/O disk. Jika queue penuh, chunk
+    dibuang dan dihitung di `dropped_chunks`. Jika thread writer mati
+    (mis. disk penuh), exception-nya disimpan di `error` dan chunk
+    berikutnya dibuang; file tetap bisa dibaca tanpa footer.
+    """
+
+    def __init__(self, path, kind=KIND_RAW, channels=1, rate=0.0):
+        self.path = path
+        self.kind = kind
+        self.channels = channels if kind == KIND_CHANNELS else 1
+        self.itemsize = 2 if kind == KIND_CHANNELS else 1
+        self.dropped_chunks = 0
+        self.error = None           # Exception yang menghentikan thread writer
+        self._queue = queue.Queue(maxsize=QUEUE_CHUNKS)
+        self._index = []
+        self._items = 0
+        self._start = time.monotonic_ns()
+
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(FILE_MAGIC, kind, self.channels, self.itemsize, 0,
+                                     float(rate), time.time_ns()))
+        self._thread = threading.Thread(target=self._writer, daemon=True)
+        self._thread.start()
+
+    def write(self, data):
+        """Antri satu chunk (bytes untuk KIND_RAW, array (channels, n) untuk KIND_CHANNELS)"""
+        t_ns = time.monotonic_ns() - self._start
+        if self.kind == KIND_CHANNELS:
+            data = np.ascontiguousarray(data, dtype='<i2').reshape(self.channels, -1)
+        if self.error is not None:
+            self.dropped_chunks += 1
+            return
+        try:
+            self._queue.put_nowait((t_ns, data))
+        except queue.Full:
+            self.dropped_chunks += 1
+
+    def _writer(self):
+        """Thread writer: tulis chunk dari queue ke disk, exception disimpan di `error`"""
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                t_ns, data = item
+                if self.kind == KIND_CHANNELS:
+                    payload = data.tobytes()
+                    n_items = data.shape[1]
+                else:
+                    payload = bytes(data)
+                    n_items = len(payload)
+                if n_items == 0:
+                    continue
+
+                offset = self._file.tell()
+                self._file.write(CHUNK_HEADER.pack(CHUNK_MAGIC, len(payload), n_items, t_ns))
+                self._file.write(payload)
+                self._index.append((offset, n_items, t_ns, self._items))
+                self._items += n_items
+        except Exception as e:
+            self.error = e
+
+    def close(self):
+        """Tunggu queue kosong lalu tulis index dan footer (tanpa footer jika writer gagal)"""
+        # put() biasa blok selamanya jika writer sudah mati dengan queue penuh
+        while self._thread.is_alive():
+            try:
+                self._queue.put(None, timeout=0.1)
+                break
+            except queue.Full:
+                pass
+        self._thread.join()
+        try:
+            if self.error is None:
+                index_offset = self._file.tell()
+                self._file.write(np.array(self._index, dtype=INDEX_DTYPE).tobytes())
+                self._file.write(FOOTER.pack(index_offset, FOOTER_MAGIC))
+        finally:
+            self._file.close()
+
+
+class CaptureFile:
+    """Baca file capture lewat memory-map (tanpa membaca seluruh file)"""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.kind, self.channels, self.itemsize, _, self.rate, self.start_ns = \
+            HEADER.unpack_from(self._mm, 0)
+        if magic != FILE_MAGIC:
+            raise ValueError(f"{path} bukan file capture")
+        self.index = self._read_index()
+
+    def _read_index(self):
+        size = len(self._mm)
+        if size >= HEADER.size + FOOTER.size:
+            index_offset, magic = FOOTER.unpack_from(self._mm, size - FOOTER.size)
+            if magic == FOOTER_MAGIC:
+                count = (size - FOOTER.size - index_offset) // INDEX_DTYPE.itemsize
+                return np.frombuffer(self._mm, INDEX_DTYPE, count, index_offset)
+
+        # File tidak ditutup dengan benar: bangun index dari header chunk
+        entries = []
+        offset = HEADER.size
+        items = 0
+        while offset + CHUNK_HEADER.size <= size:
+            magic, length, n_items, t_ns = CHUNK_HEADER.unpack_from(self._mm, offset)
+            if magic != CHUNK_MAGIC or offset + CHUNK_HEADER.size + length > size:
+                break
+            entries.append((offset, n_items, t_ns, items))
+            items += n_items
+            offset += CHUNK_HEADER.size + length
+        return np.array(entries, dtype=INDEX_DTYPE)
+
+    @property
+    def total_items(self):
+        if len(self.index) == 0:
+            return 0
+        return int(self.index['first_item'][-1] + self.index['n_items'][-1])
+
+    @property
+    def duration(self):
+        """Durasi rekaman (detik) berdasarkan timestamp chunk"""
+        return float(self.index['t_ns'][-1]) / 1e9 if len(self.index) else 0.0
+
+    def chunk(self, i):
+        """View (tanpa copy) payload chunk ke-i"""
+        offset, n_items, _, _ = self.index[i]
+        start = int(offset) + CHUNK_HEADER.size
+        if self.kind == KIND_CHANNELS:
+            data = np.frombuffer(self._mm, '<i2', self.channels * int(n_items), start)
+            return data.reshape(self.channels, -1)
+        return np.frombuffer(self._mm, np.uint8, int(n_items), start)
+
+    def chunks(self):
+        """Iterasi (t_ns, data) untuk semua chunk"""
+        for i in range(len(self.index)):
+            yield int(self.index['t_ns'][i]), self.chunk(i)
+
+    def close(self):
+        self.index = None
+        try:
+            self._mm.close()
+        except BufferError:
+            pass    # Masih ada view chunk yang dipakai, mmap dilepas saat view dihapus
+        self._file.close()
+
+
+class ReplaySerial:
+    """Pengganti serial.Serial yang memutar ulang file capture
+
+    speed = 1.0 -> real-time, N -> N kali lebih cepat, 0 -> secepat mungkin.
+    Data tersedia sesuai timestamp chunk, sehingga decoder, trigger dan
+    render berjalan dengan pola data yang sama seperti saat rekaman.
+    Capture KIND_CHANNELS (`blocks` = True) dibaca per sampel: `read()`
+    mengembalikan array (channels, n) yang langsung masuk ring buffer.
+    """
+
+    def __init__(self, path, speed=1.0, loop=False, timeout=0.1):
+        self.capture = CaptureFile(path)
+        self.blocks = self.capture.kind == KIND_CHANNELS
+        self.speed = speed
+        self.loop = loop
+        self.timeout = timeout
+        self._chunk = 0
+        self._pos = 0
+        self._t0 = time.monotonic()
+        self.is_open = True
+
+    def _ready_chunks(self):
+        """Jumlah chunk yang timestamp-nya sudah lewat"""
+        index = self.capture.index
+        if self.speed <= 0:
+            return len(index)
+        elapsed_ns = (time.monotonic() - self._t0) * self.speed * 1e9
+        return int(np.searchsorted(index['t_ns'], elapsed_ns, side='right'))
+
+    def _rewind_if_done(self):
+        if self.loop and self._chunk >= len(self.capture.index):
+            self._chunk = 0
+            self._pos = 0
+            self._t0 = time.monotonic()
+
+    @property
+    def in_waiting(self):
+        self._rewind_if_done()
+        ready = self._ready_chunks()
+        if ready <= self._chunk:
+            return 0
+        index = self.capture.index
+        end = index['first_item'][ready - 1] + index['n_items'][ready - 1]
+        return int(end - index['first_item'][self._chunk]) - self._pos
+
+    def read(self, size=1):
+        """Baca maksimal `size` byte (sampel untuk KIND_CHANNELS), tunggu sampai `timeout` jika belum ada data"""
+        deadline = time.monotonic() + self.timeout
+        out = []
+        while self.in_waiting == 0:
+            if self._chunk >= len(self.capture.index) or time.monotonic() >= deadline:
+                size = 0
+                break
+            time.sleep(0.001)
+
+        ready = self._ready_chunks()
+        while size > 0 and self._chunk < ready:
+            data = self.capture.chunk(self._chunk)
+            part = data[..., self._pos:self._pos + size]
+            out.append(part)
+            size -= part.shape[-1]
+            self._pos += part.shape[-1]
+            if self._pos >= data.shape[-1]:
+                self._chunk += 1
+                self._pos = 0
+        if self.blocks:
+            return np.concatenate(out, axis=1) if out else np.empty((self.capture.channels, 0), np.int16)
+        return b"".join(part.tobytes() for part in out)
+
+    def close(self):
+        self.is_open = False
+        self.capture.close()
+
+
+def read_samples(ser, decoder, recorder=None, size=None):
+    """Satu read dari sumber: return (byte, waiting, sampel), sampel None jika tidak ada data
+
+    Tanpa `size` dibaca semua yang tersedia. Byte UART direkam (jika ada
+    recorder) lalu di-decode; replay capture KIND_CHANNELS sudah berisi
+    sampel, bloknya dipakai tanpa decoder.
+    """
+    waiting = ser.in_waiting
+    chunk = ser.read(size or max(1, waiting))
+    if getattr(ser, 'blocks', False):
+        return 0, waiting, chunk if chunk.shape[1] else None
+    if not chunk:
+        return 0, waiting, None
+    if recorder is not None:
+        recorder.write(chunk)
+    return len(chunk), waiting, decoder.feed(chunk)
+
+
+def open_source(port, baud, replay=None, replay_speed=1.0, emulate=False, speed=1.0, frame_format='framing'):
+    """Buka port serial, file capture, atau emulator FPGA lewat pty; return (ser, cleanup)"""
+    if replay:
+        ser = ReplaySerial(replay, speed=replay_speed, loop=True)
+        return ser, ser.close
+    import serial
+    if emulate:
+        from fpga_emulator import FpgaEmulator, open_pty
+        master, slave, name = open_pty()
+        emulator = FpgaEmulator(speed=speed, frame_format=frame_format)
+        stop = threading.Event()
+        threading.Thread(target=emulator.run, args=(master, None, stop), daemon=True).start()
+        ser = serial.Serial(name, baud, timeout=0.1)
+
+        def cleanup():
+            stop.set()
+            ser.close()
+        return ser, cleanup
+    ser = serial.Serial(port, baud, timeout=0.1)
+    return ser, ser.close
+
+
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    from frame_decoder import FramingDecoder, encode_frames
+
+    if len(sys.argv) > 1:
+        # Ringkasan file capture
+        cap = CaptureFile(sys.argv[1])
+        kind = "raw" if cap.kind == KIND_RAW else f"{cap.channels} channel"
+        print(f"{sys.argv[1]}: {kind}, {len(cap.index)} chunk, {cap.total_items} item, {cap.duration:.2f} s")
+        cap.close()
+        sys.exit(0)
+
+    # Ukur replay secepat mungkin lewat decoder (round trip dicek di tests/test_capture.py)
+    data0 = np.arange(50000) % 4096
+    stream = encode_frames(data0, 4095 - data0)
+    path = os.path.join(tempfile.mkdtemp(), "roundtrip.cap")
+    writer = CaptureWriter(path)
+    for i in range(0, len(stream), 1000):
+        writer.write(stream[i:i + 1000])
+    writer.close()
+
+    replay = ReplaySerial(path, speed=0)
+    decoder = FramingDecoder()
+    out = []
+    t0 = time.perf_counter()
+    while True:
+        chunk = replay.read(max(1, replay.in_waiting))
+        if not chunk:
+            break
+        out.append(decoder.feed(chunk)[0])
+    elapsed = time.perf_counter() - t0
+    replay.close()
+    print(f"Replay {len(stream)} byte dalam {elapsed * 1000:.1f} ms ({os.path.getsize(path)} byte di disk)")
@@ -1,217 +1,629 @@
-import serial
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
-from collections import deque
 import threading
 import numpy as np
 import time
+from frame_decoder import StreamDecoder
+from ring_buffer import RingBuffer
+from trigger import Trigger
+from fir_model import FirVerifier, frequency_response
+from capture import CaptureWriter, open_source, read_samples
+from shm_ring import SharedRingBuffer, start_acquisition_process
+from envelope_index import EnvelopeIndex, envelope_polyline
+from spectrum import SpectrumAnalyzer
+from measure import Measurements
+from segments import SegmentMemory, MODES, persistence_rgba
+from link_stats import LinkStats, MetricsExporter
+from tracer import Tracer
+from archive import ArchiveWriter
+from stream_server import StreamServer
 
 # --------- Config ---------
 SERIAL_PORT = 'COM3'
 BAUD_RATE = 2000000
 SAMPLES_TO_SHOW = 250       # Jumlah sampel yang ditampilkan
+RING_SECONDS = 0.5          # s - minimal isi ring buffer, cadangan agar thread analisis tidak tertinggal
 UPDATE_INTERVAL = 50        # ms - interval update plot
 TRIGGER_LEVEL = 2048        # Level trigger (setengah dari 4096)
 TRIGGER_SLOPE = 'rising'    # 'rising' atau 'falling'
+TRIGGER_HYSTERESIS = 16     # Band hysteresis (LSB) agar noise ADC tidak memicu trigger palsu
+TRIGGER_HOLDOFF = 0         # Minimal jarak antar trigger (sampel)
+PRE_TRIGGER = 0             # Jumlah sampel sebelum titik trigger yang ikut ditampilkan
+TRIGGER_SELECT = 'newest'   # 'newest' (latency terkecil) atau 'oldest'
 OVERLAY_MODE = True        # True: Overlay kedua channel, False: Separate plots
+FIR_VERIFY = True           # Bandingkan Channel 1 dengan model bit-exact FIR_HPF.vhd
+RECORD_FILE = None          # Path file capture untuk merekam byte UART, None = tidak merekam
+REPLAY_FILE = None          # Path file capture untuk diputar ulang (tanpa board FPGA)
+REPLAY_SPEED = 1.0          # 1.0 = real-time, N = N kali lebih cepat, 0 = secepat mungkin
+ACQUISITION_PROCESS = False # True: baca dan decode UART di proses terpisah (shared memory)
+HISTORY_VIEW = True         # Simpan seluruh data di index min/max untuk zoom/pan (tombol 'h')
+HISTORY_MAX_SAMPLES = 20000000  # Batas history (~10 menit @ 33k frame/s, 80 MB)
+HISTORY_ZOOM_STEP = 1.25    # Faktor zoom per langkah scroll
+SAMPLE_RATE = 20000         # Hz, sample FIR (50 MHz / 2500) untuk sumbu frekuensi dan pengukuran
+SPECTRUM_VIEW = True        # Window spektrum + respons ch1/ch0 terhadap FIR_HPF.vhd teoritis
+SPECTRUM_INTERVAL = 250     # ms - interval update window spektrum
+MEASURE = True              # Tampilkan Vpp, mean, RMS, frekuensi dan fase ch0 -> ch1
+SEGMENT_COUNT = 256         # Segmen ter-trigger yang disimpan (average/envelope/persistence/history)
+DISPLAY_MODE = 'normal'     # 'normal', 'average', 'envelope' atau 'persistence' (tombol 'm')
+LINK_STATS = True           # Overlay kesehatan link: byte, frame, resync, backlog, stall, sample rate
+METRICS_FILE = None         # Path file JSON metrics link (di-flush setiap detik), None = tidak ditulis
+METRICS_PORT = None         # Port HTTP lokal untuk /metrics dan /metrics.json, None = tidak aktif
+TRACE = False               # Rekam waktu setiap stage, tulis TRACE_FILE (Chrome trace) dan persentil saat keluar
+TRACE_FILE = 'trace_dual.json'
+STREAM_PORT = None          # Port stream_server (TCP + WebSocket) untuk client jarak jauh, None = tidak aktif
+ARCHIVE_DIR = None          # Direktori arsip semua sampel kedua channel (chunk terkompresi, rotasi), None = tidak aktif
 # --------------------------
 
-# Serial configuration
-ser = serial.Serial(SERIAL_PORT, BAUD_RATE, timeout=0.1)
-
-# Buffer untuk menyimpan data mentah - dual channel
-raw_buffer_ch0 = deque(maxlen=SAMPLES_TO_SHOW * 3)  # Channel 0: RAW signal
-raw_buffer_ch1 = deque(maxlen=SAMPLES_TO_SHOW * 3)  # Channel 1: Processed signal
-display_buffer_ch0 = [0] * SAMPLES_TO_SHOW  # Buffer untuk ditampilkan (statis)
-display_buffer_ch1 = [0] * SAMPLES_TO_SHOW
-lock = threading.Lock()
-
-# Frame parsing state
-frame_state = 'WAIT_START'
-frame_data = []
-expected_bytes = 0
-
-def find_trigger_point(data, level, slope='rising'):
-    """Mencari titik trigger dalam data"""
-    if len(data) < 2:
-        return None
-    
-    for i in range(1, len(data) - SAMPLES_TO_SHOW):
-        if slope == 'rising':
-            if data[i-1] < level and data[i] >= level:
-                return i
-        else:  # falling
-            if data[i-1] > level and data[i] <= level:
-                return i
-    return None
-
-def parse_frame_data(frame_bytes):
-    """Parse frame sesuai format FRAMING.vhd"""
-    if len(frame_bytes) != 6:
-        return None, None
-    
-    # Check start and end markers
-    if frame_bytes[0] != 0x53 or frame_bytes[5] != 0x45:  # 'S' and 'E'
-        return None, None
-    
-    # Reconstruct DATA0 (12-bit) - RAW SIGNAL
-    data0_high = frame_bytes[1]
-    data0_low = frame_bytes[2] >> 4
-    data0 = (data0_high << 4) | data0_low
-    
-    # Reconstruct DATA1 (12-bit) - PROCESSED SIGNAL
-    data1_high = frame_bytes[3]
-    data1_low = frame_bytes[4] >> 4
-    data1 = (data1_high << 4) | data1_low
-    
-    return data0, data1
-
-def uart_reader():
-    """Thread untuk membaca data UART dengan frame parsing"""
-    global frame_state, frame_data, expected_bytes
-    
-    while True:
-        try:
-            if ser.in_waiting > 0:
-                byte_val = ser.read(1)[0]
+# Tombol plotter, dibuang dari keymap bawaan matplotlib
+PLOT_KEYS = {'h', 'f', 'c', 'm', '[', ']', 'left', 'right', 'up', 'down', '+', '-', 'end'}
+
+
+def main(port=SERIAL_PORT, baud=BAUD_RATE, samples=SAMPLES_TO_SHOW, trigger_level=TRIGGER_LEVEL,
+         trigger_slope=TRIGGER_SLOPE, hysteresis=TRIGGER_HYSTERESIS, holdoff=TRIGGER_HOLDOFF,
+         pre_trigger=PRE_TRIGGER, frame_format=None, replay=REPLAY_FILE, replay_speed=REPLAY_SPEED,
+         record=RECORD_FILE, archive_dir=ARCHIVE_DIR, emulate=False, serve=STREAM_PORT,
+         acquisition_process=ACQUISITION_PROCESS):
+    """Plotter dual channel; matplotlib dan serial baru di-import (dan port dibuka) saat dipanggil"""
+    import matplotlib.pyplot as plt
+    import matplotlib.animation as animation
+
+    # Ring buffer dual channel: baris 0 = RAW signal, baris 1 = Processed signal
+    capacity = max(samples * 3, int(SAMPLE_RATE * RING_SECONDS))
+
+    if acquisition_process:
+        # UART dibaca dan di-decode di proses lain, plot hanya membaca shared memory
+        acquisition, shm_name = start_acquisition_process(port, baud, capacity,
+                                                          replay=replay, replay_speed=replay_speed,
+                                                          record=record, frame_format=frame_format,
+                                                          emulate=emulate)
+        raw_buffer = SharedRingBuffer.attach(shm_name)
+        ser = None
+        recorder = None
+    else:
+        # Serial configuration (atau replay dari file capture, atau fpga_emulator lewat pty)
+        ser, close_source = open_source(port, baud, replay, replay_speed, emulate,
+                                        frame_format=frame_format or 'framing')
+        
+        # Recorder byte UART (I/O disk dilakukan oleh thread writer)
+        recorder = CaptureWriter(record, rate=baud / 10) if record else None
+        raw_buffer = RingBuffer(capacity, channels=2)
+    display_buffer_ch0 = [0] * samples  # Buffer untuk ditampilkan (statis)
+    display_buffer_ch1 = [0] * samples
+
+    # Segmented memory: setiap segmen ter-trigger disimpan, bukan hanya ditimpa ke display buffer
+    segments = SegmentMemory(SEGMENT_COUNT, samples, channels=2)
+    last_segment = None         # Sequence trigger segmen terakhir yang disimpan
+    display_mode = DISPLAY_MODE
+    segment_index = None        # None = live, N = nomor absolut segmen yang sedang dibuka
+
+    # Trigger engine (vectorized, dengan hysteresis dan holdoff)
+    trigger = Trigger(trigger_level, trigger_slope, hysteresis, holdoff,
+                      pre_trigger, TRIGGER_SELECT)
+
+    # Decoder frame FRAMING.vhd / FRAMING_PACKED.vhd (bulk, vectorized, format dideteksi otomatis jika None)
+    decoder = StreamDecoder(frame_format)
+
+    # Counter kesehatan link (decoder ada di proses lain pada mode acquisition_process)
+    link = LinkStats(None if acquisition_process else decoder, expected_rate=SAMPLE_RATE)
+    exporter = None
+    if METRICS_FILE or METRICS_PORT is not None:
+        exporter = MetricsExporter(link, METRICS_FILE, METRICS_PORT)
+
+    # Model FIR_HPF.vhd yang dijalankan pada Channel 0 untuk verifikasi Channel 1
+    verifier = FirVerifier()
+
+    # Index min/max multi-resolusi untuk seluruh data yang diterima
+    history = EnvelopeIndex(2, max_samples=HISTORY_MAX_SAMPLES) if HISTORY_VIEW else None
+
+    # Welch streaming untuk PSD kedua channel dan H = ch1/ch0
+    analyzer = SpectrumAnalyzer(2, rate=SAMPLE_RATE) if SPECTRUM_VIEW else None
+
+    # Pengukuran per blok (statistik inkremental + zero crossing)
+    measurements = Measurements(2, rate=SAMPLE_RATE) if MEASURE else None
+
+    # Arsip semua sampel untuk soak test (kompresi dan I/O disk di thread writer)
+    archive = ArchiveWriter(archive_dir, channels=2, rate=SAMPLE_RATE) if archive_dir else None
+
+    # Fan-out sampel ter-decode ke client jarak jauh (event loop di thread sendiri, publish tidak memblok)
+    server = StreamServer(port=serve).start() if serve is not None else None
+
+    # Sinyal sampel baru dari uart_reader ke ring_follower (RingBuffer biasa tidak punya wait)
+    new_samples = threading.Event()
+
+    def uart_reader():
+        """Thread untuk membaca data UART, decode semua frame per chunk sekaligus
+
+        Analisis dikerjakan ring_follower agar pembacaan UART tidak tertunda.
+        """
+        while True:
+            try:
+                # Baca semua byte yang tersedia dalam satu panggilan (blok sampai timeout jika kosong)
+                received, waiting, block = read_samples(ser, decoder, recorder)
+                if block is None:
+                    continue
                 
-                if frame_state == 'WAIT_START':
-                    if byte_val == 0x53:  # 'S' start marker
-                        frame_data = [byte_val]
-                        frame_state = 'COLLECTING'
-                        expected_bytes = 5
+                # Format packed bisa membawa lebih dari dua channel, plot memakai dua yang pertama
+                block = block[:2]
+                link.record(received, block.shape[1], waiting)
                 
-                elif frame_state == 'COLLECTING':
-                    frame_data.append(byte_val)
-                    expected_bytes -= 1
+                if block.shape[1]:
+                    raw_buffer.append(block)
+                    if server is not None:
+                        server.publish(block, raw_buffer.total - block.shape[1])
+                    if archive is not None:
+                        archive.write(block)
+                    new_samples.set()
                     
-                    if expected_bytes == 0:
-                        data0, data1 = parse_frame_data(frame_data)
-                        
-                        if data0 is not None and data1 is not None:
-                            with lock:
-                                raw_buffer_ch0.append(data0)    # RAW signal
-                                raw_buffer_ch1.append(data1)    # Processed signal
-                        
-                        frame_state = 'WAIT_START'
-                        frame_data = []
+            except Exception as e:
+                print(f"UART error: {e}")
+                link.error(e)
+                decoder.reset()
+                time.sleep(0.01)
+
+    def ring_follower():
+        """Thread verifikasi FIR, history, spektrum dan pengukuran: ikuti sampel baru di ring buffer
+
+        Pada mode acquisition_process ring buffer ada di shared memory dan
+        follower juga mengerjakan link stats, stream server dan arsip.
+        """
+        seq = raw_buffer.total
+        while not follower_stop.is_set():
+            # Timeout agar stop tetap dicek dan tidak macet jika proses akuisisi mati
+            if acquisition_process:
+                # Bangun saat proses akuisisi menulis (notifikasi UDP)
+                raw_buffer.wait(seq, UPDATE_INTERVAL / 1000)
             else:
-                time.sleep(0.001)
-                
-        except Exception as e:
-            print(f"UART error: {e}")
-            frame_state = 'WAIT_START'
-            frame_data = []
-            time.sleep(0.01)
-
-# Start thread untuk baca data
-threading.Thread(target=uart_reader, daemon=True).start()
-
-# Setup matplotlib
-if OVERLAY_MODE:
-    # Single plot with both channels overlayed
-    fig, ax = plt.subplots(figsize=(14, 8))
-    
-    line0, = ax.plot([], [], 'b-', linewidth=2, label='Channel 0 (RAW)', alpha=0.8)
-    line1, = ax.plot([], [], 'r-', linewidth=2, label='Channel 1 (Processed)', alpha=0.8)
-    trigger_line = ax.axhline(y=TRIGGER_LEVEL, color='g', linestyle='--', alpha=0.7, 
-                             label=f'Trigger Level: {TRIGGER_LEVEL}')
-    
-    ax.set_xlim(0, SAMPLES_TO_SHOW)
-    ax.set_ylim(0, 4096)
-    ax.set_title("Dual Channel Comparison - RAW vs Processed Signal")
-    ax.set_xlabel("Sampel (Posisi Statis)")
-    ax.set_ylabel("Nilai ADC")
-    ax.grid(True, alpha=0.3)
-    ax.legend()
-    
-else:
-    # Separate plots
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
-    
-    # Channel 0 plot
-    line0, = ax1.plot([], [], 'b-', linewidth=1.5, label='Channel 0 (RAW)')
-    trigger_line0 = ax1.axhline(y=TRIGGER_LEVEL, color='r', linestyle='--', alpha=0.7)
-    
-    # Channel 1 plot  
-    line1, = ax2.plot([], [], 'r-', linewidth=1.5, label='Channel 1 (Processed)')
-    trigger_line1 = ax2.axhline(y=TRIGGER_LEVEL, color='r', linestyle='--', alpha=0.7)
-    
-    # Setup axes
-    for axis in [ax1, ax2]:
-        axis.set_xlim(0, SAMPLES_TO_SHOW)
-        axis.set_ylim(0, 4096)
-        axis.grid(True, alpha=0.3)
-        axis.legend()
-    
-    ax1.set_title("Channel 0 - RAW Signal")
-    ax1.set_ylabel("Nilai ADC")
-    ax2.set_title("Channel 1 - Processed Signal")
-    ax2.set_xlabel("Sampel (Posisi Statis)")
-    ax2.set_ylabel("Nilai ADC")
-
-# Setup x-axis data
-x_data = np.arange(SAMPLES_TO_SHOW)
-
-def update(frame):
-    """Update plot - kedua channel sinkron karena data dikirim bersamaan"""
-    global display_buffer_ch0, display_buffer_ch1
-    
-    with lock:
-        # Karena data dikirim bersamaan, cukup cek buffer length dan ambil data terbaru
-        if len(raw_buffer_ch0) >= SAMPLES_TO_SHOW and len(raw_buffer_ch1) >= SAMPLES_TO_SHOW:
+                new_samples.wait(UPDATE_INTERVAL / 1000)
+                new_samples.clear()
+            block, start, lost = raw_buffer.since(seq)
+            seq = start + block.shape[1]
+            if lost:
+                verifier.model.reset()
+            if block.shape[1]:
+                if acquisition_process:
+                    link.record(0, block.shape[1])
+                    if server is not None:
+                        server.publish(block, start)
+                    if archive is not None:
+                        archive.write(block)
+                if history is not None:
+                    history.append(block)
+                if analyzer is not None:
+                    analyzer.feed(block)
+                if measurements is not None:
+                    measurements.feed(block)
+                if FIR_VERIFY:
+                    verifier.feed(block[0], block[1])
+
+    # Start thread untuk baca data (follower dulu agar tidak ada sampel yang terlewat)
+    follower = None
+    follower_stop = threading.Event()   # Follower harus berhenti sebelum shared memory dilepas
+    if FIR_VERIFY or HISTORY_VIEW or SPECTRUM_VIEW or MEASURE or (
+            acquisition_process and (LINK_STATS or server is not None or archive is not None)):
+        follower = threading.Thread(target=ring_follower, daemon=True)
+        follower.start()
+    if not acquisition_process:
+        threading.Thread(target=uart_reader, daemon=True).start()
+
+    # Tombol plotter tidak boleh ikut memicu shortcut bawaan matplotlib (h = home, f = fullscreen, ...)
+    for keymap in [name for name in plt.rcParams if name.startswith('keymap.')]:
+        plt.rcParams[keymap] = [key for key in plt.rcParams[keymap] if key not in PLOT_KEYS]
+
+    # Setup matplotlib
+    if OVERLAY_MODE:
+        # Single plot with both channels overlayed
+        fig, ax = plt.subplots(figsize=(14, 8))
+        
+        line0, = ax.plot([], [], 'b-', linewidth=2, label='Channel 0 (RAW)', alpha=0.8)
+        line1, = ax.plot([], [], 'r-', linewidth=2, label='Channel 1 (Processed)', alpha=0.8)
+        trigger_line = ax.axhline(y=trigger_level, color='g', linestyle='--', alpha=0.7, 
+                                 label=f'Trigger Level: {trigger_level}')
+        
+        ax.set_xlim(0, samples)
+        ax.set_ylim(0, 4096)
+        ax.set_title("Dual Channel Comparison - RAW vs Processed Signal")
+        ax.set_xlabel("Sampel (Posisi Statis)")
+        ax.set_ylabel("Nilai ADC")
+        ax.grid(True, alpha=0.3)
+        ax.legend()
+        
+    else:
+        # Separate plots
+        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
+        
+        # Channel 0 plot
+        line0, = ax1.plot([], [], 'b-', linewidth=1.5, label='Channel 0 (RAW)')
+        trigger_line0 = ax1.axhline(y=trigger_level, color='r', linestyle='--', alpha=0.7)
+        
+        # Channel 1 plot  
+        line1, = ax2.plot([], [], 'r-', linewidth=1.5, label='Channel 1 (Processed)')
+        trigger_line1 = ax2.axhline(y=trigger_level, color='r', linestyle='--', alpha=0.7)
+        
+        # Setup axes
+        for axis in [ax1, ax2]:
+            axis.set_xlim(0, samples)
+            axis.set_ylim(0, 4096)
+            axis.grid(True, alpha=0.3)
+            axis.legend()
+        
+        ax1.set_title("Channel 0 - RAW Signal")
+        ax1.set_ylabel("Nilai ADC")
+        ax2.set_title("Channel 1 - Processed Signal")
+        ax2.set_xlabel("Sampel (Posisi Statis)")
+        ax2.set_ylabel("Nilai ADC")
+
+    # Status verifikasi FIR (delay dan mismatch rate)
+    status_axis = ax if OVERLAY_MODE else ax2
+    fir_status_text = status_axis.text(0.01, 0.02, "", transform=status_axis.transAxes, fontsize=9,
+                                       family='monospace', visible=FIR_VERIFY)
+
+    # Kesehatan link UART (di atas status FIR)
+    link_text = status_axis.text(0.01, 0.07, "", transform=status_axis.transAxes, fontsize=8,
+                                 family='monospace', visible=LINK_STATS)
+
+    # Status history view (posisi, zoom)
+    plot_axes = [ax] if OVERLAY_MODE else [ax1, ax2]
+    history_text = plot_axes[0].text(0.01, 0.97, "", transform=plot_axes[0].transAxes, fontsize=9,
+                                     family='monospace', va='top', visible=False)
+
+    # Hasil pengukuran (kanan atas)
+    measure_text = plot_axes[0].text(0.99, 0.97, "", transform=plot_axes[0].transAxes, fontsize=9,
+                                     family='monospace', va='top', ha='right', visible=MEASURE)
+
+    # Envelope (min/max) dan persistence per channel, hanya tampil pada mode yang sesuai
+    channel_axes = [ax, ax] if OVERLAY_MODE else [ax1, ax2]
+    envelope_lines = [axis.plot([], [], color, linewidth=0.8, alpha=0.5)[0]
+                      for axis, color in zip(channel_axes * 2, ['b-', 'r-'] * 2)]
+    persistence_channels = [[0, 1]] if OVERLAY_MODE else [[0], [1]]
+    persistence_colors = [(0.1, 0.3, 1.0), (1.0, 0.2, 0.1)]
+    persistence_images = [axis.imshow(np.zeros((segments.bins, samples, 4)), origin='lower',
+                                      aspect='auto', interpolation='nearest', visible=False,
+                                      extent=(0, samples, 0, 4096))
+                          for axis in plot_axes]
+    segment_text = plot_axes[-1].text(0.99, 0.02, "", transform=plot_axes[-1].transAxes, fontsize=9,
+                                      family='monospace', ha='right')
+
+    # Setup x-axis data
+    x_data = np.arange(samples)
+
+    # State history view: posisi dan lebar window dalam index sampel absolut
+    history_mode = False
+    view_start = 0
+    view_span = samples * 40
+    view_follow = True          # Ikuti data terbaru selama window menyentuh ujung rekaman
+
+    def set_view(start, span):
+        """Batasi window ke data yang ada; follow aktif jika window sampai ujung data"""
+        nonlocal view_start, view_span, view_follow
+        total = len(history)
+        view_span = int(min(max(span, 16), max(total, 16)))
+        view_start = int(min(max(start, 0), max(total - view_span, 0)))
+        view_follow = view_start + view_span >= total
+
+    def set_xlim(left, right):
+        """Ganti range sumbu x; gambar ulang penuh agar background blit ikut diperbarui"""
+        if plot_axes[0].get_xlim() == (left, right):
+            return
+        for axis in plot_axes:
+            axis.set_xlim(left, right)
+        fig.canvas.draw()
+
+    def on_key(event):
+        """m: mode tampilan, [ / ]: segmen lama / baru, c: hapus segmen,
+        h: live/history, kiri/kanan: geser, atas/bawah: zoom, f: seluruh rekaman, end: ikuti data terbaru"""
+        nonlocal history_mode, display_mode, segment_index
+        if event.key == 'm':
+            display_mode = MODES[(MODES.index(display_mode) + 1) % len(MODES)]
+            segment_index = None
+        elif event.key == '[' and len(segments) > 1:
+            # Nomor absolut: segmen yang dibuka tidak bergeser walaupun akuisisi berjalan terus
+            newest = segments.total - 1
+            segment_index = max((newest if segment_index is None else segment_index) - 1,
+                                segments.total - len(segments))
+        elif event.key == ']' and segment_index is not None:
+            segment_index += 1
+            if segment_index >= segments.total - 1:
+                segment_index = None
+        elif event.key == 'c':
+            segments.clear()
+            segment_index = None
+        elif history is None:
+            return
+        elif event.key == 'h':
+            history_mode = not history_mode
+            history_text.set_visible(history_mode)
+            if history_mode:
+                set_view(len(history) - view_span, view_span)
+            else:
+                set_xlim(0, samples)
+        elif not history_mode:
+            return
+        elif event.key == 'left':
+            set_view(view_start - view_span // 4, view_span)
+        elif event.key == 'right':
+            set_view(view_start + view_span // 4, view_span)
+        elif event.key in ('up', '+'):
+            set_view(view_start + view_span * 0.1, view_span * 0.8)
+        elif event.key in ('down', '-'):
+            set_view(view_start - view_span * 0.125, view_span * 1.25)
+        elif event.key == 'f':
+            set_view(0, len(history))
+        elif event.key == 'end':
+            set_view(len(history) - view_span, view_span)
+
+    def on_scroll(event):
+        """Zoom di sekitar posisi kursor"""
+        if not history_mode or event.inaxes not in plot_axes or event.xdata is None:
+            return
+        scale = 1 / HISTORY_ZOOM_STEP if event.button == 'up' else HISTORY_ZOOM_STEP
+        set_view(event.xdata - (event.xdata - view_start) * scale, view_span * scale)
+
+    fig.canvas.mpl_connect('key_press_event', on_key)
+    fig.canvas.mpl_connect('scroll_event', on_scroll)
+
+    def update_history():
+        """Gambar envelope min/max window history, biaya sebanding lebar plot (pixel)"""
+        total = len(history)
+        start = view_start
+        if view_follow:
+            # Geser per 1/8 window agar sumbu x (dan background) tidak digambar ulang setiap frame
+            step = max(view_span // 8, 1)
+            start = max(0, -(-(total - view_span) // step) * step)
+        set_xlim(start, start + view_span)
+        
+        columns = max(int(plot_axes[0].bbox.width), 1)
+        x, mins, maxs = history.query(start, start + view_span, columns)
+        xs, ys = envelope_polyline(x, mins, maxs)
+        line0.set_data(xs, ys[0])
+        line1.set_data(xs, ys[1])
+        
+        per_pixel = view_span / columns
+        history_text.set_text(f"History {start}..{start + view_span} dari {total} sampel, "
+                              f"{per_pixel:.1f} sampel/pixel{' (follow)' if view_follow else ''}"
+                              f"{' [penuh]' if history.full else ''}")
+
+    def measure_status():
+        """Teks pengukuran kedua channel dan hubungan ch0 -> ch1"""
+        lines = [f"CH0 {measurements.summary(0)}", f"CH1 {measurements.summary(1)}"]
+        phase = measurements.phase(0, 1)
+        if phase is not None:
+            delay, degrees, gain = phase
+            # ch1 datar (gain 0): dB tidak terdefinisi
+            db = f"{20 * np.log10(gain):.1f}" if gain > 0 else "-"
+            lines.append(f"CH0->CH1 delay {delay * 1e6:.1f} us  fase {degrees:.1f} deg  "
+                         f"gain {gain:.3f} ({db} dB)")
+        return "\n".join(lines)
+
+    def update_segments():
+        """Tampilkan segmen sesuai mode: normal, average, envelope, persistence atau history segmen"""
+        nonlocal segment_index
+        if segment_index is not None and segment_index < segments.total - len(segments):
+            # Segmen yang dibuka sudah tertimpa, pindah ke segmen tertua yang masih ada
+            segment_index = segments.total - len(segments)
+        live = segment_index is None
+        browsing = not live and len(segments) > 0
+        for line in envelope_lines:
+            line.set_visible(live and display_mode == 'envelope' and len(segments) > 0)
+        for image in persistence_images:
+            image.set_visible(live and display_mode == 'persistence' and len(segments) > 0)
+        
+        if browsing:
+            back = segments.total - 1 - segment_index
+            data, sequence = segments.segment(back)
+            line0.set_data(x_data, data[0])
+            line1.set_data(x_data, data[1])
+            segment_text.set_text(f"Segmen #{segment_index} (-{back} dari {len(segments)}, trigger @ {sequence})")
+            return
+        
+        segment_text.set_text(f"Mode {display_mode}, {len(segments)} segmen" if display_mode != 'normal' else "")
+        if display_mode == 'average' and len(segments):
+            average = segments.average()
+            line0.set_data(x_data, average[0])
+            line1.set_data(x_data, average[1])
+            return
+        
+        line0.set_data(x_data, display_buffer_ch0)
+        line1.set_data(x_data, display_buffer_ch1)
+        if display_mode == 'envelope' and len(segments):
+            lo, hi = segments.envelope()
+            for c in range(2):
+                envelope_lines[c].set_data(x_data, lo[c])
+                envelope_lines[c + 2].set_data(x_data, hi[c])
+        elif display_mode == 'persistence' and len(segments):
+            hist = segments.persistence()
+            for image, channels in zip(persistence_images, persistence_channels):
+                image.set_data(persistence_rgba(hist[channels], [persistence_colors[c] for c in channels]))
+
+    def update(frame):
+        """Update plot - kedua channel sinkron karena data dikirim bersamaan"""
+        nonlocal display_buffer_ch0, display_buffer_ch1, last_segment
+        
+        if MEASURE and measurements.total:
+            measure_text.set_text(measure_status())
+        if LINK_STATS:
+            link_text.set_text(link.summary())
+        
+        if history_mode:
+            for artist in (*envelope_lines, *persistence_images):
+                artist.set_visible(False)
+            segment_text.set_text("")
+            update_history()
+            if FIR_VERIFY:
+                fir_status_text.set_text(verifier.status())
+            return (*persistence_images, line0, line1, *envelope_lines, fir_status_text, history_text,
+                    measure_text, segment_text, link_text)
+        
+        # Karena data dikirim bersamaan, kedua channel selalu punya panjang yang sama
+        if len(raw_buffer) >= samples:
+            # View tanpa copy dan tanpa lock, trigger dicari di 3 layar terakhir saja
+            window, start = raw_buffer.latest(min(len(raw_buffer), samples * 3))
+            
             # Gunakan channel 0 untuk trigger (reference)
-            trigger_data = list(raw_buffer_ch0)
-            trigger_point = find_trigger_point(trigger_data, TRIGGER_LEVEL, TRIGGER_SLOPE)
+            trigger_point = trigger.locate(window[0], samples, start)
             
             if trigger_point is not None:
                 # Ambil data dari titik trigger yang sama untuk kedua channel
-                triggered_data_ch0 = trigger_data[trigger_point:trigger_point + SAMPLES_TO_SHOW]
-                triggered_data_ch1 = list(raw_buffer_ch1)[trigger_point:trigger_point + SAMPLES_TO_SHOW]
+                triggered = window[:, trigger_point:trigger_point + samples].copy()
                 
-                if len(triggered_data_ch0) == SAMPLES_TO_SHOW and len(triggered_data_ch1) == SAMPLES_TO_SHOW:
-                    display_buffer_ch0 = triggered_data_ch0
-                    display_buffer_ch1 = triggered_data_ch1
-    
-    # Update lines
-    line0.set_data(x_data, display_buffer_ch0)
-    line1.set_data(x_data, display_buffer_ch1)
-    
+                # Buang hasil jika writer sudah menimpa segmen ini selama pencarian trigger
+                if triggered.shape[1] == samples and raw_buffer.is_valid(start + trigger_point):
+                    display_buffer_ch0 = triggered[0]
+                    display_buffer_ch1 = triggered[1]
+                    # Simpan hanya trigger baru (trigger yang sama bisa ditemukan lagi di update berikutnya)
+                    if trigger.last_trigger != last_segment:
+                        segments.add(triggered, trigger.last_trigger)
+                        last_segment = trigger.last_trigger
+        
+        # Update lines sesuai mode tampilan
+        update_segments()
+        
+        if FIR_VERIFY:
+            fir_status_text.set_text(verifier.status())
+        
+        return (*persistence_images, line0, line1, *envelope_lines, fir_status_text, history_text,
+                measure_text, segment_text, link_text)
+
+    # Tracing per stage: fungsi hanya dibungkus jika TRACE aktif (tanpa overhead jika mati)
+    tracer = Tracer() if TRACE else None
+    if TRACE:
+        if not acquisition_process:
+            tracer.instrument(ser, 'read', 'serial.read')
+            tracer.instrument(decoder, 'feed', 'decode')
+            tracer.instrument(raw_buffer, 'append', 'ring.append')
+        tracer.instrument(raw_buffer, 'latest', 'ring.latest')
+        tracer.instrument(trigger, 'locate', 'trigger.locate')
+        for target, method, name in ((history, 'append', 'history.append'), (analyzer, 'feed', 'spectrum.feed'),
+                                     (measurements, 'feed', 'measure.feed')):
+            if target is not None:
+                tracer.instrument(target, method, name)
+        if FIR_VERIFY:
+            tracer.instrument(verifier, 'feed', 'fir_verify.feed')
+        tracer.instrument(segments, 'add', 'segments.add')
+        for artist in (line0, line1):
+            tracer.instrument(artist, 'set_data', 'set_data')
+        for axis in plot_axes:
+            tracer.instrument(axis, 'draw_artist', 'draw_artist')
+        tracer.instrument(fig.canvas, 'blit', 'blit')
+        tracer.instrument(fig.canvas, 'draw', 'canvas.draw')
+        update = tracer.wrap(update, 'update')
+
+    # Animasi
+    ani = animation.FuncAnimation(
+        fig, 
+        update, 
+        interval=UPDATE_INTERVAL,
+        blit=True
+    )
+
+    plt.tight_layout()
+
+    if SPECTRUM_VIEW:
+        # Window terpisah dengan interval sendiri agar tidak memperlambat tampilan waktu
+        spec_fig, (ax_psd, ax_mag, ax_phase) = plt.subplots(3, 1, figsize=(10, 10), sharex=True)
+        freqs = analyzer.freqs
+        theory = frequency_response(freqs, SAMPLE_RATE)
+        
+        psd_line0, = ax_psd.plot(freqs, np.full(len(freqs), np.nan), 'b-', linewidth=1, label='Channel 0 (RAW)')
+        psd_line1, = ax_psd.plot(freqs, np.full(len(freqs), np.nan), 'r-', linewidth=1, label='Channel 1 (Processed)')
+        ax_psd.set_ylim(-60, 60)
+        ax_psd.set_ylabel("PSD (dB LSB²/Hz)")
+        ax_psd.set_title(f"Spektrum (Welch, NFFT {analyzer.nfft})")
+        
+        ax_mag.plot(freqs, 20 * np.log10(np.abs(theory)), 'k--', linewidth=1, label='FIR_HPF.vhd teoritis')
+        mag_line, = ax_mag.plot(freqs, np.full(len(freqs), np.nan), 'r-', linewidth=1.5, label='Terukur ch1/ch0')
+        ax_mag.set_ylim(-80, 10)
+        ax_mag.set_ylabel("|H| (dB)")
+        
+        ax_phase.plot(freqs, np.angle(theory, deg=True), 'k--', linewidth=1, label='FIR_HPF.vhd teoritis')
+        phase_line, = ax_phase.plot(freqs, np.full(len(freqs), np.nan), 'r-', linewidth=1.5, label='Terukur ch1/ch0')
+        ax_phase.set_ylabel("Fase (derajat)")
+        ax_phase.set_xlabel("Frekuensi (Hz)")
+        
+        for axis in (ax_psd, ax_mag, ax_phase):
+            axis.set_xlim(0, SAMPLE_RATE / 2)
+            axis.grid(True, alpha=0.3)
+            axis.legend(loc='lower right')
+        ax_phase.set_ylim(-180, 180)
+        
+        def update_spectrum(frame):
+            """PSD dan H = ch1/ch0 (hanya bin dengan koherensi cukup)"""
+            _, pxx = analyzer.psd()
+            with np.errstate(divide='ignore'):
+                psd_line0.set_ydata(10 * np.log10(pxx[0]))
+                psd_line1.set_ydata(10 * np.log10(pxx[1]))
+            
+            _, h, _ = analyzer.transfer(1)
+            if FIR_VERIFY and verifier.delay:
+                # Kompensasi delay pipeline ch0 -> ch1 di luar FIR agar fase sebanding dengan teori
+                h = h * np.exp(2j * np.pi * freqs * verifier.delay / SAMPLE_RATE)
+            mag_line.set_ydata(20 * np.log10(np.abs(h)))
+            phase_line.set_ydata(np.angle(h, deg=True))
+            return psd_line0, psd_line1, mag_line, phase_line
+        
+        spec_ani = animation.FuncAnimation(spec_fig, update_spectrum, interval=SPECTRUM_INTERVAL, blit=True)
+        spec_fig.tight_layout()
+
+    print("=== Synchronous Dual Channel Analysis ===")
+    print(f"Trigger Level: {trigger_level}")
+    print(f"Trigger Slope: {trigger_slope}")
+    print(f"Display Mode: {'Overlay' if OVERLAY_MODE else 'Separate'}")
+    print("")
+    print("Channel Configuration:")
+    print("  Channel 0 (Blue): RAW Signal dari ADC")
+    print("  Channel 1 (Red): Processed Signal dari FPGA")
+    print("")
+    print("Catatan:")
+    print("  - Data dikirim secara sinkron dalam frame yang sama")
+    print("  - Trigger berdasarkan Channel 0 (RAW)")
+    print("  - Kedua channel akan tampil pada posisi trigger yang sama")
+    if FIR_VERIFY:
+        print("  - Channel 1 diverifikasi terhadap model bit-exact FIR_HPF.vhd")
     if OVERLAY_MODE:
-        return line0, line1
-    else:
-        return line0, line1
-
-# Animasi
-ani = animation.FuncAnimation(
-    fig, 
-    update, 
-    interval=UPDATE_INTERVAL,
-    blit=True
-)
-
-plt.tight_layout()
-
-print("=== Synchronous Dual Channel Analysis ===")
-print(f"Trigger Level: {TRIGGER_LEVEL}")
-print(f"Trigger Slope: {TRIGGER_SLOPE}")
-print(f"Display Mode: {'Overlay' if OVERLAY_MODE else 'Separate'}")
-print("")
-print("Channel Configuration:")
-print("  Channel 0 (Blue): RAW Signal dari ADC")
-print("  Channel 1 (Red): Processed Signal dari FPGA")
-print("")
-print("Catatan:")
-print("  - Data dikirim secara sinkron dalam frame yang sama")
-print("  - Trigger berdasarkan Channel 0 (RAW)")
-print("  - Kedua channel akan tampil pada posisi trigger yang sama")
-if OVERLAY_MODE:
-    print("  - Mode Overlay: Mudah membandingkan perbedaan amplitude dan fase")
-
-try:
-    plt.show()
-except KeyboardInterrupt:
-    print("Stopping...")
-finally:
-    ser.close()
-    print("Serial port closed.")
\ No newline at end of file
+        print("  - Mode Overlay: Mudah membandingkan perbedaan amplitude dan fase")
+    if HISTORY_VIEW:
+        print("  - 'h': history view (scroll = zoom, kiri/kanan = geser, f = seluruh rekaman, end = data terbaru)")
+    print("  - 'm': mode normal/average/envelope/persistence, '[' / ']': segmen lama/baru, 'c': hapus segmen")
+    if SPECTRUM_VIEW:
+        print(f"  - Window spektrum: PSD dan H = ch1/ch0 vs FIR_HPF.vhd (fs = {SAMPLE_RATE} Hz)")
+    if METRICS_PORT is not None:
+        print(f"  - Metrics link: http://127.0.0.1:{exporter.port}/metrics (dan /metrics.json)")
+    if server is not None:
+        print(f"  - Stream server: {server.host}:{server.port} (TCP JSON per baris, WebSocket ws://host:port/)")
+    if METRICS_FILE:
+        print(f"  - Metrics link ditulis ke {METRICS_FILE} setiap detik")
+
+    try:
+        plt.show()
+    except KeyboardInterrupt:
+        print("Stopping...")
+    finally:
+        if follower is not None:
+            follower_stop.set()
+            follower.join()
+        if acquisition_process:
+            raw_buffer.close()
+            acquisition.terminate()
+            acquisition.wait()
+        else:
+            close_source()
+        print("Serial port closed.")
+        if exporter is not None:
+            exporter.close()
+        if server is not None:
+            server.close()
+        print(link.summary())
+        if TRACE:
+            tracer.finish(TRACE_FILE)
+        if recorder is not None:
+            recorder.close()
+            print(f"Capture disimpan: {record} ({recorder.dropped_chunks} chunk terbuang)")
+            if recorder.error is not None:
+                print(f"Capture gagal ditulis: {recorder.error}")
+        if archive is not None:
+            archive.close()
+            print(f"Arsip: {archive.samples_written} sampel di {len(archive.files)} file {archive_dir} "
+                  f"({archive.dropped_samples} sampel terbuang)")
+            if archive.error is not None:
+                print(f"Arsip gagal ditulis: {archive.error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,11 @@
-import serial
-import pygame
 import threading
 import numpy as np
 import time
-import math
-from collections import deque
+from ring_buffer import RingBuffer
+from trigger import Trigger
+from measure import Measurements
+from phosphor import PhosphorDisplay
+from tracer import Tracer
 
 # --------- Config ---------
 SERIAL_PORT = 'COM8'
@@ -12,6 +13,10 @@ BAUD_RATE = 500000
 SAMPLES_TO_SHOW = 1000      # Jumlah sampel yang ditampilkan
 TRIGGER_LEVEL = 2048        # Level trigger (setengah dari 4096)
 TRIGGER_SLOPE = 'rising'    # 'rising' atau 'falling'
+TRIGGER_HYSTERESIS = 16     # Band hysteresis (LSB) agar noise ADC tidak memicu trigger palsu
+TRIGGER_HOLDOFF = 0         # Minimal jarak antar trigger (sampel)
+PRE_TRIGGER = 0             # Jumlah sampel sebelum titik trigger yang ikut ditampilkan
+TRIGGER_SELECT = 'newest'   # 'newest' (latency terkecil) atau 'oldest'
 TRIGGER_CHANNEL = 0         # Channel untuk trigger (0 atau 1)
 
 # Display settings
@@ -20,11 +25,19 @@ WINDOW_HEIGHT = 1000
 PLOT_HEIGHT = 180
 PLOT_MARGIN = 50
 FPS = 60                    # Target frame rate
+PHOSPHOR = False            # Tampilan digital phosphor: semua segmen ter-trigger (tombol P)
 
 # Wave generator settings
-WAVE_COUNT = 5              # Jumlah gelombang yang ditampilkan
+WAVE_COUNT = 5              # Jumlah gelombang yang ditampilkan (maksimal len(wave_params))
 AMPLITUDE = 1500            # Amplitudo gelombang
 OFFSET = 2048               # Offset tengah (12-bit center)
+TIME_STEP = 0.01            # Detik (waktu sinyal) per sampel generator
+GENERATOR_RATE = 1000       # Sampel/s per gelombang (wall clock), 20000 = laju sampel FPGA
+GENERATOR_INTERVAL = 0.002  # s - interval pembuatan blok sampel
+
+# Profiling
+TRACE = False               # Rekam waktu setiap stage, tulis TRACE_FILE (Chrome trace) dan persentil saat keluar
+TRACE_FILE = 'trace_dynamic.json'
 # --------------------------
 
 # Colors untuk setiap gelombang
@@ -42,114 +55,240 @@ GRAY = (128, 128, 128)
 DARK_GRAY = (64, 64, 64)
 RED = (255, 0, 0)
 
-# Serial configuration (opsional, bisa dimatikan untuk demo)
+# Serial configuration (opsional, bisa dimatikan untuk demo; port dibuka di main)
 USE_SERIAL = False
-try:
-    if USE_SERIAL:
-        ser = serial.Serial(SERIAL_PORT, BAUD_RATE, timeout=0.1)
-except:
-    USE_SERIAL = False
-    print("Serial tidak tersedia, menggunakan generator sinyal")
+ser = None
 
-# Wave parameters yang berubah dinamis
+# Wave parameters yang berubah dinamis ('freq' = frekuensi saat ini, berayun di sekitar 'base_freq')
 wave_params = [
-    {'freq': 1.0, 'phase': 0.0, 'freq_rate': 0.1},    # Slow changing
-    {'freq': 2.0, 'phase': 0.0, 'freq_rate': 0.15},   # Medium changing
-    {'freq': 3.0, 'phase': 0.0, 'freq_rate': 0.2},    # Fast changing
-    {'freq': 0.5, 'phase': 0.0, 'freq_rate': 0.05},   # Very slow
-    {'freq': 4.0, 'phase': 0.0, 'freq_rate': 0.25},   # Very fast changing
+    {'base_freq': 1.0, 'freq': 1.0, 'phase': 0.0, 'freq_rate': 0.1},    # Slow changing
+    {'base_freq': 2.0, 'freq': 2.0, 'phase': 0.0, 'freq_rate': 0.15},   # Medium changing
+    {'base_freq': 3.0, 'freq': 3.0, 'phase': 0.0, 'freq_rate': 0.2},    # Fast changing
+    {'base_freq': 0.5, 'freq': 0.5, 'phase': 0.0, 'freq_rate': 0.05},   # Very slow
+    {'base_freq': 4.0, 'freq': 4.0, 'phase': 0.0, 'freq_rate': 0.25},   # Very fast changing
 ]
 
-# Buffers untuk setiap gelombang
-wave_buffers = [deque(maxlen=SAMPLES_TO_SHOW * 3) for _ in range(WAVE_COUNT)]
-display_buffers = [[OFFSET] * SAMPLES_TO_SHOW for _ in range(WAVE_COUNT)]
-lock = threading.Lock()
+# Buffer, trigger, pengukuran dan phosphor dibuat oleh init_state() (tidak ada alokasi saat import)
+wave_buffers = None         # Ring buffer bersama, satu baris per gelombang
+display_buffers = None
+trigger = None              # Trigger engine (vectorized, dengan hysteresis dan holdoff)
+measurements = None         # Frekuensi diukur dari data (zero crossing), bukan dari parameter generator
+measure_seq = 0
+phosphors = []              # Digital phosphor per gelombang, diisi setiap segmen ter-trigger
+phosphor_seq = None         # Sequence edge terakhir yang sudah masuk histogram
 
 # Performance monitoring
 frame_count = 0
 last_fps_time = time.time()
 current_fps = 0
+generator_rate = 0          # Laju generator terukur (sampel/s per gelombang)
+last_generated = 0
 time_counter = 0.0
+generated = 0               # Sampel per gelombang yang sudah dibuat generator
+
+# pygame di-import oleh load_pygame() saat plotter dijalankan, bukan saat modul di-import
+pygame = None
+
+def load_pygame():
+    """Import pygame sekali untuk semua fungsi gambar modul ini, return modul pygame"""
+    global pygame
+    if pygame is None:
+        import pygame as module
+        pygame = module
+    return pygame
 
-def generate_dynamic_waves():
-    """Generate waves dengan periode yang dinamis berubah"""
-    global time_counter, wave_params
+def init_state():
+    """Buat ring buffer, trigger, pengukuran dan phosphor dari config saat ini"""
+    global wave_buffers, display_buffers, trigger, measurements, measure_seq, phosphors, phosphor_seq
+    wave_buffers = RingBuffer(SAMPLES_TO_SHOW * 3, channels=WAVE_COUNT)
+    display_buffers = [[OFFSET] * SAMPLES_TO_SHOW for _ in range(WAVE_COUNT)]
+    trigger = Trigger(TRIGGER_LEVEL, TRIGGER_SLOPE, TRIGGER_HYSTERESIS, TRIGGER_HOLDOFF,
+                      PRE_TRIGGER, TRIGGER_SELECT)
+    measurements = Measurements(WAVE_COUNT, window=SAMPLES_TO_SHOW, rate=1.0 / TIME_STEP, summary_block=64)
+    measure_seq = 0
+    phosphors = [PhosphorDisplay(WINDOW_WIDTH - 2 * PLOT_MARGIN, PLOT_HEIGHT, COLORS[i % len(COLORS)])
+                 for i in range(WAVE_COUNT)]
+    phosphor_seq = None
+
+def generate_dynamic_waves(n):
+    """Generate n sampel berikutnya untuk semua gelombang sekaligus (periode berubah dinamis)"""
+    global time_counter
     
-    time_counter += 0.01  # Time step
+    # Waktu sinyal setiap sampel, lanjut dari sampel terakhir
+    t = time_counter + TIME_STEP * np.arange(1, n + 1)
+    time_counter = float(t[-1])
     
-    # Update frekuensi setiap gelombang secara dinamis
-    for i, params in enumerate(wave_params):
-        # Frekuensi berubah secara sinusoidal
-        base_freq = [1.0, 2.0, 3.0, 0.5, 4.0][i]
-        freq_variation = math.sin(time_counter * params['freq_rate']) * 0.5
-        params['freq'] = base_freq + freq_variation
-        
-        # Generate sample baru
-        sample_value = OFFSET + AMPLITUDE * math.sin(2 * math.pi * params['freq'] * time_counter + params['phase'])
-        sample_value = max(0, min(4095, int(sample_value)))  # Clamp to 12-bit range
-        
-        with lock:
-            wave_buffers[i].append(sample_value)
+    # Frekuensi berubah secara sinusoidal, satu baris per gelombang yang ditampilkan
+    waves = wave_params[:WAVE_COUNT]
+    base_freq = np.array([params['base_freq'] for params in waves])[:, None]
+    freq_rate = np.array([params['freq_rate'] for params in waves])[:, None]
+    phase = np.array([params['phase'] for params in waves])[:, None]
+    freq = base_freq + np.sin(t * freq_rate) * 0.5
+    for params, f in zip(waves, freq[:, -1]):
+        params['freq'] = float(f)
+    
+    samples = OFFSET + AMPLITUDE * np.sin(2 * np.pi * freq * t + phase)
+    # Satu append untuk semua gelombang dan semua sampel blok ini
+    wave_buffers.append(np.clip(samples, 0, 4095).astype(np.int64))
 
 def wave_generator_thread():
-    """Thread untuk generate gelombang secara kontinu"""
+    """Thread generator: jumlah sampel dihitung dari monotonic clock sehingga laju tepat GENERATOR_RATE"""
+    global generated
+    start = time.monotonic()
+    emitted = 0
     while True:
-        generate_dynamic_waves()
-        time.sleep(0.001)  # 1kHz sample rate
+        due = int((time.monotonic() - start) * GENERATOR_RATE) - emitted
+        if due > wave_buffers.capacity:
+            # Thread sempat tertahan lama: sampel yang tidak muat di ring buffer dilewati
+            emitted += due - wave_buffers.capacity
+            due = wave_buffers.capacity
+        if due > 0:
+            generate_dynamic_waves(due)
+            emitted += due
+            generated += due
+        time.sleep(GENERATOR_INTERVAL)
 
-def find_trigger_point(data, level, slope='rising'):
-    """Mencari titik trigger dalam data"""
-    if len(data) < 2:
-        return None
-    
-    for i in range(1, len(data) - SAMPLES_TO_SHOW):
-        if slope == 'rising':
-            if data[i-1] < level and data[i] >= level:
-                return i
-        else:  # falling
-            if data[i-1] > level and data[i] <= level:
-                return i
-    return None
+def update_measurements():
+    """Proses sampel baru sejak frame sebelumnya"""
+    global measure_seq
+    block, start, lost = wave_buffers.since(measure_seq)
+    measure_seq = start + block.shape[1]
+    if lost:
+        measurements.reset()
+    measurements.feed(block)
 
 def update_display_buffers():
     """Update display buffers dengan trigger pada gelombang yang dipilih"""
     global display_buffers
     
-    with lock:
-        # Gunakan gelombang pertama sebagai trigger reference
-        trigger_buffer = wave_buffers[TRIGGER_CHANNEL]
+    if len(wave_buffers) >= SAMPLES_TO_SHOW:
+        # View semua gelombang tanpa copy dan tanpa lock
+        window, start = wave_buffers.latest(len(wave_buffers))
         
-        if len(trigger_buffer) >= SAMPLES_TO_SHOW:
-            trigger_data = list(trigger_buffer)
-            trigger_point = find_trigger_point(trigger_data, TRIGGER_LEVEL, TRIGGER_SLOPE)
-            
-            if trigger_point is not None:
-                # Apply trigger point ke semua gelombang
+        # Gunakan gelombang yang dipilih sebagai trigger reference
+        trigger_point = trigger.locate(window[TRIGGER_CHANNEL], SAMPLES_TO_SHOW, start)
+        
+        if trigger_point is not None:
+            # Apply trigger point ke semua gelombang
+            triggered = window[:, trigger_point:trigger_point + SAMPLES_TO_SHOW].copy()
+            if triggered.shape[1] == SAMPLES_TO_SHOW and wave_buffers.is_valid(start + trigger_point):
                 for i in range(WAVE_COUNT):
-                    if len(wave_buffers[i]) >= SAMPLES_TO_SHOW:
-                        triggered_data = list(wave_buffers[i])[trigger_point:trigger_point + SAMPLES_TO_SHOW]
-                        if len(triggered_data) == SAMPLES_TO_SHOW:
-                            display_buffers[i] = triggered_data
+                    display_buffers[i] = triggered[i]
+
+def update_phosphor():
+    """Decay histogram lalu tambahkan semua segmen ter-trigger sejak frame sebelumnya"""
+    global phosphor_seq
+    for phosphor in phosphors:
+        phosphor.decay()
+    if len(wave_buffers) < SAMPLES_TO_SHOW:
+        return
+    
+    window, start = wave_buffers.latest(len(wave_buffers))
+    starts = trigger.locate_all(window[TRIGGER_CHANNEL], SAMPLES_TO_SHOW, start, phosphor_seq)
+    if len(starts) == 0:
+        return
+    # Semua segmen sekaligus: (gelombang, segmen, sampel)
+    segments = window[:, starts[:, None] + np.arange(SAMPLES_TO_SHOW)]
+    valid = wave_buffers.is_valid(start + starts)
+    phosphor_seq = start + int(starts[-1]) + PRE_TRIGGER
+    for i in range(WAVE_COUNT):
+        phosphors[i].add(segments[i][valid])
+
+# Cache font, teks dan layer statis (dibuat sekali setelah pygame.init)
+_fonts = {}
+_text_cache = {}
+TEXT_CACHE_SIZE = 512
+_static_layer = None
+
+def get_font(size):
+    """Font di-cache per ukuran, tidak dibuat ulang setiap frame"""
+    font = _fonts.get(size)
+    if font is None:
+        font = _fonts[size] = pygame.font.Font(None, size)
+    return font
+
+def render_text(text, size, color):
+    """Render teks dengan cache surface (teks yang sama tidak di-render ulang)"""
+    key = (text, size, color)
+    rendered = _text_cache.get(key)
+    if rendered is None:
+        if len(_text_cache) >= TEXT_CACHE_SIZE:
+            _text_cache.clear()
+        rendered = _text_cache[key] = get_font(size).render(text, True, color)
+    return rendered
 
-def draw_plot(surface, data, y_offset, color, title, frequency):
-    """Draw a single plot dengan informasi frekuensi"""
+def build_static_layer():
+    """Pre-render background, border dan grid semua plot ke satu surface"""
     plot_width = WINDOW_WIDTH - 2 * PLOT_MARGIN
-    plot_rect = pygame.Rect(PLOT_MARGIN, y_offset, plot_width, PLOT_HEIGHT)
+    layer = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)).convert()
+    layer.fill(BLACK)
     
-    # Draw background
-    pygame.draw.rect(surface, DARK_GRAY, plot_rect)
-    pygame.draw.rect(surface, WHITE, plot_rect, 1)
+    for w in range(WAVE_COUNT):
+        y_offset = 50 + w * (PLOT_HEIGHT + 10)
+        plot_rect = pygame.Rect(PLOT_MARGIN, y_offset, plot_width, PLOT_HEIGHT)
+        
+        # Draw background
+        pygame.draw.rect(layer, DARK_GRAY, plot_rect)
+        pygame.draw.rect(layer, WHITE, plot_rect, 1)
+        
+        # Draw grid
+        for i in range(0, plot_width, plot_width // 10):
+            pygame.draw.line(layer, GRAY, 
+                            (PLOT_MARGIN + i, y_offset), 
+                            (PLOT_MARGIN + i, y_offset + PLOT_HEIGHT), 1)
+        
+        for i in range(0, PLOT_HEIGHT, PLOT_HEIGHT // 4):
+            pygame.draw.line(layer, GRAY, 
+                            (PLOT_MARGIN, y_offset + i), 
+                            (PLOT_MARGIN + plot_width, y_offset + i), 1)
+    
+    # Teks kontrol di panel info tidak pernah berubah
+    for i, text in enumerate(["Controls:", "0-4: Switch trigger channel", "R: Reset time counter",
+                              "P: Phosphor display", "ESC: Exit"]):
+        layer.blit(get_font(18).render(text, True, (100, 255, 100)), (10, 10 + (i + 6) * 20))
+    return layer
+
+def draw_background(surface):
+    """Blit layer statis (pengganti fill + gambar grid setiap frame)"""
+    global _static_layer
+    if _static_layer is None:
+        _static_layer = build_static_layer()
+    surface.blit(_static_layer, (0, 0))
+
+def signal_points(data, y_offset, plot_width):
+    """Transformasi sampel -> pixel dalam satu operasi NumPy
+
+    Jika jumlah sampel lebih dari dua kali lebar plot, setiap kolom pixel
+    diwakili oleh nilai max dan min sampel di kolom tersebut, sehingga
+    jumlah titik tidak pernah melebihi 2 x lebar plot.
+    """
+    data = np.asarray(data, dtype=np.int32)
+    n = len(data)
+    
+    if n > 2 * plot_width:
+        # Decimation min/max per kolom pixel
+        edges = (np.arange(plot_width) * n) // plot_width
+        values = np.empty(2 * plot_width, dtype=np.int32)
+        values[0::2] = np.maximum.reduceat(data, edges)
+        values[1::2] = np.minimum.reduceat(data, edges)
+        xs = PLOT_MARGIN + np.repeat(np.arange(plot_width), 2)
+    else:
+        values = data
+        xs = PLOT_MARGIN + (np.arange(n) * plot_width) // n
     
-    # Draw grid
-    for i in range(0, plot_width, plot_width // 10):
-        pygame.draw.line(surface, GRAY, 
-                        (PLOT_MARGIN + i, y_offset), 
-                        (PLOT_MARGIN + i, y_offset + PLOT_HEIGHT), 1)
+    ys = y_offset + PLOT_HEIGHT - (values * PLOT_HEIGHT) // 4096
+    np.clip(ys, y_offset, y_offset + PLOT_HEIGHT, out=ys)  # Clamp to plot area
+    return np.column_stack((xs, ys))
+
+def draw_plot(surface, data, y_offset, color, title, frequency, phosphor=None):
+    """Draw a single plot dengan frekuensi terukur (background dari layer statis)
+
+    Jika `phosphor` diberikan, histogram phosphor digambar sebagai pengganti polyline.
+    """
+    plot_width = WINDOW_WIDTH - 2 * PLOT_MARGIN
     
-    for i in range(0, PLOT_HEIGHT, PLOT_HEIGHT // 4):
-        pygame.draw.line(surface, GRAY, 
-                        (PLOT_MARGIN, y_offset + i), 
-                        (PLOT_MARGIN + plot_width, y_offset + i), 1)
+    if phosphor is not None:
+        phosphor.render(surface, (PLOT_MARGIN, y_offset))
     
     # Draw trigger level (hanya pada channel trigger)
     if title.endswith("(TRIGGER)"):
@@ -159,48 +298,68 @@ def draw_plot(surface, data, y_offset, color, title, frequency):
                         (PLOT_MARGIN + plot_width, trigger_y), 2)
     
     # Draw signal
-    if len(data) > 1:
-        points = []
-        for i, value in enumerate(data):
-            x = PLOT_MARGIN + int((i / len(data)) * plot_width)
-            y = y_offset + PLOT_HEIGHT - int((value / 4096.0) * PLOT_HEIGHT)
-            y = max(y_offset, min(y_offset + PLOT_HEIGHT, y))  # Clamp to plot area
-            points.append((x, y))
-        
-        if len(points) > 1:
-            pygame.draw.lines(surface, color, False, points, 2)
+    if phosphor is None and len(data) > 1:
+        points = signal_points(data, y_offset, plot_width)
+        pygame.draw.lines(surface, color, False, points.tolist(), 2)
     
     # Draw title dengan frekuensi
-    font = pygame.font.Font(None, 20)
-    title_text = f"{title} - Freq: {frequency:.2f} Hz"
-    text = font.render(title_text, True, WHITE)
-    surface.blit(text, (PLOT_MARGIN, y_offset - 22))
+    title_text = f"{title} - Freq: {frequency:.2f} Hz" if frequency else f"{title} - Freq: -"
+    surface.blit(render_text(title_text, 20, WHITE), (PLOT_MARGIN, y_offset - 22))
 
 def draw_info(surface):
-    """Draw information panel"""
-    font = pygame.font.Font(None, 18)
+    """Draw information panel (bagian Controls ada di layer statis)"""
     info_texts = [
         f"FPS: {current_fps:.1f}",
         f"Trigger Level: {TRIGGER_LEVEL}",
         f"Trigger Channel: {TRIGGER_CHANNEL}",
         f"Trigger Slope: {TRIGGER_SLOPE}",
+        f"Display: {'Phosphor' if PHOSPHOR else 'Line'}",
         f"Time: {time_counter:.1f}s",
-        "",
-        "Controls:",
-        "0-4: Switch trigger channel",
-        "R: Reset time counter", 
-        "ESC: Exit"
+        f"Generator: {generator_rate:,.0f} sampel/s",
     ]
     
     for i, text in enumerate(info_texts):
-        if text == "":
-            continue
-        color = WHITE if i < 5 else (100, 255, 100)
-        rendered = font.render(text, True, color)
-        surface.blit(rendered, (10, 10 + i * 20))
+        surface.blit(render_text(text, 18, WHITE), (10, 10 + i * 20))
 
-def main():
-    global frame_count, last_fps_time, current_fps, TRIGGER_CHANNEL, time_counter
+# Tracing per stage: fungsi hanya dibungkus jika TRACE aktif (tanpa overhead jika mati).
+# main() dan thread generator memanggil fungsi lewat nama global, jadi cukup diganti di sini.
+tracer = Tracer() if TRACE else None
+if TRACE:
+    generate_dynamic_waves = tracer.wrap(generate_dynamic_waves, 'generate_dynamic_waves')
+    update_display_buffers = tracer.wrap(update_display_buffers, 'update_display_buffers')
+    update_measurements = tracer.wrap(update_measurements, 'update_measurements')
+    update_phosphor = tracer.wrap(update_phosphor, 'update_phosphor')
+    draw_background = tracer.wrap(draw_background, 'draw_background')
+    draw_plot = tracer.wrap(draw_plot, 'draw_plot')
+    draw_info = tracer.wrap(draw_info, 'draw_info')
+
+def main(samples=SAMPLES_TO_SHOW, trigger_level=TRIGGER_LEVEL, trigger_slope=TRIGGER_SLOPE,
+         hysteresis=TRIGGER_HYSTERESIS, holdoff=TRIGGER_HOLDOFF, pre_trigger=PRE_TRIGGER,
+         trigger_channel=TRIGGER_CHANNEL, phosphor=PHOSPHOR):
+    global frame_count, last_fps_time, current_fps, TRIGGER_CHANNEL, time_counter, PHOSPHOR
+    global generator_rate, last_generated, ser, USE_SERIAL
+    global SAMPLES_TO_SHOW, TRIGGER_LEVEL, TRIGGER_SLOPE, TRIGGER_HYSTERESIS, TRIGGER_HOLDOFF, PRE_TRIGGER
+    
+    # Argumen menggantikan config, lalu state dibuat sesuai config tersebut
+    SAMPLES_TO_SHOW, TRIGGER_LEVEL, TRIGGER_SLOPE = samples, trigger_level, trigger_slope
+    TRIGGER_HYSTERESIS, TRIGGER_HOLDOFF, PRE_TRIGGER = hysteresis, holdoff, pre_trigger
+    TRIGGER_CHANNEL, PHOSPHOR = trigger_channel, phosphor
+    load_pygame()
+    init_state()
+    if TRACE:
+        tracer.instrument(wave_buffers, 'append', 'ring.append')
+        tracer.instrument(wave_buffers, 'latest', 'ring.latest')
+        tracer.instrument(trigger, 'locate', 'trigger.locate')
+        tracer.instrument(pygame.draw, 'lines', 'pygame.draw.lines')
+        tracer.instrument(pygame.display, 'flip', 'pygame.display.flip')
+    
+    if USE_SERIAL:
+        try:
+            import serial
+            ser = serial.Serial(SERIAL_PORT, BAUD_RATE, timeout=0.1)
+        except Exception:
+            USE_SERIAL = False
+            print("Serial tidak tersedia, menggunakan generator sinyal")
     
     # Initialize pygame
     pygame.init()
@@ -214,9 +373,11 @@ def main():
     
     print("Dynamic Multi-Wave Plotter Started")
     print("Menampilkan 5 gelombang dengan periode yang berubah dinamis")
+    print(f"Generator: {GENERATOR_RATE:,} sampel/s per gelombang (blok setiap {GENERATOR_INTERVAL * 1000:.0f} ms)")
     print("Controls:")
     print("  0-4: Switch trigger channel")
     print("  R: Reset time counter")
+    print("  P: Phosphor display")
     print("  ESC: Exit")
     
     running = True
@@ -231,6 +392,10 @@ def main():
                 elif event.key == pygame.K_r:
                     time_counter = 0.0
                     print("Time counter reset")
+                elif event.key == pygame.K_p:
+                    PHOSPHOR = not PHOSPHOR
+                    for phosphor in phosphors:
+                        phosphor.clear()
                 elif event.key >= pygame.K_0 and event.key <= pygame.K_4:
                     TRIGGER_CHANNEL = event.key - pygame.K_0
                     if TRIGGER_CHANNEL < WAVE_COUNT:
@@ -238,9 +403,12 @@ def main():
         
         # Update data
         update_display_buffers()
+        update_measurements()
+        if PHOSPHOR:
+            update_phosphor()
         
-        # Clear screen
-        screen.fill(BLACK)
+        # Clear screen (background dan grid dari cache)
+        draw_background(screen)
         
         # Draw all wave plots
         for i in range(WAVE_COUNT):
@@ -249,8 +417,9 @@ def main():
             if i == TRIGGER_CHANNEL:
                 title += " (TRIGGER)"
             
-            current_freq = wave_params[i]['freq']
-            draw_plot(screen, display_buffers[i], y_pos, COLORS[i], title, current_freq)
+            current_freq, _ = measurements.frequency(i)
+            draw_plot(screen, display_buffers[i], y_pos, COLORS[i], title, current_freq,
+                      phosphors[i] if PHOSPHOR else None)
         
         # Draw info
         draw_info(screen)
@@ -263,6 +432,8 @@ def main():
         current_time = time.time()
         if current_time - last_fps_time >= 1.0:
             current_fps = frame_count / (current_time - last_fps_time)
+            generator_rate = (generated - last_generated) / (current_time - last_fps_time)
+            last_generated = generated
             frame_count = 0
             last_fps_time = current_time
         
@@ -274,6 +445,8 @@ def main():
     if USE_SERIAL:
         ser.close()
     print("Dynamic Multi-Wave Plotter stopped")
+    if TRACE:
+        tracer.finish(TRACE_FILE)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
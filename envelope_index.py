@@ -0,0 +1,182 @@
+import time
+import numpy as np
+
+# --------- Config ---------
+LEVEL_FACTOR = 8            # Setiap level merangkum 8 entri level di bawahnya
+INITIAL_CAPACITY = 1 << 16  # Kapasitas awal array (tumbuh 2x jika penuh)
+# --------------------------
+
+
+class _GrowArray:
+    """Array (channels, n) yang tumbuh otomatis, append amortized O(1)"""
+
+    def __init__(self, channels, dtype, capacity=INITIAL_CAPACITY):
+        self.data = np.empty((channels, capacity), dtype=dtype)
+        self.count = 0
+
+    def append(self, block):
+        n = block.shape[1]
+        if self.count + n > self.data.shape[1]:
+            new_capacity = max(2 * self.data.shape[1], self.count + n)
+            grown = np.empty((self.data.shape[0], new_capacity), dtype=self.data.dtype)
+            grown[:, :self.count] = self.data[:, :self.count]
+            self.data = grown
+        self.data[:, self.count:self.count + n] = block
+        # Counter dinaikkan terakhir agar reader tidak melihat data setengah jadi
+        self.count += n
+
+
+class EnvelopeIndex:
+    """Piramida min/max (seperti LOD) di atas data channel yang direkam
+
+    Level 0 adalah sampel mentah, level k berisi min dan max setiap
+    LEVEL_FACTOR**k sampel. Index diperbarui per blok saat data masuk.
+    `query` memilih level terkasar yang masih lebih halus dari satu pixel,
+    sehingga biayanya sebanding dengan lebar layar, bukan panjang rekaman.
+    """
+
+    def __init__(self, channels=2, factor=LEVEL_FACTOR, max_samples=None):
+        self.channels = channels
+        self.factor = factor
+        self.max_samples = max_samples
+        self._raw = _GrowArray(channels, np.int16)
+        self._mins = []     # _mins[k-1], _maxs[k-1] = level k
+        self._maxs = []
+        self.full = False
+
+    def __len__(self):
+        return self._raw.count
+
+    @property
+    def levels(self):
+        return len(self._mins) + 1
+
+    def append(self, block):
+        """Tambah blok (channels, n) dan perbarui semua level"""
+        block = np.asarray(block, dtype=np.int16).reshape(self.channels, -1)
+        if self.max_samples is not None:
+            room = self.max_samples - self._raw.count
+            if room <= 0:
+                self.full = True
+                return
+            block = block[:, :room]
+        self._raw.append(block)
+
+        # Update level dari bawah ke atas, hanya blok yang baru lengkap
+        lower_min = lower_max = self._raw
+        level = 1
+        while True:
+            done = (lower_min.count // self.factor)
+            if level > len(self._mins):
+                if done == 0:
+                    break
+                self._mins.append(_GrowArray(self.channels, np.int16, max(16, done)))
+                self._maxs.append(_GrowArray(self.channels, np.int16, max(16, done)))
+            mins, maxs = self._mins[level - 1], self._maxs[level - 1]
+            first = mins.count
+            if done > first:
+                lo = first * self.factor
+                hi = done * self.factor
+                shape = (self.channels, done - first, self.factor)
+                maxs.append(lower_max.data[:, lo:hi].reshape(shape).max(axis=2))
+                mins.append(lower_min.data[:, lo:hi].reshape(shape).min(axis=2))
+            lower_min, lower_max = mins, maxs
+            level += 1
+
+    def _entries(self, level, start, stop):
+        """(posisi sampel, min, max) untuk entri yang menutupi [start, stop) di `level`
+
+        Bagian akhir yang belum menjadi blok lengkap di level ini diambil dari
+        level di bawahnya (paling banyak factor-1 entri per level).
+        """
+        if level == 0:
+            values = self._raw.data[:, start:stop]
+            return np.arange(start, stop), values, values
+
+        size = self.factor ** level
+        mins, maxs = self._mins[level - 1], self._maxs[level - 1]
+        i0 = start // size
+        i1 = min(-(-stop // size), mins.count)
+        covered = i1 * size
+        positions = np.arange(i0, i1) * size
+        lo, hi = mins.data[:, i0:i1], maxs.data[:, i0:i1]
+        if covered < stop:
+            tail_pos, tail_lo, tail_hi = self._entries(level - 1, max(covered, start), stop)
+            positions = np.concatenate((positions, tail_pos))
+            lo = np.concatenate((lo, tail_lo), axis=1)
+            hi = np.concatenate((hi, tail_hi), axis=1)
+        return positions, lo, hi
+
+    def query(self, start, stop, columns):
+        """Envelope [start, stop) untuk `columns` kolom pixel
+
+        Return (x, mins, maxs): x = posisi sampel awal setiap kolom, mins dan
+        maxs shape (channels, k). Jika sampel lebih sedikit dari kolom,
+        sampel mentah dikembalikan (mins == maxs).
+        """
+        start = max(0, int(start))
+        stop = min(len(self), int(stop))
+        if stop <= start:
+            empty = np.empty((self.channels, 0), np.int16)
+            return np.empty(0, np.int64), empty, empty
+
+        per_column = (stop - start) / columns
+        if per_column <= 1:
+            return self._entries(0, start, stop)
+
+        level = 0
+        while level + 1 < self.levels and self.factor ** (level + 1) <= per_column:
+            level += 1
+        positions, lo, hi = self._entries(level, start, stop)
+        # Blok pertama bisa dimulai sebelum `start`, masukkan ke kolom pertama
+        positions = np.maximum(positions, start)
+
+        # Gabungkan entri per kolom pixel
+        edges = start + (np.arange(columns) * (stop - start)) // columns
+        idx = np.searchsorted(positions, edges)
+        keep = np.concatenate((idx[:-1] < idx[1:], [idx[-1] < len(positions)]))
+        idx = idx[keep]
+        return edges[keep], np.minimum.reduceat(lo, idx, axis=1), np.maximum.reduceat(hi, idx, axis=1)
+
+    @classmethod
+    def from_capture(cls, path, factor=LEVEL_FACTOR):
+        """Bangun index dari file capture KIND_CHANNELS"""
+        from capture import CaptureFile, KIND_CHANNELS
+        cap = CaptureFile(path)
+        if cap.kind != KIND_CHANNELS:
+            raise ValueError("EnvelopeIndex.from_capture membutuhkan capture KIND_CHANNELS")
+        index = cls(cap.channels, factor)
+        for _, data in cap.chunks():
+            index.append(data)
+        return index
+
+
+def envelope_polyline(x, mins, maxs):
+    """Ubah hasil query menjadi titik polyline (max, min bergantian per kolom)"""
+    xs = np.repeat(x, 2)
+    ys = np.empty((mins.shape[0], 2 * mins.shape[1]), dtype=mins.dtype)
+    ys[:, 0::2] = maxs
+    ys[:, 1::2] = mins
+    return xs, ys
+
+
+if __name__ == "__main__":
+    # Ukur waktu index dan query (pengecekan ada di tests/test_envelope_index.py)
+    rng = np.random.default_rng(0)
+    n = 20000 * 60 * 5      # 5 menit @ 20 kHz
+    data = rng.integers(0, 4096, (2, n)).astype(np.int16)
+
+    index = EnvelopeIndex(2)
+    t0 = time.perf_counter()
+    for i in range(0, n, 1000):
+        index.append(data[:, i:i + 1000])
+    print(f"Index {n} sampel x 2 channel, {index.levels} level, {time.perf_counter() - t0:.2f} s")
+
+    for start, stop, cols in ((0, n, 1200), (12345, 12345 + 500000, 1200), (777, 1777, 1200),
+                              (n - 5000, n, 1200), (100, 110, 50)):
+        x, _, _ = index.query(start, stop, cols)
+        t0 = time.perf_counter()
+        for _ in range(100):
+            index.query(start, stop, cols)
+        print(f"  query {stop - start:>9} sampel -> {len(x):>5} kolom: "
+              f"{(time.perf_counter() - t0) * 10:.3f} ms")
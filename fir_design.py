@@ -0,0 +1,343 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from fir_model import COEFFS, FirHpfModel, frequency_response
+
+# --------- Config ---------
+SAMPLE_RATE = 20000         # Hz (50 MHz / 2500)
+STOP_EDGE = 500.0           # Hz - batas atas stopband
+PASS_EDGE = 1500.0          # Hz - batas bawah passband
+STOPBAND_DB = 40.0          # Rejection minimal (dB) untuk kandidat yang lolos
+PASS_RIPPLE_DB = 1.5        # Deviasi passband maksimal (dB)
+ERROR_RMS_LSB = 1.0         # Error RMS maksimal output bit-exact vs filter float (LSB)
+TAPS = (21, 25, 29, 33, 37, 41, 45, 51, 57, 63, 71, 81)
+CUTOFFS = (800.0, 1000.0, 1200.0)
+WINDOWS = ('hamming', 'hann', 'blackman', 'kaiser5', 'kaiser8')
+COEFF_BITS = (10, 12, 14, 16, 18)
+INPUT_BITS = 12
+CACHE_FILE = "fir_design_cache.json"
+VHDL_FILE = "FIR_HPF_design.vhd"
+GRID_POINTS = 4096          # Titik frekuensi untuk evaluasi respons
+# --------------------------
+
+# Naikkan jika cara evaluasi berubah agar cache lama tidak dipakai
+MODEL_VERSION = 1
+
+
+def window(name, taps):
+    if name == 'hamming':
+        return np.hamming(taps)
+    if name == 'hann':
+        return np.hanning(taps)
+    if name == 'blackman':
+        return np.blackman(taps)
+    if name.startswith('kaiser'):
+        return np.kaiser(taps, float(name[len('kaiser'):]))
+    raise ValueError(f"Window tidak dikenal: {name}")
+
+
+def design_hpf(taps, cutoff, window_name, rate=SAMPLE_RATE):
+    """Koefisien HPF windowed-sinc (float, tap ganjil): delta - LPF dengan gain DC 1"""
+    if taps % 2 == 0:
+        raise ValueError("HPF FIR type I membutuhkan jumlah tap ganjil")
+    n = np.arange(taps) - (taps - 1) / 2
+    lowpass = np.sinc(2 * cutoff / rate * n) * window(window_name, taps)
+    lowpass /= lowpass.sum()
+    highpass = -lowpass
+    highpass[(taps - 1) // 2] += 1.0
+    return highpass
+
+
+def quantize(coeffs, bits):
+    """Return (koefisien integer signed `bits`, jumlah bit pecahan)
+
+    Bit pecahan dipilih sebesar mungkin tanpa melampaui range signed `bits`.
+    """
+    limit = (1 << (bits - 1)) - 1
+    peak = float(np.abs(coeffs).max())
+    frac = bits - 1
+    while frac > 0 and round(peak * (1 << frac)) > limit:
+        frac -= 1
+    while round(peak * (1 << (frac + 1))) <= limit:
+        frac += 1
+    return np.round(np.asarray(coeffs) * (1 << frac)).astype(np.int64), frac
+
+
+def accumulator_bits(coeffs_q, input_bits=INPUT_BITS):
+    """Bit akumulator signed untuk input terburuk: |acc| <= 2^(input_bits-1) * sum|c|"""
+    worst = (1 << (input_bits - 1)) * int(np.abs(coeffs_q).sum())
+    return int(worst).bit_length() + 1
+
+
+def synthetic_input(rate=SAMPLE_RATE, seconds=1.0, seed=0):
+    """Input uji 12-bit: chirp, multi-tone, step dan noise
+
+    Step 2000 LSB dan noise 400 LSB RMS: overshoot HPF (~0.9 x step, puncak
+    noise) masih di dalam range output 12-bit, sehingga wrap hanya muncul
+    dari gain filter yang berlebihan.
+    """
+    rng = np.random.default_rng(seed)
+    n = int(rate * seconds)
+    t = np.arange(n) / rate
+    chirp = 1800 * np.sin(2 * np.pi * (20 * t + (rate / 2 - 20) / (2 * seconds) * t ** 2))
+    tones = sum(600 * np.sin(2 * np.pi * f * t) for f in (50, 300, 2000, 5000)) / 2
+    steps = 1000 * np.sign(np.sin(2 * np.pi * 5 * t))
+    parts = [chirp, tones, steps, rng.normal(0, 400, n)]
+    x = np.concatenate([2048 + p for p in parts])
+    return np.clip(np.rint(x), 0, 4095).astype(np.int64)
+
+
+def capture_input(path, channel=0):
+    """Channel dari file capture (byte UART mentah atau array channel)"""
+    from capture import CaptureFile, KIND_RAW
+    from frame_decoder import StreamDecoder
+    cap = CaptureFile(path)
+    if cap.kind == KIND_RAW:
+        decoder = StreamDecoder()
+        blocks = [decoder.feed(data.tobytes())[channel] for _, data in cap.chunks()]
+    else:
+        blocks = [data[channel].copy() for _, data in cap.chunks()]
+    cap.close()
+    return np.concatenate(blocks).astype(np.int64)
+
+
+_input = None
+_rate = SAMPLE_RATE
+
+
+def _init_worker(x, rate):
+    global _input, _rate
+    _input, _rate = x, rate
+
+
+def evaluate(candidate, x=None, rate=None):
+    """Simulasi bit-exact satu kandidat (taps, cutoff, window, bits) atau ('vhdl', koefisien, bits)"""
+    x = _input if x is None else x
+    rate = _rate if rate is None else rate
+    if candidate[0] == 'vhdl':
+        coeffs_q, bits = np.asarray(candidate[1], dtype=np.int64), candidate[2]
+        frac = bits - 1
+        ideal = coeffs_q / (1 << frac)
+        taps = len(coeffs_q)
+    else:
+        taps, cutoff, window_name, bits = candidate
+        ideal = design_hpf(taps, cutoff, window_name, rate)
+        coeffs_q, frac = quantize(ideal, bits)
+
+    # Akumulator VHDL: signed(12) * signed(bits) dijumlahkan pada lebar produk,
+    # diperlebar dengan resize jika input terburuk bisa melampauinya
+    worst_bits = accumulator_bits(coeffs_q)
+    if candidate[0] == 'vhdl':
+        acc_bits = INPUT_BITS + bits
+    else:
+        acc_bits = max(INPUT_BITS + bits, worst_bits, frac + INPUT_BITS)
+
+    freqs = np.linspace(0, rate / 2, GRID_POINTS)
+    response = 20 * np.log10(np.abs(frequency_response(freqs, rate, coeffs_q, frac)) + 1e-12)
+    stopband = response[freqs <= STOP_EDGE]
+    passband = response[freqs >= PASS_EDGE]
+
+    # Datapath bit-exact vs filter float tanpa kuantisasi (dalam LSB output)
+    out = FirHpfModel(coeffs_q, acc_bits, frac).process(x).astype(np.int64) - 2048
+    reference = np.convolve(x - 2048, ideal)[:len(x)]
+    error = out - reference
+    wrapped = np.abs(error) > 1024      # Output melewati range 12-bit
+    wraps = int(np.count_nonzero(wrapped))
+    error = error[~wrapped]
+    acc = np.convolve(x - 2048, coeffs_q)[:len(x)]
+
+    return {
+        "version": MODEL_VERSION,
+        "taps": taps,
+        "cutoff": None if candidate[0] == 'vhdl' else cutoff,
+        "window": 'FIR_HPF.vhd' if candidate[0] == 'vhdl' else window_name,
+        "bits": bits,
+        "frac": frac,
+        "coeffs": coeffs_q.tolist(),
+        "stopband_db": float(-stopband.max()),
+        "ripple_db": float(np.abs(passband).max()),
+        "worst_gain": float(np.abs(coeffs_q).sum() / (1 << frac)),
+        "acc_bits": acc_bits,
+        "acc_worst_bits": worst_bits,
+        "acc_peak_bits": int(np.abs(acc).max()).bit_length() + 1,
+        "wraps": wraps,
+        "error_max": float(np.abs(error).max()),
+        "error_rms": float(np.sqrt(np.mean(error ** 2))),
+        # Koefisien nol tidak butuh multiplier (vhdl_source satu multiplier per tap, tanpa folding)
+        "multipliers": int(np.count_nonzero(coeffs_q)),
+    }
+
+
+def candidates(taps=TAPS, cutoffs=CUTOFFS, windows=WINDOWS, bits=COEFF_BITS):
+    return [(t, float(c), w, b) for t, c, w, b in itertools.product(taps, cutoffs, windows, bits)]
+
+
+def _key(candidate, digest, rate):
+    text = json.dumps([MODEL_VERSION, list(candidate), digest, rate, STOP_EDGE, PASS_EDGE, GRID_POINTS])
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def load_cache(path):
+    """Cache {key: hasil}; hasil dari MODEL_VERSION lain dibuang"""
+    try:
+        with open(path) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {k: v for k, v in cache.items() if v.get("version") == MODEL_VERSION}
+
+
+def save_cache(path, cache):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp, path)
+
+
+def sweep(items, x, rate=SAMPLE_RATE, cache_path=CACHE_FILE, workers=None):
+    """Evaluasi semua kandidat di process pool; hasil yang sudah ada di cache tidak dihitung ulang
+
+    Return (list hasil sesuai urutan `items`, jumlah kandidat yang baru dihitung).
+    """
+    digest = hashlib.sha1(np.ascontiguousarray(x, dtype=np.int64).tobytes()).hexdigest()
+    cache = load_cache(cache_path) if cache_path else {}
+    keys = [_key(c, digest, rate) for c in items]
+    todo = [(k, c) for k, c in zip(keys, items) if k not in cache]
+    if todo:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(x, rate)) as pool:
+            chunksize = max(1, len(todo) // (4 * workers))
+            for (k, _), result in zip(todo, pool.map(evaluate, [c for _, c in todo], chunksize=chunksize)):
+                cache[k] = result
+        if cache_path:
+            save_cache(cache_path, cache)
+    return [cache[k] for k in keys], len(todo)
+
+
+def passes(result):
+    return (result["stopband_db"] >= STOPBAND_DB and result["ripple_db"] <= PASS_RIPPLE_DB
+            and result["wraps"] == 0 and result["error_rms"] <= ERROR_RMS_LSB)
+
+
+def cost(result):
+    """Urutan biaya: multiplier, lebar koefisien, lebar akumulator, lalu rejection"""
+    return result["multipliers"], result["bits"], result["acc_bits"], -result["stopband_db"]
+
+
+def best(results):
+    """Kandidat lolos termurah menurut `cost`"""
+    ok = [r for r in results if passes(r)]
+    if not ok:
+        return None
+    return min(ok, key=cost)
+
+
+def print_table(results, limit=15):
+    print(f"{'taps':>4} {'mult':>4} {'cutoff':>7} {'window':<11} {'bits':>4} {'stop dB':>8} {'ripple':>7} "
+          f"{'gain':>5} {'acc':>4} {'worst':>5} {'peak':>4} {'wrap':>5} {'err max':>8} {'err rms':>8}")
+    for r in results[:limit]:
+        cutoff = f"{r['cutoff']:.0f}" if r['cutoff'] is not None else "-"
+        print(f"{r['taps']:>4} {r['multipliers']:>4} {cutoff:>7} {r['window']:<11} {r['bits']:>4} {r['stopband_db']:8.1f} "
+              f"{r['ripple_db']:7.2f} {r['worst_gain']:5.2f} {r['acc_bits']:>4} {r['acc_worst_bits']:>5} {r['acc_peak_bits']:>4} "
+              f"{r['wraps']:>5} {r['error_max']:8.2f} {r['error_rms']:8.3f}")
+
+
+def vhdl_source(coeffs, bits, frac, acc_bits):
+    """Entity FIR_HPF (port sama dengan FIR_HPF.vhd) untuk koefisien integer `coeffs`"""
+    taps = len(coeffs)
+    product = INPUT_BITS + bits
+    width = max(len(str(int(c))) for c in coeffs)
+    table = ",\n".join(f"      to_signed({int(c):<{width}}, {bits})" for c in coeffs)
+    shifts = "\n".join(f"        signal_buffer({i}) <= signal_buffer({i - 1});" for i in range(taps - 1, 0, -1))
+
+    def term(i):
+        text = f"signed(signal_buffer({i})) * coeffs({i})"
+        return f"resize({text}, {acc_bits})" if acc_bits > product else text
+    terms = " +\n".join(f"          {term(i)}" for i in range(taps))
+
+    return f"""library ieee;
+use ieee.std_logic_1164.ALL;
+use ieee.numeric_std.ALL;
+
+entity FIR_HPF is
+    Port ( CLK_50 : in std_logic;
+           INPUT_ADC : in std_logic_vector (11 downto 0);
+           OUTPUT_ADC : out std_logic_vector (11 downto 0);
+           EN : in std_logic);
+end FIR_HPF;
+
+architecture rtl of FIR_HPF is
+    constant TAPS : integer := {taps};
+    signal fir_output : std_logic_vector({acc_bits - 1} downto 0) := (others => '0');
+    type signal_array is array (0 to TAPS-1) of std_logic_vector (11 downto 0);
+    signal signal_buffer : signal_array := (others => (others => '0'));
+    type coeff_array is array (0 to TAPS-1) of signed({bits - 1} downto 0);
+    signal coeffs : coeff_array := (
+{table}
+    );
+begin
+  process(CLK_50)
+  begin
+    if rising_edge(CLK_50) then
+      if EN = '1' then
+        -- Shift buffer
+{shifts}
+        signal_buffer(0) <= std_logic_vector(signed(INPUT_ADC) + to_signed(2048, 12));
+      end if;
+    end if;
+  end process;
+
+  -- FIR calculation
+  fir_output <= std_logic_vector(
+{terms});
+
+  OUTPUT_ADC <= std_logic_vector(signed(fir_output({frac + 11} downto {frac})) + 2048);
+end rtl;"""
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep desain FIR HPF fixed-point (taps, cutoff, window, lebar koefisien)")
+    parser.add_argument("--capture", help="File capture sebagai input (default: sinyal sintetis)")
+    parser.add_argument("--channel", type=int, default=0, help="Channel capture yang dipakai")
+    parser.add_argument("--workers", type=int, help="Jumlah proses (default: semua core)")
+    parser.add_argument("--cache", default=CACHE_FILE, help="File cache hasil ('' = tanpa cache)")
+    parser.add_argument("--vhdl", default=VHDL_FILE, help="Output entity FIR_HPF dengan koefisien terbaik")
+    parser.add_argument("--top", type=int, default=15, help="Jumlah kandidat lolos yang ditampilkan")
+    args = parser.parse_args()
+
+    x = capture_input(args.capture, args.channel) if args.capture else synthetic_input()
+    items = [('vhdl', COEFFS.tolist(), 16)] + candidates()
+    t0 = time.perf_counter()
+    results, computed = sweep(items, x, cache_path=args.cache or None, workers=args.workers)
+    elapsed = time.perf_counter() - t0
+    print(f"{len(items)} kandidat, {computed} dihitung (sisanya dari cache) dalam {elapsed:.1f} s, "
+          f"input {len(x)} sampel {'dari ' + args.capture if args.capture else 'sintetis'}")
+    print(f"Syarat: stopband <= {STOP_EDGE:.0f} Hz >= {STOPBAND_DB} dB, ripple >= {PASS_EDGE:.0f} Hz "
+          f"<= {PASS_RIPPLE_DB} dB, error RMS <= {ERROR_RMS_LSB} LSB, tanpa wrap output")
+    print("Kolom: gain = |output| terburuk / full-scale input, acc = lebar akumulator, worst = bit untuk "
+          "input terburuk, peak = bit terpakai pada input uji\n")
+
+    print("FIR_HPF.vhd sekarang:")
+    print_table(results[:1])
+    if results[0]["acc_worst_bits"] > results[0]["acc_bits"]:
+        print(f"  Peringatan: input terburuk butuh {results[0]['acc_worst_bits']} bit, fir_output hanya "
+              f"{results[0]['acc_bits']} bit (wrap)")
+    ok = sorted((r for r in results[1:] if passes(r)), key=cost)
+    print(f"\n{len(ok)} kandidat lolos, termurah:")
+    print_table(ok, args.top)
+
+    winner = best(results[1:])
+    if winner is None:
+        print("\nTidak ada kandidat yang lolos syarat")
+    else:
+        with open(args.vhdl, "w") as f:
+            f.write(vhdl_source(winner["coeffs"], winner["bits"], winner["frac"], winner["acc_bits"]))
+        print(f"\nTerbaik: {winner['taps']} tap, cutoff {winner['cutoff']:.0f} Hz, {winner['window']}, "
+              f"{winner['bits']}-bit (Q{winner['frac']}), akumulator {winner['acc_bits']} bit, "
+              f"output fir_output({winner['frac'] + 11} downto {winner['frac']}) -> {args.vhdl}")
+        print("Setelah dipakai, perbarui COEFFS, ACC_BITS dan OUT_LSB di fir_model.py")
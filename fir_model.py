@@ -0,0 +1,178 @@
+import numpy as np
+import re
+import time
+from ring_buffer import RingBuffer
+
+# --------- Config ---------
+ACC_BITS = 28               # Lebar fir_output
+OUT_MSB = 26                # fir_output(26 downto 15)
+OUT_LSB = 15
+MAX_DELAY = 64              # Rentang pencarian delay ch0 -> ch1 (sampel)
+VERIFY_WINDOW = 4096        # Jumlah sampel terakhir untuk estimasi delay
+RELOCK_MISMATCH = 0.05      # Cari ulang delay jika mismatch per blok melebihi ini
+# --------------------------
+
+# Koefisien dari FIR_HPF.vhd (Q15, 37 tap, simetris)
+COEFFS = np.array([
+    -2027, 318, 393, 499, 615, 704, 730, 665, 489, 190,
+    -227, -745, -1333, -1949, -2548, -3077, -3493, -3759, 28917, -3759,
+    -3493, -3077, -2548, -1949, -1333, -745, -227, 190, 489, 665,
+    730, 704, 615, 499, 393, 318, -2027,
+], dtype=np.int64)
+TAPS = len(COEFFS)
+
+
+def read_vhdl_coefficients(path='FIR_HPF.vhd'):
+    """Baca tabel koefisien to_signed(..., lebar) dari deklarasi coeffs di file VHDL"""
+    with open(path) as f:
+        text = f.read()
+    table = re.search(r"coeffs\s*:\s*coeff_array\s*:=\s*\((.*?)\);", text, re.S).group(1)
+    return np.array([int(v) for v in re.findall(r"to_signed\(\s*(-?\d+)\s*,\s*\d+\s*\)", table)],
+                    dtype=np.int64)
+
+
+def frequency_response(freqs, rate, coeffs=COEFFS, frac_bits=OUT_LSB):
+    """Respons frekuensi teoritis (kompleks) koefisien fixed-point pada frekuensi `freqs` (Hz)"""
+    k = np.arange(len(coeffs))
+    phase = np.exp(-2j * np.pi * np.outer(np.asarray(freqs) / rate, k))
+    return phase @ (np.asarray(coeffs) / (1 << frac_bits))
+
+
+class FirHpfModel:
+    """Model bit-exact datapath FIR_HPF.vhd untuk blok sampel
+
+    - Input 12-bit: signed(INPUT_ADC) + 2048 (wrap 12-bit) = x - 2048
+    - Akumulator 28-bit (wrap), output = fir_output(26 downto 15) + 2048
+    Riwayat 36 sampel terakhir dibawa ke blok berikutnya. Kondisi awal sama
+    dengan reset FPGA (signal_buffer berisi nol). `acc_bits` dan `out_lsb`
+    bisa diubah untuk kandidat koefisien lain (lihat fir_design.py).
+    """
+
+    def __init__(self, coeffs=COEFFS, acc_bits=ACC_BITS, out_lsb=OUT_LSB):
+        self.coeffs = np.asarray(coeffs, dtype=np.int64)
+        self.acc_bits = acc_bits
+        self.out_lsb = out_lsb
+        self._history = np.zeros(len(self.coeffs) - 1, dtype=np.int64)
+
+    def reset(self):
+        self._history[:] = 0
+
+    def process(self, block):
+        """Filter satu blok input 12-bit, return output 12-bit (int16)"""
+        x = np.asarray(block, dtype=np.int64) - 2048
+        if len(x) == 0:
+            return np.empty(0, dtype=np.int16)
+        padded = np.concatenate((self._history, x))
+        self._history = padded[len(padded) - len(self._history):]
+
+        acc = np.convolve(padded, self.coeffs, mode='valid')
+        acc &= (1 << self.acc_bits) - 1
+        out = (acc >> self.out_lsb) & 0xFFF
+        return ((out + 2048) & 0xFFF).astype(np.int16)
+
+
+class FirVerifier:
+    """Bandingkan channel 1 dari FPGA dengan model FIR dari channel 0
+
+    Delay ch0 -> ch1 (dalam sampel) dicari otomatis dan dicari ulang jika
+    mismatch naik. Catatan: FRAMING.vhd mengambil DATA0 di setiap frame,
+    bukan di setiap sample_enable, sehingga hasil bit-exact hanya dapat
+    diharapkan jika frame dikirim satu kali per sampel FIR.
+    """
+
+    def __init__(self, coeffs=COEFFS, max_delay=MAX_DELAY, window=VERIFY_WINDOW):
+        self.model = FirHpfModel(coeffs)
+        self.max_delay = max_delay
+        self.window = window
+        self._buffer = RingBuffer(window + max_delay, channels=2)   # (model, ch1)
+        self.delay = None           # Delay terkunci (sampel), None = belum lock
+        self.checked = 0
+        self.mismatches = 0
+        self.block_mismatch_rate = 0.0
+
+    @property
+    def mismatch_rate(self):
+        return self.mismatches / self.checked if self.checked else 0.0
+
+    def feed(self, data0, data1):
+        """Proses satu blok hasil decoder (ch0 = input FIR, ch1 = output FPGA)"""
+        n = len(data0)
+        if n == 0:
+            return
+        self._buffer.append(np.vstack((self.model.process(data0), data1)))
+
+        if self.delay is None or self.block_mismatch_rate > RELOCK_MISMATCH:
+            self._search_delay()
+        if self.delay is None:
+            return
+
+        # Bandingkan blok baru: ch1[i] harus sama dengan model[i - delay]
+        n = min(n, len(self._buffer) - self.delay)
+        if n <= 0:
+            return
+        win, _ = self._buffer.latest(n + self.delay)
+        bad = int(np.count_nonzero(win[1, self.delay:] != win[0, :n]))
+        self.checked += n
+        self.mismatches += bad
+        self.block_mismatch_rate = bad / n
+
+    def _search_delay(self):
+        """Cari delay dengan jumlah sampel cocok terbanyak pada window terakhir"""
+        length = len(self._buffer)
+        if length <= self.max_delay:
+            return
+        win, _ = self._buffer.latest(length)
+        model, ch1 = win[0], win[1]
+        span = length - self.max_delay
+        ref = ch1[self.max_delay:]
+        matches = [np.count_nonzero(ref == model[self.max_delay - d:self.max_delay - d + span])
+                   for d in range(self.max_delay + 1)]
+        self.delay = int(np.argmax(matches))
+        self.block_mismatch_rate = 1.0 - matches[self.delay] / span
+
+    def status(self):
+        """Ringkasan singkat untuk ditampilkan di plot"""
+        if self.delay is None:
+            return "FIR verify: menunggu data"
+        return (f"FIR verify: delay {self.delay} sampel, mismatch "
+                f"{self.block_mismatch_rate * 100:.1f}% (total {self.mismatch_rate * 100:.2f}%)")
+
+
+def reference_fir(x, coeffs=COEFFS):
+    """Implementasi loop per sampel, meniru register FIR_HPF.vhd satu per satu"""
+    buf = [0] * len(coeffs)
+    out = []
+    for value in x:
+        buf = [int(value) - 2048] + buf[:-1]
+        acc = sum(b * int(c) for b, c in zip(buf, coeffs)) & ((1 << ACC_BITS) - 1)
+        out.append((((acc >> OUT_LSB) & 0xFFF) + 2048) & 0xFFF)
+    return np.array(out, dtype=np.int16)
+
+
+if __name__ == "__main__":
+    from frame_decoder import FramingDecoder, encode_frames
+
+    # Laporan waktu decode + verifikasi (delay 3 sampel, beberapa sampel rusak);
+    # kebenaran model dan verifier diuji di tests/test_fir_model.py
+    fs = 20000
+    t = np.arange(fs * 2)
+    ch0 = (2048 + 1800 * np.sin(2 * np.pi * 1000 * t / fs)).astype(np.int64)
+    ch1 = np.concatenate((np.full(3, 2048), FirHpfModel().process(ch0)[:-3]))
+    ch1[5000:5010] ^= 1
+    stream = encode_frames(ch0, ch1)
+
+    decoder = FramingDecoder()
+    verifier = FirVerifier()
+    chunk = len(stream) // 100
+    t_decode = t_verify = 0.0
+    for i in range(0, len(stream), chunk):
+        t0 = time.perf_counter()
+        d0, d1 = decoder.feed(stream[i:i + chunk])
+        t1 = time.perf_counter()
+        verifier.feed(d0, d1)
+        t2 = time.perf_counter()
+        t_decode += t1 - t0
+        t_verify += t2 - t1
+    print(verifier.status())
+    print(f"Decode {t_decode * 1000:.1f} ms, verifikasi FIR {t_verify * 1000:.1f} ms "
+          f"untuk {len(t) / fs:.0f} s data @ {fs} Hz")
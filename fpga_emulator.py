@@ -0,0 +1,238 @@
+import argparse
+import errno
+import fcntl
+import os
+import pty
+import select
+import threading
+import time
+import tty
+import numpy as np
+from frame_decoder import StreamDecoder, encode_frames, encode_packed, PACKED_SETS
+from fir_model import FirHpfModel
+
+# --------- Config ---------
+CLOCK_HZ = 50000000
+SAMPLE_CLOCK_DIV = 2500     # Sama dengan FIR_HPF_UART.vhd
+SAMPLE_RATE = CLOCK_HZ // SAMPLE_CLOCK_DIV   # 20 kHz
+BLOCK_INTERVAL = 0.005      # s - interval penulisan blok ke pty
+MAX_PENDING = 1 << 20       # Byte maksimal yang ditahan jika tidak ada yang membaca
+SIGNAL = 'sine'             # 'sine', 'square', 'chirp', 'multi' atau 'noise'
+SIGNAL_FREQ = 1000.0        # Hz
+AMPLITUDE = 1800            # LSB
+OFFSET = 2048               # Tengah range 12-bit
+NOISE = 0.0                 # Standar deviasi noise (LSB)
+FRAME_FORMAT = 'framing'    # 'framing' (FRAMING.vhd) atau 'packed' (FRAMING_PACKED.vhd)
+# --------------------------
+
+
+class FpgaEmulator:
+    """Emulator FIR_HPF_UART: frame FRAMING.vhd dengan DATA0 = sinyal uji,
+    DATA1 = output model bit-exact FIR_HPF.vhd
+
+    Satu frame dikirim untuk setiap sampel (SAMPLE_RATE), atau untuk setiap
+    PACKED_SETS sampel pada format 'packed'. `speed` mengalikan laju byte
+    untuk load test. Korupsi byte dan byte hilang bisa diaktifkan dengan
+    `corrupt_rate` dan `drop_rate` (probabilitas per byte).
+    """
+
+    def __init__(self, signal=SIGNAL, freq=SIGNAL_FREQ, amplitude=AMPLITUDE, noise=NOISE,
+                 speed=1.0, corrupt_rate=0.0, drop_rate=0.0, seed=0, frame_format=FRAME_FORMAT):
+        self.signal = signal
+        self.freq = freq
+        self.amplitude = amplitude
+        self.noise = noise
+        self.speed = speed
+        self.corrupt_rate = corrupt_rate
+        self.drop_rate = drop_rate
+        self.frame_format = frame_format
+        self.fir = FirHpfModel()
+        self._carry = np.empty((2, 0), dtype=np.int64)   # Sampel yang belum mengisi frame packed
+        self._seq = 0
+        self.rng = np.random.default_rng(seed)
+        self.sample_index = 0
+        self.bytes_sent = 0
+        self.bytes_dropped = 0      # Byte yang dibuang karena tidak ada pembaca
+
+    def generate(self, n):
+        """Buat n sampel DATA0 (12-bit) mulai dari sample_index"""
+        t = (self.sample_index + np.arange(n)) / SAMPLE_RATE
+        phase = 2 * np.pi * self.freq * t
+        if self.signal == 'square':
+            wave = np.sign(np.sin(phase))
+        elif self.signal == 'chirp':
+            # Sweep 50 Hz .. SAMPLE_RATE/2 setiap 2 detik
+            span = t % 2.0
+            f0, f1 = 50.0, SAMPLE_RATE / 2
+            wave = np.sin(2 * np.pi * (f0 * span + (f1 - f0) * span ** 2 / 4.0))
+        elif self.signal == 'multi':
+            wave = (np.sin(phase) + np.sin(10 * phase) + np.sin(0.5 * phase)) / 3
+        elif self.signal == 'noise':
+            wave = self.rng.uniform(-1, 1, n)
+        else:  # sine
+            wave = np.sin(phase)
+
+        data = OFFSET + self.amplitude * wave
+        if self.noise > 0:
+            data += self.rng.normal(0, self.noise, n)
+        self.sample_index += n
+        return np.clip(np.rint(data), 0, 4095).astype(np.int64)
+
+    def next_block(self, n):
+        """Byte stream untuk n frame berikutnya (termasuk korupsi jika aktif)"""
+        data0 = self.generate(n)
+        data1 = self.fir.process(data0)
+        if self.frame_format == 'packed':
+            data = np.concatenate((self._carry, np.vstack((data0, data1))), axis=1)
+            frames = data.shape[1] // PACKED_SETS
+            self._carry = data[:, frames * PACKED_SETS:]
+            stream = np.frombuffer(encode_packed(data, PACKED_SETS, self._seq), dtype=np.uint8)
+            self._seq += frames
+        else:
+            stream = np.frombuffer(encode_frames(data0, data1), dtype=np.uint8)
+
+        if self.corrupt_rate > 0:
+            stream = stream.copy()
+            hit = self.rng.random(len(stream)) < self.corrupt_rate
+            stream[hit] = self.rng.integers(0, 256, int(hit.sum()), dtype=np.uint8)
+        if self.drop_rate > 0:
+            stream = stream[self.rng.random(len(stream)) >= self.drop_rate]
+        return stream.tobytes()
+
+    def run(self, fd, duration=None, stop_event=None):
+        """Tulis frame ke fd dengan laju SAMPLE_RATE * speed, diatur dari monotonic clock"""
+        flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+        fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+
+        pending = bytearray()
+        start = time.monotonic()
+        emitted = 0
+        while stop_event is None or not stop_event.is_set():
+            elapsed = time.monotonic() - start
+            if duration is not None and elapsed >= duration:
+                break
+
+            due = int(elapsed * SAMPLE_RATE * self.speed) - emitted
+            if due > 0:
+                pending += self.next_block(due)
+                emitted += due
+                if len(pending) > MAX_PENDING:
+                    # Seperti UART tanpa pembaca: data lama hilang
+                    self.bytes_dropped += len(pending) - MAX_PENDING
+                    del pending[:len(pending) - MAX_PENDING]
+
+            # Tulis sebanyak yang diterima pty, sisanya dicoba lagi di blok berikutnya
+            written = 0
+            view = memoryview(pending)
+            try:
+                while written < len(pending):
+                    written += os.write(fd, view[written:])
+            except BlockingIOError:
+                pass
+            except OSError as e:
+                if e.errno != errno.EIO:     # EIO = belum ada pembaca di sisi slave
+                    raise
+            finally:
+                view.release()
+            self.bytes_sent += written
+            del pending[:written]
+
+            if pending:
+                # Buffer pty penuh: tunggu sampai pembaca mengambil data
+                select.select([], [fd], [], BLOCK_INTERVAL)
+            else:
+                time.sleep(BLOCK_INTERVAL)
+
+
+def open_pty(link=None):
+    """Buka pty mode raw, return (master_fd, slave_fd, nama port)"""
+    master, slave = pty.openpty()
+    tty.setraw(slave)
+    name = os.ttyname(slave)
+    if link:
+        if os.path.lexists(link):
+            os.remove(link)
+        os.symlink(name, link)
+        name = link
+    return master, slave, name
+
+
+def load_test(speed, seconds=3.0, corrupt_rate=0.0, drop_rate=0.0, frame_format=FRAME_FORMAT):
+    """Jalankan emulator ke pty dan decode dari sisi slave, return laju sampel yang tercapai"""
+    master, slave, _ = open_pty()
+    emulator = FpgaEmulator(speed=speed, corrupt_rate=corrupt_rate, drop_rate=drop_rate,
+                            frame_format=frame_format)
+    stop = threading.Event()
+    thread = threading.Thread(target=emulator.run, args=(master, seconds, stop), daemon=True)
+
+    fcntl.fcntl(slave, fcntl.F_SETFL, fcntl.fcntl(slave, fcntl.F_GETFL) | os.O_NONBLOCK)
+    decoder = StreamDecoder()
+    reference = FirHpfModel()
+    ch1_errors = 0
+    samples = 0
+    t0 = time.monotonic()
+    thread.start()
+    while thread.is_alive() or time.monotonic() - t0 < seconds + 0.5:
+        try:
+            chunk = os.read(slave, 1 << 16)
+        except BlockingIOError:
+            chunk = b""
+        if not chunk:
+            if not thread.is_alive():
+                break
+            select.select([slave], [], [], 0.01)
+            continue
+        block = decoder.feed(chunk)
+        samples += block.shape[1]
+        if not corrupt_rate and not drop_rate:
+            ch1_errors += int(np.count_nonzero(reference.process(block[0]) != block[1]))
+    elapsed = time.monotonic() - t0
+    stop.set()
+    os.close(master)
+    os.close(slave)
+
+    expected = SAMPLE_RATE * speed
+    rate = samples / elapsed
+    print(f"speed {speed:>5}x {decoder.format}: {rate:>12,.0f} sampel/s (target {expected:,.0f}), "
+          f"resync {decoder.resync_count}, frame hilang {decoder.lost_frames}, byte dibuang {decoder.dropped_bytes}, "
+          f"mismatch ch1 {ch1_errors}, overrun emulator {emulator.bytes_dropped} byte")
+    return rate / expected
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Emulator FPGA FIR_HPF_UART lewat pseudo-terminal")
+    parser.add_argument("--signal", default=SIGNAL, choices=['sine', 'square', 'chirp', 'multi', 'noise'])
+    parser.add_argument("--freq", type=float, default=SIGNAL_FREQ)
+    parser.add_argument("--amplitude", type=float, default=AMPLITUDE)
+    parser.add_argument("--noise", type=float, default=NOISE)
+    parser.add_argument("--speed", type=float, default=1.0, help="Pengali laju byte (1, 10, 100, ...)")
+    parser.add_argument("--corrupt-rate", type=float, default=0.0, help="Probabilitas byte korup")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Probabilitas byte hilang")
+    parser.add_argument("--format", default=FRAME_FORMAT, choices=['framing', 'packed'],
+                        help="Format frame: FRAMING.vhd atau FRAMING_PACKED.vhd")
+    parser.add_argument("--link", help="Buat symlink ke pty, misalnya /tmp/fpga0")
+    parser.add_argument("--duration", type=float, help="Berhenti setelah N detik")
+    parser.add_argument("--load-test", action="store_true", help="Load test decoder pada 1x, 10x dan 100x")
+    args = parser.parse_args()
+
+    if args.load_test:
+        for speed in (1, 10, 100):
+            ratio = load_test(speed, corrupt_rate=args.corrupt_rate, drop_rate=args.drop_rate,
+                              frame_format=args.format)
+            if ratio < 0.9:
+                print(f"  Host tidak dapat mengikuti {speed}x ({ratio * 100:.0f}% dari target)")
+    else:
+        master, slave, name = open_pty(args.link)
+        emulator = FpgaEmulator(args.signal, args.freq, args.amplitude, args.noise,
+                                args.speed, args.corrupt_rate, args.drop_rate, frame_format=args.format)
+        print(f"Emulator FPGA aktif di {name}")
+        print(f"  {SAMPLE_RATE * args.speed:,.0f} sampel/s ({args.format}), sinyal {args.signal} {args.freq} Hz")
+        print(f"  Gunakan SERIAL_PORT = '{name}' di dual_plotter.py")
+        try:
+            emulator.run(master, args.duration)
+        except KeyboardInterrupt:
+            print("Stopping...")
+        finally:
+            print(f"{emulator.bytes_sent} byte terkirim, {emulator.bytes_dropped} byte dibuang")
+            if args.link and os.path.islink(args.link):
+                os.remove(args.link)
@@ -0,0 +1,511 @@
+import bisect
+import numpy as np
+import time
+
+# --------- Config ---------
+START_MARKER = 0x53         # 'S'
+END_MARKER = 0x45           # 'E'
+FRAME_SIZE = 6              # S, D0_HIGH, D0_LOW, D1_HIGH, D1_LOW, E
+BAUD_RATE = 2000000
+PACKED_SYNC = (0xA5, 0x5A)  # Sync word FRAMING_PACKED.vhd
+PACKED_HEADER = 4           # Sync (2), SEQ, INFO
+CRC8_POLY = 0x07            # CRC-8 FRAMING_PACKED.vhd (init 0x00)
+PACKED_SETS = 8             # Default SETS FRAMING_PACKED.vhd
+DETECT_FRAMES = 4           # Frame valid yang dibutuhkan untuk memilih format
+REALIGN_CONFIRM = 4         # Pasangan valid setelah pasangan rusak untuk membedakan noise dan byte hilang
+# --------------------------
+
+# Byte per detik di UART (8N1 = 10 bit per byte)
+LINE_BYTES_PER_SEC = BAUD_RATE // 10
+LINE_FRAMES_PER_SEC = LINE_BYTES_PER_SEC / FRAME_SIZE
+
+
+def _crc8_table(poly=CRC8_POLY):
+    table = np.arange(256, dtype=np.uint16)
+    for _ in range(8):
+        table = np.where(table & 0x80, (table << 1) ^ poly, table << 1) & 0xFF
+    return table.astype(np.uint8)
+
+
+CRC8_TABLE = _crc8_table()
+# Ukuran frame packed maksimal (16 channel x 16 set)
+PACKED_MAX_SIZE = PACKED_HEADER + 3 * 128 + 1
+
+
+def packed_frame_size(channels, sets):
+    """Jumlah byte satu frame FRAMING_PACKED.vhd"""
+    return PACKED_HEADER + 3 * ((channels * sets + 1) // 2) + 1
+
+
+def crc8(rows):
+    """CRC-8 setiap baris array byte (m, k), vectorized per kolom"""
+    rows = np.asarray(rows, dtype=np.uint8)
+    crc = np.zeros(rows.shape[0], dtype=np.uint8)
+    for column in rows.T:
+        crc = CRC8_TABLE[crc ^ column]
+    return crc
+
+
+def parse_frame_data(frame_bytes):
+    """Parse satu frame sesuai format FRAMING.vhd"""
+    if len(frame_bytes) != FRAME_SIZE:
+        return None, None
+
+    # Check start and end markers
+    if frame_bytes[0] != START_MARKER or frame_bytes[5] != END_MARKER:
+        return None, None
+
+    data0 = (frame_bytes[1] << 4) | (frame_bytes[2] >> 4)
+    data1 = (frame_bytes[3] << 4) | (frame_bytes[4] >> 4)
+    return data0, data1
+
+
+class FramingDecoder:
+    """Decoder frame FRAMING.vhd per blok byte (vectorized dengan NumPy)
+
+    Setiap frame: 'S', DATA0[11:4], DATA0[3:0]&"0000", DATA1[11:4],
+    DATA1[3:0]&"0000", 'E'. Frame valid jika marker cocok dan 4 bit bawah
+    byte LOW bernilai nol. Sisa frame yang belum lengkap disimpan untuk
+    chunk berikutnya.
+    """
+
+    def __init__(self):
+        self._pending = np.empty(0, dtype=np.uint8)
+        self.frame_count = 0        # Jumlah frame valid
+        self.dropped_bytes = 0      # Byte yang dibuang saat resync
+        self.resync_count = 0       # Berapa kali decoder kehilangan sinkronisasi
+        self.bad_frames = 0         # Kandidat frame ditolak: marker 'S' di luar frame valid
+
+    def reset(self):
+        """Buang sisa byte (misalnya setelah error serial)"""
+        self._pending = np.empty(0, dtype=np.uint8)
+
+    def feed(self, chunk):
+        """Decode semua frame dalam chunk, return (data0, data1) sebagai array int16"""
+        new = np.frombuffer(chunk, dtype=np.uint8)
+        if len(self._pending):
+            buf = np.concatenate((self._pending, new))
+        else:
+            buf = new
+        n = len(buf)
+
+        if n < FRAME_SIZE:
+            self._pending = buf.copy()
+            return np.empty(0, np.int16), np.empty(0, np.int16)
+
+        # Cari semua posisi frame yang valid sekaligus
+        last = n - FRAME_SIZE + 1
+        valid = ((buf[:last] == START_MARKER)
+                 & (buf[FRAME_SIZE - 1:] == END_MARKER)
+                 & ((buf[2:last + 2] & 0x0F) == 0)
+                 & ((buf[4:last + 4] & 0x0F) == 0))
+        starts = np.flatnonzero(valid)
+
+        # Frame yang overlap hanya muncul jika data korup -> utamakan kandidat yang bersambung
+        if len(starts) > 1 and np.any(np.diff(starts) < FRAME_SIZE):
+            starts = self._resolve_overlaps(starts, end=n)
+
+        if len(starts):
+            consumed = starts[-1] + FRAME_SIZE
+            # Byte yang dilewati sebelum setiap frame (0 jika stream bersih)
+            gaps = np.diff(starts, prepend=-FRAME_SIZE) - FRAME_SIZE
+            self.dropped_bytes += int(gaps.sum())
+            self.resync_count += int(np.count_nonzero(gaps))
+            self.frame_count += len(starts)
+        else:
+            consumed = 0
+
+        # Simpan maksimal FRAME_SIZE-1 byte terakhir untuk frame yang terpotong
+        keep_from = max(consumed, n - (FRAME_SIZE - 1))
+        self.dropped_bytes += keep_from - consumed
+        self._pending = buf[keep_from:].copy()
+
+        # Hanya jika ada byte di luar frame valid: hitung marker 'S' di sana (byte
+        # sisa di _pending dihitung pada chunk berikutnya, tidak dua kali)
+        if keep_from > len(starts) * FRAME_SIZE:
+            markers = np.flatnonzero(buf[:keep_from] == START_MARKER)
+            if len(starts):
+                i = np.maximum(np.searchsorted(starts, markers, side='right') - 1, 0)
+                markers = markers[(markers < starts[i]) | (markers - starts[i] >= FRAME_SIZE)]
+            self.bad_frames += len(markers)
+
+        hi0 = buf[starts + 1].astype(np.int16)
+        lo0 = buf[starts + 2].astype(np.int16)
+        hi1 = buf[starts + 3].astype(np.int16)
+        lo1 = buf[starts + 4].astype(np.int16)
+        data0 = (hi0 << 4) | (lo0 >> 4)
+        data1 = (hi1 << 4) | (lo1 >> 4)
+        return data0, data1
+
+    @staticmethod
+    def _resolve_overlaps(starts, size=FRAME_SIZE, end=None):
+        """Pilih frame yang tidak saling overlap, utamakan kandidat yang bersambung
+
+        Kandidat yang diikuti frame valid tepat `size` byte sesudahnya (atau
+        yang frame berikutnya belum lengkap di buffer, `end`) dipilih lebih
+        dulu dari kiri ke kanan; kandidat lain hanya diambil jika tidak
+        overlap dengan yang sudah dipilih. Kandidat palsu dari data sampel
+        jarang bersambung, sehingga frame asli sesudahnya tidak ikut dibuang.
+        Di ujung chunk (tanpa informasi frame berikutnya) konflik tetap
+        diputuskan dari kiri. Untuk FRAMING.vhd frame utuh tidak bisa
+        di-overlap kandidat palsu (marker 'S' / 'E' frame asli selalu jatuh
+        di posisi byte LOW kandidat), jadi ini terutama berlaku untuk format packed.
+        """
+        chained = np.isin(starts + size, starts)
+        if end is not None:
+            chained |= starts + 2 * size > end
+        keep = []
+        for group in (starts[chained], starts[~chained]):
+            for s in group.tolist():
+                i = bisect.bisect_left(keep, s)
+                if (i == 0 or keep[i - 1] + size <= s) and (i == len(keep) or s + size <= keep[i]):
+                    keep.insert(i, s)
+        return np.asarray(keep, dtype=starts.dtype)
+
+
+def encode_frames(data0, data1):
+    """Buat byte stream FRAMING.vhd dari array sampel (untuk pengujian)"""
+    data0 = np.asarray(data0, dtype=np.uint16) & 0xFFF
+    data1 = np.asarray(data1, dtype=np.uint16) & 0xFFF
+    frames = np.empty((len(data0), FRAME_SIZE), dtype=np.uint8)
+    frames[:, 0] = START_MARKER
+    frames[:, 1] = data0 >> 4
+    frames[:, 2] = (data0 & 0x0F) << 4
+    frames[:, 3] = data1 >> 4
+    frames[:, 4] = (data1 & 0x0F) << 4
+    frames[:, 5] = END_MARKER
+    return frames.tobytes()
+
+
+class PackedDecoder:
+    """Decoder frame FRAMING_PACKED.vhd per blok byte (vectorized dengan NumPy)
+
+    Setiap frame: A5 5A, SEQ, INFO = (CHANNELS-1) & (SETS-1), pasangan
+    sampel 12-bit dalam 3 byte, CRC-8. Jumlah channel dan set diambil dari
+    frame pertama dengan CRC valid (atau ditentukan di konstruktor), lalu
+    semua kandidat sync dalam satu chunk dicek CRC-nya sekaligus. Frame
+    hilang dihitung dari loncatan SEQ.
+    """
+
+    def __init__(self, channels=None, sets=None):
+        self._fixed = channels is not None and sets is not None
+        self.channels = channels
+        self.sets = sets
+        self._pending = np.empty(0, dtype=np.uint8)
+        self._last_seq = None
+        self.frame_count = 0        # Jumlah frame valid
+        self.lost_frames = 0        # Frame yang hilang menurut SEQ
+        self.crc_errors = 0         # Kandidat frame (sync + INFO cocok) dengan CRC salah
+        self.dropped_bytes = 0      # Byte yang dibuang saat resync
+        self.resync_count = 0       # Berapa kali decoder kehilangan sinkronisasi
+
+    @property
+    def frame_size(self):
+        return packed_frame_size(self.channels, self.sets) if self.channels else PACKED_MAX_SIZE
+
+    def reset(self):
+        """Buang sisa byte (misalnya setelah error serial)"""
+        self._pending = np.empty(0, dtype=np.uint8)
+        self._last_seq = None
+
+    def _empty(self):
+        return np.empty((self.channels or 2, 0), dtype=np.int16)
+
+    def _lock(self, buf, candidates):
+        """Ambil format dari kandidat pertama yang CRC-nya valid"""
+        for s in candidates.tolist():
+            info = int(buf[s + 3])
+            channels, sets = (info >> 4) + 1, (info & 0x0F) + 1
+            size = packed_frame_size(channels, sets)
+            if s + size <= len(buf) and crc8(buf[None, s + 2:s + size - 1])[0] == buf[s + size - 1]:
+                self.channels, self.sets = channels, sets
+                return True
+        return False
+
+    def feed(self, chunk):
+        """Decode semua frame dalam chunk, return array int16 (channels, n sampel)"""
+        new = np.frombuffer(chunk, dtype=np.uint8)
+        buf = np.concatenate((self._pending, new)) if len(self._pending) else new
+        n = len(buf)
+
+        candidates = np.flatnonzero((buf[:-1] == PACKED_SYNC[0]) & (buf[1:] == PACKED_SYNC[1]))
+        candidates = candidates[candidates + PACKED_HEADER <= n]
+        if self.channels is None and not self._lock(buf, candidates):
+            keep_from = max(0, n - (PACKED_MAX_SIZE - 1))
+            self.dropped_bytes += keep_from
+            self._pending = buf[keep_from:].copy()
+            return self._empty()
+
+        size = self.frame_size
+        info = ((self.channels - 1) << 4) | (self.sets - 1)
+        candidates = candidates[(candidates + size <= n)]
+        candidates = candidates[buf[candidates + 3] == info]
+        if len(candidates):
+            body = buf[candidates[:, None] + np.arange(2, size - 1)]
+            valid = crc8(body) == buf[candidates + size - 1]
+            self.crc_errors += int(np.count_nonzero(~valid))
+            starts = candidates[valid]
+        else:
+            starts = candidates
+
+        # Sync word di dalam payload bisa lolos CRC (1/256) -> utamakan kandidat yang bersambung
+        if len(starts) > 1 and np.any(np.diff(starts) < size):
+            starts = FramingDecoder._resolve_overlaps(starts, size, n)
+
+        if len(starts):
+            consumed = starts[-1] + size
+            gaps = np.diff(starts, prepend=-size) - size
+            self.dropped_bytes += int(gaps.sum())
+            self.resync_count += int(np.count_nonzero(gaps))
+            self.frame_count += len(starts)
+
+            seq = buf[starts + 2].astype(np.int64)
+            previous = seq[0] - 1 if self._last_seq is None else self._last_seq
+            self.lost_frames += int(((np.diff(seq, prepend=previous) - 1) % 256).sum())
+            self._last_seq = int(seq[-1])
+        else:
+            consumed = 0
+
+        keep_from = max(consumed, n - (size - 1))
+        self.dropped_bytes += keep_from - consumed
+        self._pending = buf[keep_from:].copy()
+        if not len(starts):
+            return self._empty()
+
+        # 3 byte -> 2 sampel: a = b0 b1[7:4], b = b1[3:0] b2
+        pairs = (size - PACKED_HEADER - 1) // 3
+        payload = buf[starts[:, None] + np.arange(PACKED_HEADER, size - 1)].reshape(-1, pairs, 3)
+        payload = payload.astype(np.int16)
+        samples = np.empty((len(starts), pairs, 2), dtype=np.int16)
+        samples[:, :, 0] = (payload[:, :, 0] << 4) | (payload[:, :, 1] >> 4)
+        samples[:, :, 1] = ((payload[:, :, 1] & 0x0F) << 8) | payload[:, :, 2]
+        samples = samples.reshape(len(starts), -1)[:, :self.channels * self.sets]
+        return samples.reshape(-1, self.channels).T.copy()
+
+
+class StreamDecoder:
+    """Decoder dengan deteksi format otomatis: FRAMING.vhd atau FRAMING_PACKED.vhd
+
+    Byte pertama ditahan sampai salah satu format menghasilkan DETECT_FRAMES
+    frame valid, lalu semua byte diteruskan ke decoder format tersebut.
+    `feed` selalu return array int16 (channels, n). Jika `frame_format`
+    diberikan ('framing' / 'packed'), deteksi dilewati.
+    """
+
+    def __init__(self, frame_format=None):
+        self.decoder = None
+        self.format = None          # 'framing' atau 'packed' setelah terdeteksi
+        self._probe = bytearray()
+        if frame_format is not None:
+            if frame_format not in ('framing', 'packed'):
+                raise ValueError(f"Format frame tidak dikenal: {frame_format}")
+            self.format = frame_format
+            self.decoder = PackedDecoder() if frame_format == 'packed' else FramingDecoder()
+
+    def _count(self, name):
+        # Counter decoder aktif (FramingDecoder tanpa lost_frames / crc_errors, PackedDecoder tanpa bad_frames)
+        return getattr(self.decoder, name, 0) if self.decoder is not None else 0
+
+    frame_count = property(lambda self: self._count('frame_count'))
+    bad_frames = property(lambda self: self._count('bad_frames'))
+    lost_frames = property(lambda self: self._count('lost_frames'))
+    crc_errors = property(lambda self: self._count('crc_errors'))
+    dropped_bytes = property(lambda self: self._count('dropped_bytes'))
+    resync_count = property(lambda self: self._count('resync_count'))
+
+    @property
+    def channels(self):
+        return getattr(self.decoder, 'channels', 2) or 2
+
+    def reset(self):
+        if self.decoder is not None:
+            self.decoder.reset()
+        self._probe.clear()
+
+    def _decode(self, chunk):
+        if self.format == 'framing':
+            return np.vstack(self.decoder.feed(chunk))
+        return self.decoder.feed(chunk)
+
+    def feed(self, chunk):
+        """Decode chunk, return array int16 (channels, n sampel)"""
+        if self.decoder is not None:
+            return self._decode(chunk)
+
+        self._probe += chunk
+        probe = bytes(self._probe)
+        framing, packed = FramingDecoder(), PackedDecoder()
+        framing.feed(probe)
+        packed.feed(probe)
+        if max(framing.frame_count, packed.frame_count) < DETECT_FRAMES:
+            if len(self._probe) > 64 * PACKED_MAX_SIZE:
+                del self._probe[:-PACKED_MAX_SIZE]
+            return np.empty((2, 0), dtype=np.int16)
+
+        self.format = 'packed' if packed.frame_count > framing.frame_count else 'framing'
+        self.decoder = PackedDecoder() if self.format == 'packed' else FramingDecoder()
+        self._probe.clear()
+        return self._decode(probe)
+
+
+class PairDecoder:
+    """Decoder stream dua byte tanpa frame (optimized_plotter): v[11:4], v[3:0]&"0000"
+
+    Pasangan di-decode per chunk dengan NumPy. Alignment diperiksa dari 4
+    bit bawah byte LOW yang selalu nol. Pada pasangan pertama yang tidak
+    valid, REALIGN_CONFIRM pasangan berikutnya menentukan penyebabnya:
+    jika alignment sekarang tetap valid, hanya pasangan itu yang dibuang
+    (byte korup); jika tidak, decoder bergeser satu byte (byte hilang atau
+    sisipan) dan `realign_count` bertambah.
+    """
+
+    def __init__(self):
+        self._pending = np.empty(0, dtype=np.uint8)
+        self.sample_count = 0       # Jumlah sampel valid
+        self.realign_count = 0      # Berapa kali alignment digeser satu byte
+        self.corrupt_pairs = 0      # Pasangan rusak yang dibuang tanpa realign
+        self.dropped_bytes = 0      # Byte yang dibuang (realign + pasangan rusak)
+
+    def reset(self):
+        """Buang sisa byte (misalnya setelah error serial)"""
+        self._pending = np.empty(0, dtype=np.uint8)
+
+    @staticmethod
+    def _decode(pairs):
+        return (pairs[0::2].astype(np.int16) << 4) | (pairs[1::2] >> 4)
+
+    def feed(self, chunk):
+        """Decode semua pasangan dalam chunk, return array int16"""
+        new = np.frombuffer(chunk, dtype=np.uint8)
+        buf = np.concatenate((self._pending, new)) if len(self._pending) else new
+        n = len(buf)
+        confirm = 2 * (REALIGN_CONFIRM + 1)
+        out = []
+        pos = 0
+        while n - pos >= 2:
+            end = pos + (n - pos) // 2 * 2
+            bad = np.flatnonzero(buf[pos + 1:end:2] & 0x0F)
+            if not len(bad):
+                out.append(self._decode(buf[pos:end]))
+                pos = end
+                break
+            # Pasangan valid sebelum pasangan rusak pertama
+            k = int(bad[0])
+            out.append(self._decode(buf[pos:pos + 2 * k]))
+            pos += 2 * k
+            if n - pos < confirm:
+                break               # Tunggu byte berikutnya untuk memutuskan
+            if not np.any(buf[pos + 3:pos + confirm:2] & 0x0F):
+                # Alignment tetap benar setelahnya: satu pasangan korup
+                pos += 2
+                self.corrupt_pairs += 1
+                self.dropped_bytes += 2
+            else:
+                pos += 1
+                self.realign_count += 1
+                self.dropped_bytes += 1
+
+        self._pending = buf[pos:].copy()
+        values = np.concatenate(out) if out else np.empty(0, np.int16)
+        self.sample_count += len(values)
+        return values
+
+
+def encode_pairs(values):
+    """Buat stream dua byte optimized_plotter dari array sampel (untuk pengujian)"""
+    values = np.asarray(values, dtype=np.uint16) & 0xFFF
+    out = np.empty(2 * len(values), dtype=np.uint8)
+    out[0::2] = values >> 4
+    out[1::2] = (values & 0x0F) << 4
+    return out.tobytes()
+
+
+def encode_packed(data, sets=PACKED_SETS, seq=0):
+    """Buat byte stream FRAMING_PACKED.vhd dari array (channels, n) (untuk pengujian)
+
+    Sampel sisa yang tidak mengisi satu frame penuh tidak dikirim.
+    """
+    data = np.asarray(data, dtype=np.uint16).reshape(len(data), -1) & 0xFFF
+    channels = data.shape[0]
+    frames = data.shape[1] // sets
+    pairs = (channels * sets + 1) // 2
+    size = packed_frame_size(channels, sets)
+
+    # Urutan sampel per frame: set lalu channel, ditambah 0 jika ganjil
+    samples = np.zeros((frames, 2 * pairs), dtype=np.uint16)
+    ordered = data[:, :frames * sets].reshape(channels, frames, sets).transpose(1, 2, 0)
+    samples[:, :channels * sets] = ordered.reshape(frames, channels * sets)
+    a, b = samples[:, 0::2], samples[:, 1::2]
+
+    out = np.empty((frames, size), dtype=np.uint8)
+    out[:, 0], out[:, 1] = PACKED_SYNC
+    out[:, 2] = (seq + np.arange(frames)) & 0xFF
+    out[:, 3] = ((channels - 1) << 4) | (sets - 1)
+    payload = out[:, PACKED_HEADER:size - 1].reshape(frames, pairs, 3)
+    payload[:, :, 0] = a >> 4
+    payload[:, :, 1] = ((a & 0x0F) << 4) | (b >> 8)
+    payload[:, :, 2] = b & 0xFF
+    out[:, -1] = crc8(out[:, 2:-1])
+    return out.tobytes()
+
+
+def throughput_test(seconds=10.0, chunk_size=4096):
+    """Kecepatan decode FRAMING dibanding line rate 2 Mbaud, return margin (kali line rate)"""
+    n_frames = int(LINE_FRAMES_PER_SEC * seconds)
+    rng = np.random.default_rng(0)
+    stream = encode_frames(rng.integers(0, 4096, n_frames), rng.integers(0, 4096, n_frames))
+
+    decoder = FramingDecoder()
+    t0 = time.perf_counter()
+    for i in range(0, len(stream), chunk_size):
+        decoder.feed(stream[i:i + chunk_size])
+    elapsed = time.perf_counter() - t0
+    if decoder.frame_count != n_frames:
+        raise RuntimeError(f"{decoder.frame_count} dari {n_frames} frame ter-decode")
+
+    rate = n_frames / elapsed
+    margin = rate / LINE_FRAMES_PER_SEC
+    print(f"Decode {n_frames} frame dalam {elapsed * 1000:.1f} ms")
+    print(f"  {rate:,.0f} frame/s (line rate {LINE_FRAMES_PER_SEC:,.0f} frame/s, margin {margin:.0f}x)")
+    return margin
+
+
+def packed_throughput_test(seconds=10.0, sets=PACKED_SETS, chunk_size=4096):
+    """Kecepatan decode FRAMING_PACKED (2 channel) dibanding line rate, return margin"""
+    rng = np.random.default_rng(0)
+    # Sampel per detik di line rate yang sama (per channel, dua channel)
+    line = LINE_BYTES_PER_SEC / packed_frame_size(2, sets) * sets
+    print(f"Line rate 2 channel: packed {line:,.0f} sampel/s, FRAMING {LINE_FRAMES_PER_SEC:,.0f} sampel/s "
+          f"({line / LINE_FRAMES_PER_SEC:.2f}x)")
+
+    stream = encode_packed(rng.integers(0, 4096, (2, int(line * seconds) // sets * sets)), sets)
+    decoder = PackedDecoder()
+    t0 = time.perf_counter()
+    for i in range(0, len(stream), chunk_size):
+        decoder.feed(stream[i:i + chunk_size])
+    elapsed = time.perf_counter() - t0
+    margin = decoder.frame_count * sets / elapsed / line
+    print(f"  Decode {seconds:g} s data dalam {elapsed * 1000:.1f} ms (margin {margin:.0f}x)")
+    return margin
+
+
+def pair_throughput_test(seconds=5.0, chunk_size=4096):
+    """Kecepatan decode stream dua byte dibanding line rate, return margin"""
+    rng = np.random.default_rng(0)
+    stream = encode_pairs(rng.integers(0, 4096, int(LINE_BYTES_PER_SEC * seconds) // 2))
+    decoder = PairDecoder()
+    t0 = time.perf_counter()
+    for i in range(0, len(stream), chunk_size):
+        decoder.feed(stream[i:i + chunk_size])
+    elapsed = time.perf_counter() - t0
+    margin = decoder.sample_count / elapsed / (LINE_BYTES_PER_SEC / 2)
+    print(f"Decode {decoder.sample_count} sampel dua byte dalam {elapsed * 1000:.1f} ms "
+          f"(line rate {LINE_BYTES_PER_SEC // 2:,} sampel/s, margin {margin:.0f}x)")
+    return margin
+
+
+if __name__ == "__main__":
+    # Laporan throughput; kebenaran decode dan batas margin diuji di tests/test_frame_decoder.py
+    throughput_test()
+    packed_throughput_test()
+    pair_throughput_test()
@@ -0,0 +1,228 @@
+import collections
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --------- Config ---------
+SAMPLE_RATE = 20000         # Hz, sample rate yang diharapkan (50 MHz / 2500)
+RATE_WINDOW = 2.0           # s - window pengukuran sample rate efektif
+STALL_TIME = 0.25           # s - tanpa data lebih lama dari ini dihitung sebagai stall reader
+BACKLOG_LEVEL = 3072        # Byte menunggu di buffer serial: host tertinggal, buffer OS hampir penuh
+METRICS_INTERVAL = 1.0      # s - interval flush file metrics
+METRIC_PREFIX = "fpga_link_"
+# --------------------------
+
+# Counter decoder yang diekspor jika ada (StreamDecoder, FramingDecoder, PackedDecoder, PairDecoder)
+DECODER_COUNTERS = ('frame_count', 'bad_frames', 'crc_errors', 'lost_frames', 'resync_count',
+                    'realign_count', 'dropped_bytes')
+
+
+class LinkStats:
+    """Counter kesehatan link UART: byte, frame, resync, backlog, stall, sample rate efektif
+
+    Hot path reader hanya memanggil `record` sekali per chunk (beberapa
+    penjumlahan integer dan satu monotonic clock). Counter frame, marker
+    dan resync dibaca langsung dari decoder saat `snapshot`, sehingga
+    decode tidak dibebani. `snapshot` dipanggil dari thread plot atau
+    exporter; nilainya cukup konsisten untuk monitoring (tanpa lock di
+    hot path).
+    """
+
+    def __init__(self, decoder=None, expected_rate=SAMPLE_RATE, window=RATE_WINDOW,
+                 stall_time=STALL_TIME, backlog_level=BACKLOG_LEVEL):
+        self.decoder = decoder
+        self.expected_rate = expected_rate
+        self.window = window
+        self.stall_time = stall_time
+        self.backlog_level = backlog_level
+        self.started = time.monotonic()
+        self.bytes_received = 0
+        self.chunks = 0
+        self.samples = 0
+        self.backlog_high = 0       # Chunk yang dibaca saat buffer serial >= backlog_level (bukan overrun
+                                    # sesungguhnya: byte belum hilang, tapi host tertinggal)
+        self.stalls = 0             # Jeda tanpa data > stall_time
+        self.longest_stall = 0.0
+        self.errors = 0             # Exception di reader
+        self.last_error = ""
+        self._last_data = None
+        self._history = collections.deque()
+        self._lock = threading.Lock()
+
+    def record(self, nbytes, nsamples, waiting=0):
+        """Catat satu chunk (dipanggil reader setiap chunk, bukan setiap frame)"""
+        now = time.monotonic()
+        if self._last_data is not None:
+            gap = now - self._last_data
+            if gap > self.stall_time:
+                self.stalls += 1
+                if gap > self.longest_stall:
+                    self.longest_stall = gap
+        self._last_data = now
+        self.bytes_received += nbytes
+        self.samples += nsamples
+        self.chunks += 1
+        if waiting >= self.backlog_level:
+            self.backlog_high += 1
+
+    def error(self, exc):
+        self.errors += 1
+        self.last_error = str(exc)
+
+    def rate(self, now=None):
+        """Sample rate efektif (sampel/s) dalam window terakhir"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            history = self._history
+            history.append((now, self.samples))
+            while len(history) > 2 and now - history[1][0] >= self.window:
+                history.popleft()
+            t0, s0 = history[0]
+        return (self.samples - s0) / (now - t0) if now > t0 else 0.0
+
+    def snapshot(self):
+        """Semua counter sebagai dict (untuk overlay dan export)"""
+        now = time.monotonic()
+        rate = self.rate(now)
+        idle = now - self._last_data if self._last_data is not None else now - self.started
+        stats = {
+            "uptime_s": now - self.started,
+            "bytes_received": self.bytes_received,
+            "chunks": self.chunks,
+            "samples": self.samples,
+            "sample_rate": rate,
+            "expected_rate": self.expected_rate,
+            "rate_ratio": rate / self.expected_rate if self.expected_rate else 0.0,
+            "backlog_high": self.backlog_high,
+            "stalls": self.stalls,
+            "longest_stall_s": self.longest_stall,
+            "idle_s": idle,
+            "errors": self.errors,
+        }
+        for name in DECODER_COUNTERS:
+            value = getattr(self.decoder, name, None)
+            if value is not None:
+                stats[name] = int(value)
+        decoder_format = getattr(self.decoder, 'format', None)
+        if decoder_format:
+            stats["format"] = decoder_format
+        return stats
+
+    def summary(self, stats=None):
+        """Teks overlay dua baris"""
+        s = self.snapshot() if stats is None else stats
+        line = (f"Link {s['sample_rate'] / 1000:6.2f}k sampel/s ({s['rate_ratio'] * 100:5.1f}% dari "
+                f"{s['expected_rate'] / 1000:.1f}k)  {s['bytes_received'] / 1e6:.2f} MB")
+        if s['idle_s'] > self.stall_time:
+            line += f"  TIDAK ADA DATA {s['idle_s']:.1f} s"
+        counters = [f"{label} {s[name]}" for name, label in
+                    (('frame_count', 'frame'), ('bad_frames', 'bad'), ('crc_errors', 'crc'),
+                     ('lost_frames', 'hilang'), ('resync_count', 'resync'), ('realign_count', 'realign'),
+                     ('dropped_bytes', 'drop B')) if name in s]
+        counters += [f"backlog {s['backlog_high']}", f"stall {s['stalls']}", f"error {s['errors']}"]
+        return line + "\n" + "  ".join(counters)
+
+
+def prometheus_text(stats, prefix=METRIC_PREFIX):
+    """Format text exposition Prometheus dari snapshot"""
+    lines = []
+    for name, value in stats.items():
+        if isinstance(value, (int, float)):
+            lines.append(f"{prefix}{name} {value}")
+    if "format" in stats:
+        lines.append(f'{prefix}info{{format="{stats["format"]}"}} 1')
+    return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """Export snapshot LinkStats: file JSON yang di-flush periodik dan/atau HTTP lokal
+
+    File ditulis atomik (tmp + rename) setiap `interval` detik oleh thread
+    sendiri. HTTP: GET /metrics (format Prometheus) dan /metrics.json,
+    hanya di 127.0.0.1.
+    """
+
+    def __init__(self, stats, path=None, port=None, interval=METRICS_INTERVAL):
+        self.stats = stats
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._server = None
+        if path:
+            threading.Thread(target=self._flush_loop, daemon=True).start()
+        if port is not None:
+            self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+            self.port = self._server.server_address[1]
+            threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def _handler(self):
+        stats = self.stats
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                snapshot = stats.snapshot()
+                if self.path == "/metrics":
+                    body, kind = prometheus_text(snapshot), "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body, kind = json.dumps(snapshot), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", kind)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def flush(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"time": time.time(), **self.stats.snapshot()}, f, indent=1)
+        os.replace(tmp, self.path)
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except OSError as e:
+                print(f"Metrics error: {e}")
+
+    def close(self):
+        self._stop.set()
+        if self.path:
+            self.flush()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+if __name__ == "__main__":
+    import numpy as np
+    from frame_decoder import StreamDecoder, encode_frames
+
+    # Biaya record per chunk dibanding decode chunk yang sama (counter dan exporter diuji di tests/test_link_stats.py)
+    rng = np.random.default_rng(0)
+    data = rng.integers(0, 4096, (2, 50000))
+    stream = encode_frames(data[0], data[1])
+    decoder = StreamDecoder()
+    stats = LinkStats(decoder)
+    chunks = [stream[i:i + 4096] for i in range(0, len(stream), 4096)]
+    t0 = time.perf_counter()
+    for chunk in chunks:
+        decoder.feed(chunk)
+    decode = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for chunk in chunks:
+        stats.record(len(chunk), len(chunk) // 6)
+    record = time.perf_counter() - t0
+    print(f"record: {record / len(chunks) * 1e6:.2f} us/chunk ({record / decode * 100:.2f}% dari decode)")
+
+    print(stats.summary())
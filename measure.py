@@ -0,0 +1,207 @@
+import time
+import numpy as np
+from ring_buffer import RingBuffer
+from trigger import find_edges
+
+# --------- Config ---------
+SAMPLE_RATE = 20000         # Hz, sample FIR (50 MHz / 2500)
+MEASURE_WINDOW = 8192       # Sampel terakhir yang diukur
+SUMMARY_BLOCK = 256         # Sampel per ringkasan (sum, sum kuadrat, min, max)
+MAX_CROSSINGS = 4096        # Zero crossing yang disimpan per channel
+HYSTERESIS_FRACTION = 0.1   # Band hysteresis zero crossing (fraksi Vpp)
+MIN_HYSTERESIS = 8          # LSB - minimal band hysteresis (noise ADC)
+# --------------------------
+
+
+class Measurements:
+    """Pengukuran Vpp, mean, RMS, frekuensi dan periode per channel, diperbarui per blok
+
+    Statistik disimpan per SUMMARY_BLOCK sampel (sum, sum kuadrat, min, max)
+    dalam RingBuffer, sehingga setiap blok baru hanya menambah ringkasan
+    dan statistik window cukup menggabungkan MEASURE_WINDOW / SUMMARY_BLOCK
+    ringkasan. Frekuensi dihitung dari zero crossing rising (level = mean,
+    dengan hysteresis) yang diinterpolasi linear di antara dua sampel.
+    """
+
+    def __init__(self, channels=1, window=MEASURE_WINDOW, rate=SAMPLE_RATE, summary_block=SUMMARY_BLOCK):
+        self.channels = channels
+        self.rate = rate
+        self.summary_block = summary_block
+        self.window = max(window // summary_block, 1) * summary_block
+        self.reset()
+
+    def reset(self):
+        self._summaries = RingBuffer(self.window // self.summary_block, 4 * self.channels, dtype=np.int64)
+        self._crossings = [RingBuffer(MAX_CROSSINGS, dtype=np.float64) for _ in range(self.channels)]
+        self.total = 0              # Sequence sampel berikutnya
+        self._partial = np.zeros((4, self.channels), dtype=np.int64)
+        self._partial_count = 0
+        self._last = None           # Sampel terakhir per channel (interpolasi lintas blok)
+        self._state = None          # Sampel terakhir di luar band hysteresis per channel
+
+    def feed(self, block):
+        """Tambah blok (channels, n) sampel"""
+        block = np.asarray(block).reshape(self.channels, -1)
+        n = block.shape[1]
+        if n == 0:
+            return
+        # Level crossing dari statistik sebelum blok ini (blok pertama: blok itu sendiri)
+        stats = self.stats() if self.total else None
+        self._find_crossings(block, stats)
+        self._summarize(block.astype(np.int64))
+        self.total += n
+
+    def _summarize(self, block):
+        """Gabungkan blok ke ringkasan per SUMMARY_BLOCK sampel"""
+        size = self.summary_block
+        # Lengkapi ringkasan yang sedang berjalan
+        head = min(size - self._partial_count, block.shape[1])
+        if self._partial_count:
+            self._merge(block[:, :head])
+            block = block[:, head:]
+            if self._partial_count < size:
+                return
+            self._summaries.append(self._partial.reshape(-1, 1))
+            self._partial_count = 0
+
+        # Ringkasan penuh sekaligus, sisanya menjadi ringkasan berjalan
+        full = block.shape[1] // size
+        if full:
+            parts = block[:, :full * size].reshape(self.channels, full, size)
+            self._summaries.append(np.concatenate((parts.sum(axis=2), (parts * parts).sum(axis=2),
+                                                   parts.min(axis=2), parts.max(axis=2))))
+        if block.shape[1] > full * size:
+            self._partial_count = 0
+            self._merge(block[:, full * size:])
+
+    def _merge(self, part):
+        if self._partial_count == 0:
+            self._partial[:] = (part.sum(axis=1), (part * part).sum(axis=1), part.min(axis=1), part.max(axis=1))
+        else:
+            self._partial[0] += part.sum(axis=1)
+            self._partial[1] += (part * part).sum(axis=1)
+            np.minimum(self._partial[2], part.min(axis=1), out=self._partial[2])
+            np.maximum(self._partial[3], part.max(axis=1), out=self._partial[3])
+        self._partial_count += part.shape[1]
+
+    def _find_crossings(self, block, stats):
+        """Simpan posisi rising crossing (sequence pecahan) setiap channel"""
+        if stats is None:
+            mean = block.mean(axis=1)
+            vpp = block.max(axis=1) - block.min(axis=1)
+        else:
+            mean, vpp = stats['mean'], stats['vpp']
+        if self._last is None:
+            self._last = block[:, 0].astype(np.float64)
+            self._state = block[:, 0].astype(np.float64)
+
+        for c in range(self.channels):
+            level = mean[c]
+            hysteresis = max(MIN_HYSTERESIS, HYSTERESIS_FRACTION * vpp[c])
+            x = block[c].astype(np.float64)
+            # Sampel state sebelumnya di depan blok: edge di indeks i -> x[i - 1]
+            edges = find_edges(np.concatenate(([self._state[c]], x)), level, 'rising', hysteresis) - 1
+            if len(edges):
+                prev = np.where(edges > 0, x[edges - 1], self._last[c])
+                cur = x[edges]
+                # Sebelum edge, sampel pasti di bawah level sehingga cur > prev
+                crossing = self.total + edges - 1 + (level - prev) / (cur - prev)
+                self._crossings[c].append(crossing)
+
+            outside = np.flatnonzero((x < level - hysteresis) | (x >= level))
+            if len(outside):
+                self._state[c] = x[outside[-1]]
+            self._last[c] = x[-1]
+
+    def stats(self):
+        """Return dict array per channel: n, mean, rms, ac_rms, min, max, vpp"""
+        summaries, _ = self._summaries.latest(len(self._summaries))
+        summaries = summaries.reshape(4, self.channels, -1)
+        n = summaries.shape[2] * self.summary_block + self._partial_count
+        total = summaries[0].sum(axis=1)
+        square = summaries[1].sum(axis=1)
+        lo = summaries[2].min(axis=1, initial=np.iinfo(np.int64).max)
+        hi = summaries[3].max(axis=1, initial=np.iinfo(np.int64).min)
+        if self._partial_count:
+            total = total + self._partial[0]
+            square = square + self._partial[1]
+            lo = np.minimum(lo, self._partial[2])
+            hi = np.maximum(hi, self._partial[3])
+        n = max(n, 1)
+        mean = total / n
+        mean_square = square / n
+        return {"n": n, "mean": mean, "rms": np.sqrt(mean_square),
+                "ac_rms": np.sqrt(np.maximum(mean_square - mean * mean, 0.0)),
+                "min": lo, "max": hi, "vpp": hi - lo}
+
+    def crossings(self, channel, since=None):
+        """Posisi rising crossing (sequence sampel, pecahan) di dalam window"""
+        ring = self._crossings[channel]
+        values, _ = ring.latest(len(ring))
+        values = values[0]
+        first = self.total - self.window if since is None else since
+        return values[np.searchsorted(values, first):]
+
+    def frequency(self, channel):
+        """Return (frekuensi Hz, periode s) dari rata-rata jarak crossing, atau (None, None)"""
+        crossings = self.crossings(channel)
+        if len(crossings) < 2:
+            return None, None
+        period = (crossings[-1] - crossings[0]) / (len(crossings) - 1) / self.rate
+        return 1.0 / period, period
+
+    def phase(self, a=0, b=1):
+        """Return (delay s, fase derajat, gain) channel b terhadap channel a, atau None
+
+        Delay = median jarak crossing b terhadap crossing a sebelumnya,
+        gain = AC RMS b / AC RMS a.
+        """
+        ca, cb = self.crossings(a), self.crossings(b)
+        freq, period = self.frequency(a)
+        if freq is None or len(cb) == 0:
+            return None
+        idx = np.searchsorted(ca, cb) - 1
+        valid = idx >= 0
+        if not np.any(valid):
+            return None
+        period_samples = period * self.rate
+        delays = np.mod(cb[valid] - ca[idx[valid]], period_samples)
+        delay = float(np.median(delays)) / self.rate
+        stats = self.stats()
+        gain = stats['ac_rms'][b] / stats['ac_rms'][a] if stats['ac_rms'][a] else float('nan')
+        return delay, delay / period * 360.0, gain
+
+    def summary(self, channel):
+        """Satu baris teks pengukuran untuk ditampilkan di plot"""
+        stats = self.stats()
+        freq, period = self.frequency(channel)
+        text = (f"Vpp {stats['vpp'][channel]:4d}  mean {stats['mean'][channel]:7.1f}  "
+                f"RMS {stats['rms'][channel]:7.1f} (AC {stats['ac_rms'][channel]:6.1f})")
+        if freq is None:
+            return text + "  freq -"
+        return text + f"  freq {freq:8.2f} Hz  periode {period * 1000:.3f} ms"
+
+
+if __name__ == "__main__":
+    from fir_model import FirHpfModel
+
+    # Sinus 1 kHz + noise melewati model FIR_HPF, diukur per blok 50 ms (akurasi diuji di tests/test_measure.py)
+    rng = np.random.default_rng(0)
+    fs, f0, seconds = SAMPLE_RATE, 1234.5, 2
+    t = np.arange(fs * seconds)
+    ch0 = np.clip(np.rint(2048 + 1200 * np.sin(2 * np.pi * f0 * t / fs) + rng.normal(0, 4, len(t))),
+                  0, 4095).astype(np.int64)
+    ch1 = FirHpfModel().process(ch0)
+
+    meas = Measurements(2, rate=fs)
+    block = fs // 20
+    t0 = time.perf_counter()
+    for i in range(0, len(t), block):
+        meas.feed(np.vstack((ch0[i:i + block], ch1[i:i + block])))
+    elapsed = time.perf_counter() - t0
+    for c in range(2):
+        print(f"ch{c}: {meas.summary(c)}")
+    delay, phase, gain = meas.phase(0, 1)
+    print(f"ch0 -> ch1: delay {delay * 1e6:.1f} us, fase {phase:.1f} derajat, gain {gain:.3f}")
+    print(f"{len(t) // block} blok dalam {elapsed * 1000:.1f} ms "
+          f"({elapsed / seconds * 100:.2f}% waktu real-time)")
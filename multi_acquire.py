@@ -0,0 +1,385 @@
+import argparse
+import asyncio
+import collections
+import os
+import threading
+import time
+import numpy as np
+from frame_decoder import StreamDecoder
+from link_stats import LinkStats
+from ring_buffer import RingBuffer
+
+# --------- Config ---------
+BAUD = 2000000
+SAMPLE_RATE = 20000         # Hz per board (50 MHz / 2500)
+READ_SIZE = 1 << 16         # Byte maksimal per read
+RING_CAPACITY = 1 << 20     # Sampel per board
+ALIGN_WINDOW = 5.0          # s - window estimasi waktu sampel pertama (minimum latency)
+ALIGN_TOLERANCE = 20        # Sampel - offset hanya diubah jika estimasi bergeser lebih dari ini
+ALIGN_ERROR = 0.01          # s - error offset yang masih diterima alignment_test (latency pty + blok emulator)
+# --------------------------
+
+
+class Board:
+    """Satu endpoint: decoder, ring buffer dan estimasi timebase
+
+    Index lokal = jumlah sampel sejak board mulai dibaca. Frame hilang
+    (loncatan SEQ format packed) diisi sampel terakhir agar index lokal
+    tetap sebanding dengan waktu. Waktu sampel lokal 0 diperkirakan dari
+    chunk dengan latency terkecil dalam ALIGN_WINDOW: setiap chunk yang
+    tiba pada waktu t dengan index akhir k memberi batas atas
+    t - k / rate, dan minimum dari batas ini paling dekat ke nilai sebenarnya.
+    """
+
+    def __init__(self, name, rate=SAMPLE_RATE, capacity=RING_CAPACITY):
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self.decoder = StreamDecoder()
+        self.stats = LinkStats(self.decoder, expected_rate=rate)
+        self.ring = None
+        self.filled = 0             # Sampel pengisi untuk frame hilang
+        self.t0 = None              # Perkiraan waktu monotonic sampel lokal 0
+        self._lost = 0
+        self._estimates = collections.deque()
+
+    @property
+    def channels(self):
+        return self.ring.channels if self.ring is not None else 0
+
+    @property
+    def total(self):
+        return self.ring.total if self.ring is not None else 0
+
+    def feed(self, chunk, now):
+        block = self.decoder.feed(chunk)
+        self.stats.record(len(chunk), block.shape[1])
+        if not block.shape[1]:
+            return
+        if self.ring is None:
+            self.ring = RingBuffer(self.capacity, block.shape[0])
+
+        lost = self.decoder.lost_frames - self._lost
+        self._lost += lost
+        if lost and self.ring.total:
+            # Posisi frame hilang di dalam chunk tidak diketahui: isi di awal blok
+            gap = lost * self.decoder.decoder.sets
+            last = self.ring.latest(1)[0]
+            self.ring.append(np.repeat(last, min(gap, self.capacity), axis=1))
+            self.filled += gap
+
+        self.ring.append(block)
+        self._estimate(now - self.ring.total / self.rate, now)
+
+    def _estimate(self, t0, now):
+        # Minimum geser (monotonic deque) dari batas atas waktu sampel 0
+        estimates = self._estimates
+        while estimates and estimates[-1][1] >= t0:
+            estimates.pop()
+        estimates.append((now, t0))
+        while now - estimates[0][0] > ALIGN_WINDOW:
+            estimates.popleft()
+        self.t0 = estimates[0][1]
+
+
+class MultiAcquisition:
+    """Akuisisi banyak port serial/pty sekaligus dengan asyncio, disejajarkan ke satu timebase
+
+    Di POSIX setiap fd didaftarkan ke event loop (`add_reader`), sehingga
+    byte dibaca saat tersedia tanpa polling atau sleep. Sumber tanpa fd
+    (ReplaySerial, port serial di Windows) dibaca dengan read blocking di
+    thread pool. Semua board di-decode di thread event loop.
+
+    Index global = index lokal + offset board. Offset dihitung dari selisih
+    perkiraan waktu sampel 0 setiap board terhadap board pertama, sehingga
+    `window` mengembalikan sampel dari semua board pada waktu yang sama.
+    """
+
+    def __init__(self, endpoints, rate=SAMPLE_RATE, capacity=RING_CAPACITY, baud=BAUD):
+        self.endpoints = list(endpoints)
+        self.rate = rate
+        self.baud = baud
+        self.boards = [Board(name, rate, capacity) for name in self.endpoints]
+        self.offsets = [None] * len(self.boards)
+        self.origin = None
+        self.loop = None
+        self._stop = None
+        self._ready = threading.Event()
+        self._closers = []
+
+    # ---- Sumber data ----
+
+    def _open(self, endpoint):
+        """Return (fd atau None, fungsi read blocking, close)"""
+        if endpoint.startswith("replay:"):
+            from capture import ReplaySerial
+            ser = ReplaySerial(endpoint[len("replay:"):], loop=True)
+            return None, lambda: ser.read(max(1, ser.in_waiting)), ser.close
+        import serial
+        ser = serial.Serial(endpoint, self.baud, timeout=0.1)
+        if os.name == 'posix':
+            ser.timeout = 0
+            return ser.fileno(), None, ser.close
+        return None, lambda: ser.read(max(1, ser.in_waiting)), ser.close
+
+    def _on_readable(self, board, fd):
+        try:
+            chunk = os.read(fd, READ_SIZE)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            # Port hilang (misalnya USB dicabut): berhenti membaca fd ini, board lain jalan terus
+            print(f"{board.name}: {e}")
+            board.stats.error(e)
+            self.loop.remove_reader(fd)
+            return
+        if chunk:
+            board.feed(chunk, time.monotonic())
+            self._align(board)
+
+    async def _read_blocking(self, board, read):
+        while not self._stop.is_set():
+            try:
+                chunk = await asyncio.to_thread(read)
+            except Exception as e:
+                print(f"{board.name}: {e}")
+                board.stats.error(e)
+                board.decoder.reset()
+                await asyncio.sleep(0.01)
+                continue
+            if chunk:
+                board.feed(chunk, time.monotonic())
+                self._align(board)
+
+    async def run(self):
+        """Baca semua endpoint sampai `stop` dipanggil"""
+        self.loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        tasks = []
+        for board, endpoint in zip(self.boards, self.endpoints):
+            fd, read, close = self._open(endpoint)
+            self._closers.append(close)
+            if fd is not None:
+                self.loop.add_reader(fd, self._on_readable, board, fd)
+                self._closers.append(lambda fd=fd: self.loop.remove_reader(fd))
+            else:
+                tasks.append(asyncio.ensure_future(self._read_blocking(board, read)))
+        self._ready.set()
+        try:
+            await self._stop.wait()
+        finally:
+            # Read blocking selesai dalam timeout port, baru sumber ditutup
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for close in reversed(self._closers):
+                close()
+
+    def start(self):
+        """Jalankan `run` di thread daemon (untuk plotter), return setelah semua endpoint terbuka"""
+        threading.Thread(target=asyncio.run, args=(self.run(),), daemon=True).start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        if self.loop is not None and self._stop is not None:
+            self.loop.call_soon_threadsafe(self._stop.set)
+
+    # ---- Timebase bersama ----
+
+    def _align(self, board):
+        if board.t0 is None:
+            return
+        if self.origin is None:
+            self.origin = board.t0
+        i = self.boards.index(board)
+        offset = int(round((board.t0 - self.origin) * self.rate))
+        if self.offsets[i] is None or abs(offset - self.offsets[i]) > ALIGN_TOLERANCE:
+            self.offsets[i] = offset
+
+    @property
+    def aligned(self):
+        return all(offset is not None for offset in self.offsets)
+
+    @property
+    def channels(self):
+        return sum(board.channels for board in self.boards)
+
+    def span(self):
+        """Range index global [start, end) yang tersedia di semua board"""
+        if not self.aligned:
+            return 0, 0
+        starts, ends = [], []
+        for board, offset in zip(self.boards, self.offsets):
+            total = board.total
+            starts.append(offset + total - len(board.ring))
+            ends.append(offset + total)
+        return max(starts), min(ends)
+
+    def window(self, length, end=None):
+        """Return (data (semua channel semua board, length), start global) atau (None, None)
+
+        Channel disusun per board sesuai urutan endpoint. Default: sampel
+        terbaru yang sudah diterima dari semua board.
+        """
+        first, last = self.span()
+        end = last if end is None else end
+        start = end - length
+        if start < first or end > last or length <= 0:
+            return None, None
+        parts = []
+        for board, offset in zip(self.boards, self.offsets):
+            parts.append(board.ring.window(start - offset, length))
+        data = np.concatenate(parts, axis=0)
+        # Data disalin oleh concatenate; cek apakah writer sudah menimpa window sejak span dibaca
+        if not all(b.ring.is_valid(start - o) for b, o in zip(self.boards, self.offsets)):
+            return None, None
+        return data, start
+
+    def triggered(self, trigger, channel, length, search=None):
+        """Window sejajar semua channel yang di-trigger dari satu channel (index gabungan)
+
+        `search` = panjang data yang dicari edge-nya (default 3 x length).
+        Return (data, start global) atau (None, None).
+        """
+        search = search or 3 * length
+        first, last = self.span()
+        search = min(search, last - first)
+        data, start = self.window(search)
+        if data is None:
+            return None, None
+        point = trigger.locate(data[channel], length, start)
+        if point is None:
+            return None, None
+        return data[:, point:point + length], start + point
+
+    def summary(self):
+        lines = []
+        for board, offset in zip(self.boards, self.offsets):
+            s = board.stats.snapshot()
+            lines.append(f"{board.name}: {s.get('format', '?')} {board.channels} ch, {board.total} sampel, "
+                         f"offset {offset} ({(offset or 0) / self.rate * 1000:.1f} ms), "
+                         f"{s['samples'] / s['uptime_s'] / 1000:.2f}k sampel/s, frame hilang {s.get('lost_frames', 0)}")
+        return "\n".join(lines)
+
+
+def emulate_boards(count, stagger=0.25, frame_format='framing', speed=1.0, signal='noise'):
+    """Jalankan `count` emulator FPGA di pty, board ke-i mulai i * stagger detik kemudian
+
+    Return (nama port, waktu mulai monotonic tiap emulator, fungsi stop).
+    """
+    from fpga_emulator import FpgaEmulator, open_pty
+
+    names, started, stop = [], [], threading.Event()
+
+    def run(emulator, master, delay):
+        time.sleep(delay)
+        started.append((delay, time.monotonic()))
+        emulator.run(master, None, stop)
+
+    for i in range(count):
+        master, slave, name = open_pty()
+        emulator = FpgaEmulator(signal=signal, speed=speed, frame_format=frame_format, seed=0)
+        threading.Thread(target=run, args=(emulator, master, i * stagger), daemon=True).start()
+        names.append(name)
+    return names, started, stop.set
+
+
+def alignment_test(count=3, stagger=0.25, seconds=3.0, frame_format='framing'):
+    """Board emulasi dengan waktu mulai berbeda: offset hasil estimasi vs selisih waktu mulai
+
+    Return (error offset per board dalam sampel, lag dari isi data per board
+    terhadap board 0 atau None jika sinyal tidak ditemukan dekat offset).
+    """
+    names, started, stop_emulators = emulate_boards(count, stagger, frame_format)
+    acquisition = MultiAcquisition(names).start()
+    cpu0, t0 = time.process_time(), time.monotonic()
+    time.sleep(seconds)
+    cpu = (time.process_time() - cpu0) / (time.monotonic() - t0)
+
+    print(acquisition.summary())
+    starts = [t for _, t in sorted(started)]
+    errors = []
+    for board, offset, start in zip(acquisition.boards, acquisition.offsets, starts):
+        expected = (start - starts[0]) * acquisition.rate
+        errors.append(offset - expected)
+        print(f"  {board.name}: offset {offset:>6}  dari waktu mulai {expected:>8.0f}  "
+              f"error {offset - expected:+6.0f} sampel ({(offset - expected) / acquisition.rate * 1000:+.2f} ms)")
+    print(f"  CPU proses (termasuk emulator): {cpu * 100:.1f}%")
+
+    # Semua board menerima noise yang sama (seed sama) sejak index lokal 0, sehingga
+    # lag sebenarnya bisa dicari dari isi data: board i di index g = board 0 di g - lag
+    # Lag dicari sejauh error offset yang masih diterima
+    search = int(ALIGN_ERROR * acquisition.rate)
+    first, last = acquisition.span()
+    data, start = acquisition.window(last - first)
+    lags = [0] + [None] * (count - 1)
+    if data is not None and data.shape[0] == 2 * count:
+        length = data.shape[1] - acquisition.offsets[-1] - 2 * search
+        for i in range(1, count):
+            estimate = acquisition.offsets[i] - acquisition.offsets[0]
+            found = [lag for lag in range(max(estimate - search, 0), estimate + search + 1)
+                     if np.array_equal(data[0, :length], data[2 * i, lag:lag + length])]
+            lags[i] = found[0] if found else None
+            print(f"  {acquisition.boards[i].name}: lag dari isi data {lags[i]}, offset {estimate}")
+
+    acquisition.stop()
+    stop_emulators()
+    return errors, lags
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Akuisisi beberapa board FIR_HPF_UART dengan timebase bersama")
+    parser.add_argument("endpoints", nargs="*", help="Port serial/pty atau replay:<file capture>")
+    parser.add_argument("--emulate", type=int, default=0, help="Jumlah board emulasi (pty)")
+    parser.add_argument("--stagger", type=float, default=0.25, help="s - jeda mulai antar board emulasi")
+    parser.add_argument("--format", default='framing', choices=['framing', 'packed'])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--plot", action="store_true", help="Tampilkan semua channel ter-trigger dengan matplotlib")
+    args = parser.parse_args()
+
+    if args.emulate and not args.plot:
+        # Batas error dan lag dari isi data diuji di tests/test_multi_acquire.py
+        alignment_test(args.emulate, args.stagger, args.seconds, args.format)
+    else:
+        stop_emulators = None
+        endpoints = args.endpoints
+        if args.emulate:
+            endpoints, _, stop_emulators = emulate_boards(args.emulate, args.stagger, args.format, signal='sine')
+        acquisition = MultiAcquisition(endpoints).start()
+        if args.plot:
+            import matplotlib.pyplot as plt
+            from matplotlib.animation import FuncAnimation
+            from trigger import Trigger
+
+            length = 1000
+            trigger = Trigger(level=2048, slope='rising', hysteresis=16, pre_trigger=length // 4)
+            fig, ax = plt.subplots(figsize=(12, 6))
+            ax.set_xlim(0, length)
+            ax.set_ylim(0, 4096)
+            ax.set_xlabel("Sampel")
+            ax.grid(True, alpha=0.3)
+            lines = []
+
+            def update(frame):
+                data, start = acquisition.triggered(trigger, 0, length)
+                if data is None:
+                    return lines
+                while len(lines) < data.shape[0]:
+                    lines.append(ax.plot([], [], lw=1, label=f"CH{len(lines)}")[0])
+                    ax.legend(loc='upper right')
+                for line, values in zip(lines, data):
+                    line.set_data(np.arange(length), values)
+                ax.set_title(f"{len(acquisition.boards)} board, trigger CH0 @ index global {start}")
+                return lines
+
+            animation = FuncAnimation(fig, update, interval=50, blit=False, cache_frame_data=False)
+            plt.show()
+        else:
+            try:
+                while True:
+                    time.sleep(args.seconds)
+                    print(acquisition.summary())
+            except KeyboardInterrupt:
+                print("Stopping...")
+        acquisition.stop()
+        if stop_emulators is not None:
+            stop_emulators()
@@ -1,10 +1,12 @@
-import serial
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
-from collections import deque
 import threading
 import numpy as np
 import time
+from ring_buffer import RingBuffer
+from frame_decoder import PairDecoder
+from tracer import Tracer
+from trigger import Trigger
+from measure import Measurements
+from segments import SegmentMemory, MODES, persistence_rgba
 
 # --------- Config ---------
 SERIAL_PORT = 'COM8'
@@ -13,118 +15,239 @@ SAMPLES_TO_SHOW = 1000      # Jumlah sampel yang ditampilkan
 UPDATE_INTERVAL = 50        # ms - interval update plot
 TRIGGER_LEVEL = 2048        # Level trigger (setengah dari 4096)
 TRIGGER_SLOPE = 'rising'    # 'rising' atau 'falling'
+TRIGGER_HYSTERESIS = 16     # Band hysteresis (LSB) agar noise ADC tidak memicu trigger palsu
+TRIGGER_HOLDOFF = 0         # Minimal jarak antar trigger (sampel)
+PRE_TRIGGER = 0             # Jumlah sampel sebelum titik trigger yang ikut ditampilkan
+TRIGGER_SELECT = 'newest'   # 'newest' (latency terkecil) atau 'oldest'
+SAMPLE_RATE = 20000         # Hz, sample rate ADC untuk pengukuran frekuensi
+MEASURE = True              # Tampilkan Vpp, mean, RMS dan frekuensi
+SEGMENT_COUNT = 256         # Segmen ter-trigger yang disimpan (average/envelope/persistence/history)
+DISPLAY_MODE = 'normal'     # 'normal', 'average', 'envelope' atau 'persistence' (tombol 'm')
+TRACE = False               # Rekam waktu setiap stage, tulis TRACE_FILE (Chrome trace) dan persentil saat keluar
+TRACE_FILE = 'trace_optimized.json'
 # --------------------------
 
-# Serial configuration
-ser = serial.Serial(SERIAL_PORT, BAUD_RATE, timeout=0.1)
-
-# Buffer untuk menyimpan data mentah
-raw_buffer = deque(maxlen=SAMPLES_TO_SHOW * 3)  # Buffer lebih besar untuk mencari trigger
-display_buffer = [0] * SAMPLES_TO_SHOW  # Buffer untuk ditampilkan (statis)
-lock = threading.Lock()
-
-def find_trigger_point(data, level, slope='rising'):
-    """Mencari titik trigger dalam data"""
-    if len(data) < 2:
-        return None
-    
-    for i in range(1, len(data) - SAMPLES_TO_SHOW):
-        if slope == 'rising':
-            if data[i-1] < level and data[i] >= level:
-                return i
-        else:  # falling
-            if data[i-1] > level and data[i] <= level:
-                return i
-    return None
-
-def uart_reader():
-    """Thread untuk membaca data UART"""
-    expecting_high = True
-    high_byte = 0
-    
-    while True:
-        try:
-            if ser.in_waiting > 0:
-                byte_val = ser.read(1)[0]
+PLOT_KEYS = {'m', '[', ']', 'c'}   # Tombol plotter, dibuang dari keymap bawaan matplotlib
+
+
+def main(port=SERIAL_PORT, baud=BAUD_RATE, samples=SAMPLES_TO_SHOW, trigger_level=TRIGGER_LEVEL,
+         trigger_slope=TRIGGER_SLOPE, hysteresis=TRIGGER_HYSTERESIS, holdoff=TRIGGER_HOLDOFF,
+         pre_trigger=PRE_TRIGGER, replay=None, replay_speed=1.0):
+    """Plotter satu channel; matplotlib dan serial baru di-import (dan port dibuka) saat dipanggil"""
+    import matplotlib.pyplot as plt
+    import matplotlib.animation as animation
+    from capture import open_source, read_samples
+
+    # Serial configuration (atau replay dari file capture)
+    ser, close_source = open_source(port, baud, replay, replay_speed)
+
+    # Buffer untuk menyimpan data mentah
+    raw_buffer = RingBuffer(samples * 3)  # Buffer lebih besar untuk mencari trigger
+    display_buffer = [0] * samples  # Buffer untuk ditampilkan (statis)
+
+    # Decoder pasangan byte (bulk, vectorized, realign otomatis jika byte hilang)
+    decoder = PairDecoder()
+
+    # Segmented memory: setiap segmen ter-trigger disimpan, bukan hanya ditimpa ke display buffer
+    segments = SegmentMemory(SEGMENT_COUNT, samples)
+    last_segment = None         # Sequence trigger segmen terakhir yang disimpan
+    display_mode = DISPLAY_MODE
+    segment_index = None        # None = live, N = nomor absolut segmen yang sedang dibuka
+
+    # Trigger engine (vectorized, dengan hysteresis dan holdoff)
+    trigger = Trigger(trigger_level, trigger_slope, hysteresis, holdoff,
+                      pre_trigger, TRIGGER_SELECT)
+
+    # Pengukuran per blok: sampel baru sejak update sebelumnya (sequence RingBuffer)
+    measurements = Measurements(1, rate=SAMPLE_RATE)
+    measure_seq = 0
+
+    def uart_reader():
+        """Thread untuk membaca data UART, decode semua pasangan byte per chunk sekaligus"""
+        realign_reported = 0
+        while True:
+            try:
+                # Baca semua byte yang tersedia dalam satu panggilan (blok sampai timeout jika kosong)
+                _, _, values = read_samples(ser, decoder)
+                if values is None:
+                    continue
                 
-                if expecting_high:
-                    high_byte = byte_val
-                    expecting_high = False
-                else:
-                    # Rekonstruksi nilai 12-bit
-                    value = (high_byte << 4) | (byte_val >> 4)
-                    expecting_high = True
+                if values.ndim == 2:
+                    values = values[0]  # Replay capture channel: plot channel pertama
+                if len(values):
+                    raw_buffer.append(values)
+                if decoder.realign_count != realign_reported:
+                    realign_reported = decoder.realign_count
+                    print(f"Realign stream UART: {decoder.realign_count} kali")
                     
-                    # Tambahkan ke buffer mentah
-                    with lock:
-                        raw_buffer.append(value)
-            else:
-                time.sleep(0.001)
-                
-        except Exception as e:
-            print(f"UART error: {e}")
-            time.sleep(0.01)
-
-# Start thread untuk baca data
-threading.Thread(target=uart_reader, daemon=True).start()
-
-# Setup matplotlib
-fig, ax = plt.subplots(figsize=(12, 6))
-line, = ax.plot([], [], 'b-', linewidth=1.5)
-trigger_line = ax.axhline(y=TRIGGER_LEVEL, color='r', linestyle='--', alpha=0.7, label=f'Trigger Level: {TRIGGER_LEVEL}')
-
-# Setup sumbu - BENAR-BENAR STATIS
-x_data = np.arange(SAMPLES_TO_SHOW)
-ax.set_xlim(0, SAMPLES_TO_SHOW)
-ax.set_ylim(0, 4096)
-ax.set_title("ADC Plot - Static Display dengan Trigger")
-ax.set_xlabel("Sampel (Posisi Statis)")
-ax.set_ylabel("Nilai ADC")
-ax.grid(True, alpha=0.3)
-ax.legend()
-
-def update(frame):
-    """Update plot dengan trigger - tampilan STATIS"""
-    global display_buffer
-    
-    with lock:
-        if len(raw_buffer) >= SAMPLES_TO_SHOW:
-            # Convert deque ke list untuk pencarian trigger
-            data_list = list(raw_buffer)
+            except Exception as e:
+                print(f"UART error: {e}")
+                decoder.reset()
+                time.sleep(0.01)
+
+    # Start thread untuk baca data
+    threading.Thread(target=uart_reader, daemon=True).start()
+
+    # Tombol plotter tidak boleh ikut memicu shortcut bawaan matplotlib (c = back)
+    for keymap in [name for name in plt.rcParams if name.startswith('keymap.')]:
+        plt.rcParams[keymap] = [key for key in plt.rcParams[keymap] if key not in PLOT_KEYS]
+
+    # Setup matplotlib
+    fig, ax = plt.subplots(figsize=(12, 6))
+    line, = ax.plot([], [], 'b-', linewidth=1.5)
+    trigger_line = ax.axhline(y=trigger_level, color='r', linestyle='--', alpha=0.7, label=f'Trigger Level: {trigger_level}')
+
+    # Setup sumbu - BENAR-BENAR STATIS
+    x_data = np.arange(samples)
+    ax.set_xlim(0, samples)
+    ax.set_ylim(0, 4096)
+    ax.set_title("ADC Plot - Static Display dengan Trigger")
+    ax.set_xlabel("Sampel (Posisi Statis)")
+    ax.set_ylabel("Nilai ADC")
+    ax.grid(True, alpha=0.3)
+    ax.legend()
+
+    measure_text = ax.text(0.01, 0.97, "", transform=ax.transAxes, fontsize=9, family='monospace',
+                           va='top', visible=MEASURE)
+
+    # Envelope (min/max) dan persistence, hanya tampil pada mode yang sesuai
+    envelope_lines = [ax.plot([], [], 'b-', linewidth=0.8, alpha=0.5)[0] for _ in range(2)]
+    persistence_image = ax.imshow(np.zeros((segments.bins, samples, 4)), origin='lower', aspect='auto',
+                                  interpolation='nearest', visible=False, extent=(0, samples, 0, 4096))
+    segment_text = ax.text(0.99, 0.02, "", transform=ax.transAxes, fontsize=9, family='monospace', ha='right')
+
+    def on_key(event):
+        """m: mode tampilan, [ / ]: segmen lama / baru, c: hapus segmen"""
+        nonlocal display_mode, segment_index
+        if event.key == 'm':
+            display_mode = MODES[(MODES.index(display_mode) + 1) % len(MODES)]
+            segment_index = None
+        elif event.key == '[' and len(segments) > 1:
+            # Nomor absolut: segmen yang dibuka tidak bergeser walaupun akuisisi berjalan terus
+            newest = segments.total - 1
+            segment_index = max((newest if segment_index is None else segment_index) - 1,
+                                segments.total - len(segments))
+        elif event.key == ']' and segment_index is not None:
+            segment_index += 1
+            if segment_index >= segments.total - 1:
+                segment_index = None
+        elif event.key == 'c':
+            segments.clear()
+            segment_index = None
+
+    fig.canvas.mpl_connect('key_press_event', on_key)
+
+    def update_segments():
+        """Tampilkan segmen sesuai mode: normal, average, envelope, persistence atau history segmen"""
+        nonlocal segment_index
+        if segment_index is not None and segment_index < segments.total - len(segments):
+            segment_index = segments.total - len(segments)
+        live = segment_index is None
+        for artist in envelope_lines:
+            artist.set_visible(live and display_mode == 'envelope' and len(segments) > 0)
+        persistence_image.set_visible(live and display_mode == 'persistence' and len(segments) > 0)
+        
+        if not live and len(segments):
+            back = segments.total - 1 - segment_index
+            data, sequence = segments.segment(back)
+            line.set_data(x_data, data[0])
+            segment_text.set_text(f"Segmen #{segment_index} (-{back} dari {len(segments)}, trigger @ {sequence})")
+            return
+        
+        segment_text.set_text(f"Mode {display_mode}, {len(segments)} segmen" if display_mode != 'normal' else "")
+        if display_mode == 'average' and len(segments):
+            line.set_data(x_data, segments.average()[0])
+            return
+        
+        line.set_data(x_data, display_buffer)
+        if display_mode == 'envelope' and len(segments):
+            lo, hi = segments.envelope()
+            envelope_lines[0].set_data(x_data, lo[0])
+            envelope_lines[1].set_data(x_data, hi[0])
+        elif display_mode == 'persistence' and len(segments):
+            persistence_image.set_data(persistence_rgba(segments.persistence(), [(0.1, 0.3, 1.0)]))
+
+    def update(frame):
+        """Update plot dengan trigger - tampilan STATIS"""
+        nonlocal display_buffer, measure_seq, last_segment
+        
+        if MEASURE:
+            # Hanya sampel baru yang diproses, statistik window diperbarui inkremental
+            block, start, lost = raw_buffer.since(measure_seq)
+            measure_seq = start + block.shape[1]
+            if lost:
+                measurements.reset()
+            measurements.feed(block)
+            if measurements.total:
+                measure_text.set_text(measurements.summary(0))
+        
+        if len(raw_buffer) >= samples:
+            # View ke ring buffer (tanpa copy dan tanpa lock)
+            window, start = raw_buffer.latest(len(raw_buffer))
+            data = window[0]
             
             # Cari titik trigger
-            trigger_point = find_trigger_point(data_list, TRIGGER_LEVEL, TRIGGER_SLOPE)
+            trigger_point = trigger.locate(data, samples, start)
             
             if trigger_point is not None:
                 # Ambil data mulai dari titik trigger
-                triggered_data = data_list[trigger_point:trigger_point + SAMPLES_TO_SHOW]
+                triggered_data = data[trigger_point:trigger_point + samples].copy()
                 
-                if len(triggered_data) == SAMPLES_TO_SHOW:
+                if len(triggered_data) == samples and raw_buffer.is_valid(start + trigger_point):
                     display_buffer = triggered_data
-    
-    # Update line dengan data yang sudah di-trigger (POSISI STATIS)
-    line.set_data(x_data, display_buffer)
-    
-    return line,
-
-# Animasi
-ani = animation.FuncAnimation(
-    fig, 
-    update, 
-    interval=UPDATE_INTERVAL,
-    blit=True
-)
-
-plt.tight_layout()
-
-print(f"Trigger Level: {TRIGGER_LEVEL}")
-print(f"Trigger Slope: {TRIGGER_SLOPE}")
-print("Grafik akan statis pada posisi trigger yang sama")
-
-try:
-    plt.show()
-except KeyboardInterrupt:
-    print("Stopping...")
-finally:
-    ser.close()
-    print("Serial port closed.")
\ No newline at end of file
+                    # Simpan hanya trigger baru (trigger yang sama bisa ditemukan lagi di update berikutnya)
+                    if trigger.last_trigger != last_segment:
+                        segments.add(triggered_data, trigger.last_trigger)
+                        last_segment = trigger.last_trigger
+        
+        # Update line dengan data yang sudah di-trigger (POSISI STATIS) sesuai mode tampilan
+        update_segments()
+        
+        return persistence_image, line, *envelope_lines, measure_text, segment_text
+
+    # Tracing per stage: fungsi hanya dibungkus jika TRACE aktif (tanpa overhead jika mati)
+    tracer = Tracer() if TRACE else None
+    if TRACE:
+        tracer.instrument(ser, 'read', 'serial.read')
+        tracer.instrument(decoder, 'feed', 'decode')
+        tracer.instrument(raw_buffer, 'append', 'ring.append')
+        tracer.instrument(raw_buffer, 'latest', 'ring.latest')
+        tracer.instrument(trigger, 'locate', 'trigger.locate')
+        tracer.instrument(measurements, 'feed', 'measure.feed')
+        tracer.instrument(segments, 'add', 'segments.add')
+        tracer.instrument(line, 'set_data', 'set_data')
+        tracer.instrument(ax, 'draw_artist', 'draw_artist')
+        tracer.instrument(fig.canvas, 'blit', 'blit')
+        tracer.instrument(fig.canvas, 'draw', 'canvas.draw')
+        update = tracer.wrap(update, 'update')
+
+    # Animasi
+    ani = animation.FuncAnimation(
+        fig, 
+        update, 
+        interval=UPDATE_INTERVAL,
+        blit=True
+    )
+
+    plt.tight_layout()
+
+    print(f"Trigger Level: {trigger_level}")
+    print(f"Trigger Slope: {trigger_slope}")
+    print("Grafik akan statis pada posisi trigger yang sama")
+    print("'m': mode normal/average/envelope/persistence, '[' / ']': segmen lama/baru, 'c': hapus segmen")
+
+    try:
+        plt.show()
+    except KeyboardInterrupt:
+        print("Stopping...")
+    finally:
+        close_source()
+        print("Serial port closed.")
+        print(f"{decoder.sample_count} sampel, {decoder.realign_count} realign, "
+              f"{decoder.corrupt_pairs} pasangan korup, {decoder.dropped_bytes} byte dibuang")
+        if TRACE:
+            tracer.finish(TRACE_FILE)
+
+
+if __name__ == "__main__":
+    main()
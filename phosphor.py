@@ -0,0 +1,127 @@
+import time
+import numpy as np
+
+# --------- Config ---------
+PHOSPHOR_DECAY = 0.85       # Faktor decay histogram per frame
+LUT_SIZE = 1024             # Jumlah entri colour LUT
+LUT_GAMMA = 0.4             # < 1: trace yang jarang muncul tetap terlihat
+# --------------------------
+
+
+def phosphor_lut(color, size=LUT_SIZE, gamma=LUT_GAMMA):
+    """Colour LUT (size x 3, uint8): hitam -> warna channel -> putih untuk hit terbanyak"""
+    level = np.linspace(0.0, 1.0, size) ** gamma
+    color = np.asarray(color, dtype=np.float64)
+    rgb = np.where(level[:, None] < 0.7,
+                   level[:, None] / 0.7 * color,
+                   color + (level[:, None] - 0.7) / 0.3 * (255.0 - color))
+    return np.clip(rgb, 0, 255).astype(np.uint8)
+
+
+class PhosphorDisplay:
+    """Histogram hit 2-D (digital phosphor) untuk satu plot pygame
+
+    Setiap segmen ter-trigger di-resample ke lebar plot, lalu setiap kolom
+    pixel ditandai dari nilai min sampai max segmen di kolom itu (termasuk
+    garis ke sampel berikutnya) memakai difference array dan cumsum.
+    Biaya `add` sebanding dengan segmen x lebar plot, `decay` dan `render`
+    sebanding dengan jumlah pixel, tidak tergantung jumlah sampel.
+    Histogram disimpan (y, x) agar cumsum berjalan per baris; `pixels`
+    mengembalikan layout (x, y) untuk pygame.surfarray.
+    """
+
+    def __init__(self, width, height, color, decay=PHOSPHOR_DECAY):
+        self.width = width
+        self.height = height
+        self.decay_factor = decay
+        self.lut = phosphor_lut(color)
+        self.hist = np.zeros((height, width), dtype=np.float32)
+        self.surface = None
+        self.segments = 0           # Jumlah segmen yang pernah ditambahkan
+
+    def clear(self):
+        self.hist[:] = 0
+
+    def add(self, segments):
+        """Tambah segmen (k, length) nilai 12-bit ke histogram"""
+        segments = np.asarray(segments, dtype=np.float32)
+        if segments.ndim == 1:
+            segments = segments[None, :]
+        k, length = segments.shape
+        if k == 0 or length < 2:
+            return
+        w, h = self.width, self.height
+
+        if length <= w:
+            # Resample linear ke w + 1 titik agar setiap kolom punya pasangan sampel
+            pos = np.arange(w + 1) * ((length - 1) / w)
+            i0 = np.minimum(pos.astype(np.intp), length - 2)
+            frac = (pos - i0).astype(np.float32)
+            segments = segments[:, i0] * (1 - frac) + segments[:, i0 + 1] * frac
+            length = w + 1
+
+        # Pasangan sampel berurutan = satu garis vertikal di kolomnya
+        lo = np.minimum(segments[:, :-1], segments[:, 1:])
+        hi = np.maximum(segments[:, :-1], segments[:, 1:])
+        starts = np.searchsorted((np.arange(length - 1) * w) // (length - 1), np.arange(w))
+        lo = np.minimum.reduceat(lo, starts, axis=1)
+        hi = np.maximum.reduceat(hi, starts, axis=1)
+
+        # Nilai besar di atas: baris = (h - 1) - nilai * h / 4096
+        top = np.clip((h - 1) - (hi * h / 4096).astype(np.intp), 0, h - 1)
+        bottom = np.clip((h - 1) - (lo * h / 4096).astype(np.intp), 0, h - 1)
+        column = np.arange(w)
+        size = w * (h + 1)
+        diff = (np.bincount((top * w + column).ravel(), minlength=size)
+                - np.bincount(((bottom + 1) * w + column).ravel(), minlength=size))
+        self.hist += np.cumsum(diff.reshape(h + 1, w), axis=0)[:h]
+        self.segments += k
+
+    def decay(self):
+        """Redupkan histogram (dipanggil sekali per frame)"""
+        self.hist *= self.decay_factor
+
+    def pixels(self, lut=None):
+        """Array (width, height) hasil LUT (default RGB uint8 (width, height, 3))"""
+        lut = self.lut if lut is None else lut
+        peak = float(self.hist.max())
+        scale = (len(lut) - 1) / peak if peak > 0 else 0.0
+        index = np.multiply(self.hist, scale, dtype=np.float32).astype(np.int32)
+        return lut[index.T]
+
+    def render(self, target, position, additive=True):
+        """Blit histogram ke `target` di `position` lewat pygame.surfarray
+
+        `additive`: dijumlahkan ke isi target (grid tetap terlihat).
+        """
+        import pygame   # Hanya render yang butuh pygame; histogram bisa dipakai tanpa pygame
+        if self.surface is None:
+            self.surface = pygame.Surface((self.width, self.height)).convert()
+            # LUT dalam format pixel surface: satu lookup uint32 per pixel, bukan tiga byte
+            self._mapped_lut = np.array([self.surface.map_rgb(tuple(rgb)) for rgb in self.lut.tolist()],
+                                        dtype=np.uint32)
+        pygame.surfarray.blit_array(self.surface, self.pixels(self._mapped_lut))
+        target.blit(self.surface, position, special_flags=pygame.BLEND_RGB_ADD if additive else 0)
+
+
+if __name__ == "__main__":
+    # Biaya per frame pada ukuran plot dynamic_wave_plotter untuk jumlah sampel berbeda
+    # (pengecekan histogram ada di tests/test_phosphor.py)
+    rng = np.random.default_rng(0)
+    width, height = 1300, 180
+    display = PhosphorDisplay(width, height, (100, 255, 100))
+
+    import pygame
+    pygame.display.init()
+    screen = pygame.display.set_mode((width, height))
+    for length in (250, 1000, 4000, 20000):
+        t = np.arange(length)
+        segments = 2048 + 1500 * np.sin(2 * np.pi * 3 * t / length + rng.normal(0, 0.1, (20, 1)))
+        segments += rng.normal(0, 20, segments.shape)
+        t0 = time.perf_counter()
+        for _ in range(10):
+            display.decay()
+            display.add(segments)
+            display.render(screen, (0, 0))
+        elapsed = (time.perf_counter() - t0) / 10
+        print(f"  20 segmen x {length:>5} sampel -> {width}x{height} pixel: {elapsed * 1000:6.2f} ms/frame")
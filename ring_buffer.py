@@ -0,0 +1,91 @@
+import numpy as np
+
+
+class RingBuffer:
+    """Ring buffer multi-channel dengan array int16 yang dialokasikan sekali
+
+    Satu writer (thread UART/generator) menambah blok sampel, reader
+    mengambil view tanpa copy dan tanpa lock. Setiap sampel disimpan dua
+    kali (posisi i dan i + capacity) sehingga window apa pun selalu berupa
+    slice yang kontinu.
+
+    `total` adalah sequence counter: jumlah sampel yang pernah ditulis.
+    Reader menyimpan nilai ini untuk mengetahui berapa sampel yang sudah
+    tertimpa sejak terakhir dibaca (lihat `lost_since`).
+    """
+
+    def __init__(self, capacity, channels=1, dtype=np.int16):
+        self.capacity = int(capacity)
+        self.channels = int(channels)
+        self._data = np.zeros((self.channels, 2 * self.capacity), dtype=dtype)
+        self._total = 0
+
+    @property
+    def total(self):
+        """Sequence counter (jumlah sampel yang pernah ditulis)"""
+        return self._total
+
+    def __len__(self):
+        return min(self._total, self.capacity)
+
+    def append(self, block):
+        """Tambah blok sampel, shape (channels, n) atau (n,) untuk satu channel"""
+        block = np.asarray(block)
+        if block.ndim == 1:
+            block = block.reshape(self.channels, -1)
+        n = block.shape[1]
+        if n == 0:
+            return
+
+        cap = self.capacity
+        total = self._total
+        if n > cap:
+            # Hanya capacity sampel terakhir yang tersimpan
+            total += n - cap
+            block = block[:, n - cap:]
+            n = cap
+
+        pos = total % cap
+        first = min(n, cap - pos)
+        self._data[:, pos:pos + n] = block
+        self._data[:, pos + cap:pos + cap + first] = block[:, :first]
+        self._data[:, :n - first] = block[:, first:]
+
+        # Update counter terakhir agar reader tidak melihat data setengah jadi
+        self._total = total + n
+
+    def window(self, start, length, total=None):
+        """View (tanpa copy) sampel [start, start + length) dalam sequence absolut
+
+        `total` adalah snapshot sequence counter; jika writer sudah menulis
+        lagi sesudahnya, gunakan `is_valid` untuk mengecek data yang dipakai.
+        """
+        if total is None:
+            total = self._total
+        if length > self.capacity or start < total - self.capacity or start + length > total:
+            raise ValueError(f"Window {start}+{length} di luar data ({total} sampel, capacity {self.capacity})")
+        pos = start % self.capacity
+        return self._data[:, pos:pos + length]
+
+    def latest(self, length):
+        """Return (view, start) untuk `length` sampel terbaru"""
+        total = self._total
+        start = total - length
+        return self.window(start, length, total), start
+
+    def since(self, seq):
+        """Return (view, start, lost) untuk semua sampel baru sejak sequence `seq`
+
+        `lost` adalah jumlah sampel yang sudah tertimpa sebelum sempat dibaca.
+        """
+        total = self._total
+        start = max(seq, total - self.capacity)
+        return self.window(start, total - start, total), start, start - seq
+
+    def lost_since(self, seq):
+        """Jumlah sampel setelah sequence `seq` yang sudah tertimpa"""
+        return max(0, self._total - self.capacity - seq)
+
+    def is_valid(self, start):
+        """True jika window yang dimulai di `start` belum tertimpa writer"""
+        return start >= self._total - self.capacity
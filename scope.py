@@ -0,0 +1,214 @@
+import argparse
+import time
+
+# --------- Config ---------
+SAMPLE_RATE = 20000         # Hz, sample rate FIR (50 MHz / 2500) untuk statistik headless
+STATUS_INTERVAL = 1.0       # s - interval cetak status link pada perintah record
+READ_SIZE = 65536           # Byte (sampel untuk capture channel) maksimal per read pada replay headless
+TRIGGER_LENGTH = 250        # Panjang window trigger untuk hitungan trigger replay headless
+# --------------------------
+
+# Entry point tunggal: modul ini hanya meng-import argparse. Backend (matplotlib,
+# pygame, serial, numpy) di-import di dalam perintah yang membutuhkannya, sehingga
+# perintah headless tidak menunggu matplotlib/pygame dan tidak ada port yang dibuka saat import.
+
+
+def plotter_options(args, names):
+    """Opsi yang diberikan di command line sebagai kwargs main() plotter (sisanya default plotter)"""
+    return {name: getattr(args, name) for name in names if getattr(args, name, None) is not None}
+
+
+TRIGGER_OPTIONS = ('samples', 'trigger_level', 'trigger_slope', 'hysteresis', 'holdoff', 'pre_trigger')
+SOURCE_OPTIONS = ('port', 'baud', 'replay', 'replay_speed')
+
+
+def cmd_single(args):
+    from optimized_plotter import main
+    main(**plotter_options(args, SOURCE_OPTIONS + TRIGGER_OPTIONS))
+
+
+def cmd_dual(args):
+    from dual_plotter import main
+    main(**plotter_options(args, SOURCE_OPTIONS + TRIGGER_OPTIONS +
+                           ('frame_format', 'record', 'archive_dir', 'emulate', 'serve', 'acquisition_process')))
+
+
+def cmd_multi(args):
+    import os
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    from dynamic_wave_plotter import main
+    main(**plotter_options(args, TRIGGER_OPTIONS + ('trigger_channel', 'phosphor')))
+
+
+def cmd_record(args):
+    """Rekam byte UART ke file capture (dan arsip sampel) tanpa tampilan"""
+    from capture import CaptureWriter, open_source
+    from frame_decoder import StreamDecoder
+    from link_stats import LinkStats
+
+    ser, close_source = open_source(args.port, args.baud, emulate=args.emulate,
+                                    frame_format=args.frame_format or 'framing')
+    recorder = CaptureWriter(args.output, rate=args.baud / 10)
+    decoder = StreamDecoder(args.frame_format)
+    link = LinkStats(decoder, expected_rate=SAMPLE_RATE)
+    archive = None
+    if args.archive_dir:
+        from archive import ArchiveWriter
+        archive = ArchiveWriter(args.archive_dir, channels=2, rate=SAMPLE_RATE)
+
+    print(f"Merekam {'emulator' if args.emulate else args.port} -> {args.output}"
+          f"{f' + arsip {args.archive_dir}' if archive is not None else ''} (Ctrl+C untuk berhenti)")
+    start = time.monotonic()
+    next_status = start + STATUS_INTERVAL
+    try:
+        while args.duration is None or time.monotonic() - start < args.duration:
+            waiting = ser.in_waiting
+            chunk = ser.read(max(1, waiting))
+            if chunk:
+                recorder.write(chunk)
+                block = decoder.feed(chunk)[:2]
+                link.record(len(chunk), block.shape[1], waiting)
+                if archive is not None and block.shape[1]:
+                    archive.write(block)
+            if time.monotonic() >= next_status:
+                next_status += STATUS_INTERVAL
+                print(link.summary())
+    except KeyboardInterrupt:
+        print("Stopping...")
+    finally:
+        close_source()
+        recorder.close()
+        print(link.summary())
+        print(f"Capture disimpan: {args.output} ({recorder.dropped_chunks} chunk terbuang)")
+        if recorder.error is not None:
+            print(f"Capture gagal ditulis: {recorder.error}")
+        if archive is not None:
+            archive.close()
+            print(f"Arsip: {archive.samples_written} sampel di {len(archive.files)} file {args.archive_dir} "
+                  f"({archive.dropped_samples} sampel terbuang)")
+            if archive.error is not None:
+                print(f"Arsip gagal ditulis: {archive.error}")
+
+
+def cmd_replay(args):
+    """Putar ulang file capture: ke plotter (--view) atau headless (decode, link stats, hitung trigger)"""
+    if args.view:
+        args.replay = args.file
+        (cmd_single if args.view == 'single' else cmd_dual)(args)
+        return
+
+    from capture import ReplaySerial, read_samples
+    from frame_decoder import StreamDecoder
+    from link_stats import LinkStats
+    from ring_buffer import RingBuffer
+    from trigger import Trigger
+
+    length = args.samples or TRIGGER_LENGTH
+    ser = ReplaySerial(args.file, speed=args.replay_speed or 0, loop=False)
+    decoder = StreamDecoder(args.frame_format)
+    link = LinkStats(decoder, expected_rate=SAMPLE_RATE)
+    trigger = Trigger(2048 if args.trigger_level is None else args.trigger_level, args.trigger_slope or 'rising',
+                      16 if args.hysteresis is None else args.hysteresis, args.holdoff or 0, args.pre_trigger or 0)
+    ring = RingBuffer(max(READ_SIZE, length * 4), channels=2)
+    triggers, last = 0, None
+
+    t0 = time.perf_counter()
+    while True:
+        received, _, block = read_samples(ser, decoder, size=READ_SIZE)
+        if block is None:
+            break
+        block = block[:2]
+        link.record(received, block.shape[1])
+        if not block.shape[1]:
+            continue
+        ring.append(block)
+        window, start = ring.latest(len(ring))
+        starts = trigger.locate_all(window[0], length, start, last)
+        if len(starts):
+            triggers += len(starts)
+            last = start + int(starts[-1]) + trigger.pre_trigger
+    elapsed = time.perf_counter() - t0
+    duration = ser.capture.duration
+    ser.close()
+
+    stats = link.snapshot()
+    print(f"{args.file}: {stats['bytes_received']:,} byte, {stats['samples']:,} sampel, "
+          f"format {stats.get('format', '-')}, rekaman {duration:.2f} s")
+    print(link.summary(stats).split("\n")[1])
+    print(f"Trigger (level {trigger.level}, {trigger.slope}, window {length}): {triggers} "
+          f"({triggers / duration if duration else 0:.1f}/s rekaman)")
+    print(f"Decode {elapsed:.2f} s ({stats['samples'] / elapsed if elapsed else 0:,.0f} sampel/s)")
+
+
+def cmd_bench(args):
+    import benchmark
+    raise SystemExit(benchmark.main(args.output or benchmark.RESULT_FILE, args.compare))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Plotter dan tool FIR_HPF_UART (satu entry point)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    # Opsi bersama: sumber data, format frame dan trigger
+    source = argparse.ArgumentParser(add_help=False)
+    source.add_argument("--port", help="Port serial board FPGA")
+    source.add_argument("--baud", type=int)
+    source.add_argument("--replay", help="File capture sebagai pengganti port serial")
+    source.add_argument("--replay-speed", type=float, help="1.0 = real-time, 0 = secepat mungkin")
+    frame = argparse.ArgumentParser(add_help=False)
+    frame.add_argument("--format", dest="frame_format", choices=['framing', 'packed'],
+                       help="Format frame (default: deteksi otomatis)")
+    trigger = argparse.ArgumentParser(add_help=False)
+    trigger.add_argument("--samples", type=int, help="Jumlah sampel yang ditampilkan")
+    trigger.add_argument("--trigger-level", type=int)
+    trigger.add_argument("--slope", dest="trigger_slope", choices=['rising', 'falling'])
+    trigger.add_argument("--hysteresis", type=int, help="LSB")
+    trigger.add_argument("--holdoff", type=int, help="Sampel")
+    trigger.add_argument("--pre-trigger", type=int, help="Sampel")
+
+    single = commands.add_parser("single", parents=[source, trigger], help="Satu channel, stream dua byte (matplotlib)")
+    single.set_defaults(func=cmd_single)
+
+    dual = commands.add_parser("dual", parents=[source, frame, trigger], help="Dual channel FRAMING (matplotlib)")
+    dual.add_argument("--record", help="Rekam byte UART ke file capture")
+    dual.add_argument("--archive", dest="archive_dir", help="Direktori arsip sampel")
+    dual.add_argument("--emulate", action="store_true", default=None, help="Gunakan fpga_emulator lewat pty")
+    dual.add_argument("--serve", type=int, metavar="PORT", help="Stream sampel ke client (TCP + WebSocket)")
+    dual.add_argument("--process", dest="acquisition_process", action="store_true", default=None,
+                      help="Baca dan decode UART di proses terpisah (shared memory)")
+    dual.set_defaults(func=cmd_dual)
+
+    multi = commands.add_parser("multi", parents=[trigger], help="Multi gelombang dinamis (pygame)")
+    multi.add_argument("--channel", dest="trigger_channel", type=int, help="Gelombang trigger (0-4)")
+    multi.add_argument("--phosphor", action="store_true", default=None, help="Tampilan digital phosphor")
+    multi.set_defaults(func=cmd_multi)
+
+    record = commands.add_parser("record", parents=[frame], help="Rekam UART ke file capture (headless)")
+    record.add_argument("output", help="File capture tujuan")
+    record.add_argument("--port", default="COM3")
+    record.add_argument("--baud", type=int, default=2000000)
+    record.add_argument("--emulate", action="store_true", help="Gunakan fpga_emulator lewat pty")
+    record.add_argument("--archive", dest="archive_dir", help="Direktori arsip sampel (juga di-decode)")
+    record.add_argument("--duration", type=float, help="s - berhenti otomatis")
+    record.set_defaults(func=cmd_record)
+
+    replay = commands.add_parser("replay", parents=[frame, trigger], help="Putar ulang file capture")
+    replay.add_argument("file")
+    replay.add_argument("--view", choices=['single', 'dual'], help="Tampilkan di plotter (default: headless)")
+    replay.add_argument("--replay-speed", type=float, help="Headless: default secepat mungkin")
+    replay.set_defaults(func=cmd_replay)
+
+    bench = commands.add_parser("bench", help="Benchmark decode, trigger dan render (headless)")
+    bench.add_argument("-o", "--output", help="File hasil (default benchmark.RESULT_FILE)")
+    bench.add_argument("--compare", help="File hasil sebelumnya untuk deteksi regresi")
+    bench.set_defaults(func=cmd_bench)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
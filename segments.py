@@ -0,0 +1,130 @@
+import time
+import numpy as np
+
+# --------- Config ---------
+SEGMENT_COUNT = 256         # Jumlah segmen ter-trigger yang disimpan
+PERSISTENCE_BINS = 256      # Resolusi vertikal persistence (4096 / 256 = 16 LSB per bin)
+PERSISTENCE_DECAY = 0.95    # Bobot per segmen yang lebih lama (1.0 = infinite persistence)
+MODES = ('normal', 'average', 'envelope', 'persistence')
+# --------------------------
+
+
+class SegmentMemory:
+    """Segmented memory: N segmen ter-trigger dalam satu array 2-D yang dialokasikan sekali
+
+    Array shape (count, channels, length) dipakai sebagai ring. Rata-rata
+    memakai jumlah berjalan (tambah segmen baru, kurangi segmen yang
+    tertimpa), envelope dan persistence dihitung vectorized di atas seluruh
+    tumpukan segmen. `segment(back)` membuka segmen lama tanpa menghentikan
+    akuisisi.
+    """
+
+    def __init__(self, count=SEGMENT_COUNT, length=250, channels=1, bins=PERSISTENCE_BINS,
+                 decay=PERSISTENCE_DECAY):
+        self.count = count
+        self.length = length
+        self.channels = channels
+        self.bins = bins
+        self.decay = decay
+        self._segments = np.zeros((count, channels, length), dtype=np.int16)
+        self._sequence = np.zeros(count, dtype=np.int64)    # Sequence trigger setiap segmen
+        self._sum = np.zeros((channels, length), dtype=np.int64)
+        self.total = 0              # Jumlah segmen yang pernah ditambahkan
+
+    def __len__(self):
+        return min(self.total, self.count)
+
+    def clear(self):
+        self._sum[:] = 0
+        self.total = 0
+
+    def add(self, segment, sequence=0):
+        """Simpan satu segmen (channels, length), menimpa segmen tertua jika penuh"""
+        slot = self.total % self.count
+        segment = np.asarray(segment).reshape(self.channels, self.length)
+        if self.total >= self.count:
+            self._sum -= self._segments[slot]
+        self._segments[slot] = segment
+        self._sum += segment
+        self._sequence[slot] = sequence
+        self.total += 1
+
+    def _slot(self, back):
+        if not 0 <= back < len(self):
+            raise IndexError(f"Segmen {back} tidak tersedia ({len(self)} tersimpan)")
+        return (self.total - 1 - back) % self.count
+
+    def segment(self, back=0):
+        """Segmen ke-`back` dari yang terbaru (0 = terbaru), return (data, sequence trigger)"""
+        slot = self._slot(back)
+        return self._segments[slot], int(self._sequence[slot])
+
+    def _stack(self):
+        """Segmen tersimpan, urutan slot (bukan urutan waktu)"""
+        return self._segments[:len(self)]
+
+    def average(self):
+        """Rata-rata semua segmen tersimpan (float, channels x length)"""
+        return self._sum / max(len(self), 1)
+
+    def envelope(self):
+        """Return (min, max) per titik di semua segmen tersimpan"""
+        stack = self._stack()
+        return stack.min(axis=0), stack.max(axis=0)
+
+    def persistence(self):
+        """Histogram hit per (channel, bin nilai, posisi) dengan bobot decay^umur, dinormalisasi 0..1
+
+        Segmen terbaru berbobot 1, segmen sebelumnya decay, decay^2, dst.
+        """
+        n = len(self)
+        hist = np.zeros(self.channels * self.bins * self.length)
+        if n == 0:
+            return hist.reshape(self.channels, self.bins, self.length)
+        stack = self._stack()
+        age = (self.total - 1 - np.arange(n)) % self.count
+        weights = np.broadcast_to((self.decay ** age)[:, None, None], stack.shape)
+
+        bins = np.clip(stack.astype(np.int64) * self.bins // 4096, 0, self.bins - 1)
+        channel = np.arange(self.channels)[None, :, None]
+        position = np.arange(self.length)[None, None, :]
+        flat = (channel * self.bins + bins) * self.length + position
+        hist += np.bincount(flat.ravel(), weights.ravel(), minlength=hist.size)
+        hist = hist.reshape(self.channels, self.bins, self.length)
+        peak = hist.max()
+        return hist / peak if peak > 0 else hist
+
+
+def persistence_rgba(hist, colors):
+    """Gabungkan persistence beberapa channel menjadi gambar RGBA (bins x length x 4)
+
+    `colors` berisi warna RGB (0..1) per channel; intensitas = nilai histogram.
+    """
+    hist = np.asarray(hist)
+    colors = np.asarray(colors, dtype=np.float64)
+    rgb = np.einsum('cbl,ck->blk', hist, colors)
+    image = np.empty(hist.shape[1:] + (4,))
+    image[..., :3] = np.clip(rgb, 0, 1)
+    image[..., 3] = np.clip(hist.max(axis=0) * 1.5, 0, 1)
+    return image
+
+
+if __name__ == "__main__":
+    # Ukur biaya per frame tampilan (pengecekan ada di tests/test_segments.py)
+    rng = np.random.default_rng(0)
+    length, channels = 250, 2
+    memory = SegmentMemory(SEGMENT_COUNT, length, channels)
+    for i in range(SEGMENT_COUNT + 37):
+        seg = (2048 + 1500 * np.sin(np.arange(length) / 20 + rng.normal(0, 0.05))
+               + rng.normal(0, 20, (channels, length))).astype(np.int16)
+        memory.add(seg, i)
+
+    for name, fn in (("add", lambda: memory.add(seg)), ("average", memory.average),
+                     ("envelope", memory.envelope), ("persistence", memory.persistence),
+                     ("persistence_rgba", lambda: persistence_rgba(memory.persistence(),
+                                                                   [(0, 0, 1), (1, 0, 0)]))):
+        t0 = time.perf_counter()
+        for _ in range(20):
+            fn()
+        print(f"  {name:<17} {(time.perf_counter() - t0) / 20 * 1000:7.3f} ms "
+              f"({SEGMENT_COUNT} segmen x {channels} x {length})")
@@ -0,0 +1,249 @@
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import numpy as np
+from multiprocessing import resource_tracker, shared_memory
+from ring_buffer import RingBuffer
+
+# --------- Config ---------
+SHM_NAME = 'fir_hpf_ring'   # Nama shared memory default
+ATTACH_TIMEOUT = 5.0        # s - tunggu proses akuisisi membuat shared memory
+WAIT_SLOTS = 8              # Consumer maksimal yang menunggu dengan wait() sekaligus
+WAIT_POLL = 0.01            # s - interval polling wait() jika semua slot terpakai
+# --------------------------
+
+# Header shared memory: int64[4 + WAIT_SLOTS] = magic, capacity, channels, total,
+# lalu tabel port UDP notifikasi per consumer (0 = slot kosong)
+HEADER_MAGIC = 0x46495252   # 'FIRR'
+HEADER_SLOTS = 4
+HEADER_WORDS = HEADER_SLOTS + WAIT_SLOTS
+
+
+class SharedRingBuffer(RingBuffer):
+    """RingBuffer di multiprocessing.shared_memory (1 producer, banyak consumer)
+
+    Layout data sama dengan RingBuffer (mirrored), sequence counter `total`
+    disimpan di header shared memory. Producer menulis sampel dulu lalu
+    menaikkan counter, sehingga consumer di proses lain bisa membaca tanpa
+    lock dan tanpa copy, lalu mengecek hasilnya dengan `is_valid`.
+
+    Consumer dapat menunggu data baru dengan `wait` (tanpa polling): setiap
+    consumer mencatat port UDP loopback-nya di slot sendiri pada tabel port
+    header, dan producer mengirim satu datagram ke setiap slot terisi setiap
+    kali counter naik. Slot diklaim tanpa lock; jika dua consumer merebut
+    slot yang sama, yang kalah melihatnya di `wait` berikutnya dan pindah ke
+    slot lain (paling buruk satu wait berakhir di timeout).
+    """
+
+    def __init__(self, capacity=None, channels=1, name=SHM_NAME, create=True):
+        if create:
+            size = HEADER_WORDS * 8 + 2 * 2 * capacity * channels
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        else:
+            self._shm = _attach_untracked(name)
+        self._header = np.ndarray((HEADER_WORDS,), dtype=np.int64, buffer=self._shm.buf)
+
+        if create:
+            # Magic ditulis terakhir agar consumer tidak membaca header setengah jadi
+            self._header[:] = 0
+            self._header[1:HEADER_SLOTS] = (capacity, channels, 0)
+            self._header[0] = HEADER_MAGIC
+        elif self._header[0] != HEADER_MAGIC:
+            raise ValueError(f"Shared memory '{name}' bukan SharedRingBuffer")
+
+        self.name = name
+        self.capacity = int(self._header[1])
+        self.channels = int(self._header[2])
+        self._owner = create
+        self._notify = None         # Socket UDP: kirim (producer) atau terima (consumer yang menunggu)
+        self._slot = None           # Index slot port consumer ini di header
+        self._data = np.ndarray((self.channels, 2 * self.capacity), dtype=np.int16,
+                                buffer=self._shm.buf, offset=HEADER_WORDS * 8)
+
+    @classmethod
+    def attach(cls, name=SHM_NAME, timeout=ATTACH_TIMEOUT):
+        """Attach ke ring yang dibuat proses lain (tunggu sampai tersedia)"""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return cls(name=name, create=False)
+            except FileNotFoundError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.05)
+
+    @property
+    def _total(self):
+        return int(self._header[3])
+
+    @_total.setter
+    def _total(self, value):
+        self._header[3] = value
+
+    def append(self, block):
+        super().append(block)
+        ports = [port for port in self._header[HEADER_SLOTS:].tolist() if port]
+        if ports:
+            if self._notify is None:
+                self._notify = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            for port in ports:
+                try:
+                    self._notify.sendto(b"\x01", ("127.0.0.1", port))
+                except OSError:
+                    pass            # Consumer sudah keluar
+
+    def _claim_slot(self):
+        """Pastikan port consumer ini tercatat di slot sendiri; return False jika tabel penuh"""
+        port = self._notify.getsockname()[1]
+        if self._slot is not None and self._header[self._slot] == port:
+            return True
+        free = np.flatnonzero(self._header[HEADER_SLOTS:] == 0)
+        if not len(free):
+            self._slot = None
+            return False
+        self._slot = HEADER_SLOTS + int(free[0])
+        self._header[self._slot] = port
+        return True
+
+    def wait(self, seq, timeout=None):
+        """Blok sampai ada sampel setelah sequence `seq` (atau timeout); return True jika ada"""
+        if self._notify is None:
+            self._notify = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._notify.bind(("127.0.0.1", 0))
+        if not self._claim_slot():
+            # Semua slot terpakai: polling counter sampai timeout
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while self._total <= seq and (deadline is None or time.monotonic() < deadline):
+                time.sleep(WAIT_POLL)
+            return self._total > seq
+        # Buang notifikasi lama dulu: append sesudah ini pasti mengirim datagram baru
+        self._notify.setblocking(False)
+        try:
+            while True:
+                self._notify.recv(64)
+        except OSError:
+            pass
+        if self._total > seq:
+            return True
+        self._notify.settimeout(timeout)
+        try:
+            self._notify.recv(64)
+        except OSError:
+            pass                    # Timeout
+        return self._total > seq
+
+    def close(self):
+        """Lepas mapping; producer juga menghapus shared memory"""
+        if self._notify is not None:
+            # Slot hanya dikosongkan jika masih milik consumer ini
+            if self._slot is not None and self._header[self._slot] == self._notify.getsockname()[1]:
+                self._header[self._slot] = 0
+            self._notify.close()
+        self._data = None
+        self._header = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+def _attach_untracked(name):
+    """Attach tanpa didaftarkan ke resource_tracker milik consumer
+
+    Sebelum Python 3.13 resource_tracker akan menghapus shared memory saat
+    proses consumer keluar, padahal pemiliknya adalah proses producer.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+    return shm
+
+
+def acquire(port, baud, capacity, name=SHM_NAME, replay=None, replay_speed=1.0, record=None,
+            frame_format=None, emulate=False):
+    """Loop proses akuisisi: baca serial, decode FRAMING / FRAMING_PACKED, tulis ke shared ring"""
+    from frame_decoder import StreamDecoder
+    from capture import CaptureWriter, open_source, read_samples
+
+    ser, close_source = open_source(port, baud, replay, replay_speed, emulate,
+                                    frame_format=frame_format or 'framing')
+    recorder = CaptureWriter(record, rate=baud / 10) if record else None
+
+    ring = SharedRingBuffer(capacity, channels=2, name=name)
+    decoder = StreamDecoder(frame_format)
+    # SIGTERM dari proses plot -> keluar dengan rapi (shared memory di-unlink)
+    signal.signal(signal.SIGTERM, _terminate)
+    print(f"Akuisisi {replay or ('emulator' if emulate else port)} -> shared memory '{name}' ({capacity} sampel)")
+    try:
+        while True:
+            try:
+                _, _, block = read_samples(ser, decoder, recorder)
+                if block is None:
+                    continue
+                block = block[:2]
+                if block.shape[1]:
+                    ring.append(block)
+            except KeyboardInterrupt:
+                raise
+            except Exception as e:
+                print(f"UART error: {e}")
+                decoder.reset()
+                time.sleep(0.01)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        close_source()
+        if recorder is not None:
+            recorder.close()
+        ring.close()
+
+
+def _terminate(signum, frame):
+    raise KeyboardInterrupt
+
+
+def start_acquisition_process(port, baud, capacity, name=None, replay=None, replay_speed=1.0,
+                              record=None, frame_format=None, emulate=False):
+    """Jalankan `acquire` di proses terpisah (python shm_ring.py ...)
+
+    Dijalankan sebagai subprocess, bukan multiprocessing.Process, agar
+    skrip plotter tidak di-import ulang di proses anak pada Windows.
+    Return (process, nama shared memory); nama default unik per proses
+    pemanggil sehingga sisa shared memory dari sesi lama tidak terpakai.
+    """
+    if name is None:
+        name = f"{SHM_NAME}_{os.getpid()}"
+    args = [sys.executable, os.path.abspath(__file__), "--port", str(port), "--baud", str(baud),
+            "--capacity", str(capacity), "--name", name]
+    if replay:
+        args += ["--replay", replay, "--replay-speed", str(replay_speed)]
+    if record:
+        args += ["--record", record]
+    if frame_format:
+        args += ["--format", frame_format]
+    if emulate:
+        args += ["--emulate"]
+    return subprocess.Popen(args), name
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Proses akuisisi UART -> shared memory ring")
+    parser.add_argument("--port", default="COM3")
+    parser.add_argument("--baud", type=int, default=2000000)
+    parser.add_argument("--capacity", type=int, default=1 << 16)
+    parser.add_argument("--name", default=SHM_NAME)
+    parser.add_argument("--replay", help="File capture sebagai pengganti port serial")
+    parser.add_argument("--replay-speed", type=float, default=1.0)
+    parser.add_argument("--record", help="Rekam byte UART ke file capture")
+    parser.add_argument("--format", choices=['framing', 'packed'], help="Format frame (default: deteksi otomatis)")
+    parser.add_argument("--emulate", action="store_true", help="Gunakan fpga_emulator lewat pty")
+    args = parser.parse_args()
+    acquire(args.port, args.baud, args.capacity, args.name, args.replay, args.replay_speed, args.record,
+            args.format, args.emulate)
@@ -0,0 +1,129 @@
+import time
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# --------- Config ---------
+SAMPLE_RATE = 20000         # Hz, sample FIR (50 MHz / 2500)
+NFFT = 1024                 # Panjang segmen FFT (resolusi 19.5 Hz @ 20 kHz)
+OVERLAP = 0.5               # Overlap antar segmen (Welch)
+AVERAGES = 16               # Konstanta waktu rata-rata eksponensial (segmen)
+MIN_COHERENCE = 0.5         # Bin dengan koherensi lebih kecil tidak dipakai untuk H
+# --------------------------
+
+# np.fft dengan parameter out= (tanpa alokasi per segmen) tersedia sejak numpy 2.0
+RFFT_HAS_OUT = np.lib.NumpyVersion(np.__version__) >= '2.0.0'
+
+
+class SpectrumAnalyzer:
+    """Welch streaming: PSD setiap channel dan cross-spectrum terhadap channel 0
+
+    Sampel masuk per blok, segmen yang lengkap (window Hann, overlap
+    OVERLAP) di-FFT sekaligus dalam satu batch, lalu dirata-rata secara
+    eksponensial. Buffer window, segmen dan hasil FFT dialokasikan ulang
+    hanya jika batch lebih besar dari sebelumnya.
+
+    `transfer(c)` = Pxy / Pxx (estimator H1) dan koherensi channel c
+    terhadap channel 0, misalnya respons FIR_HPF dari ch0 ke ch1.
+    """
+
+    def __init__(self, channels=2, nfft=NFFT, overlap=OVERLAP, averages=AVERAGES, rate=SAMPLE_RATE):
+        self.channels = channels
+        self.nfft = nfft
+        self.hop = max(1, int(nfft * (1 - overlap)))
+        self.averages = averages
+        self.rate = rate
+        self.window = np.hanning(nfft)
+        # Skala PSD satu sisi dalam LSB^2/Hz
+        self._scale = 2.0 / (rate * np.sum(self.window ** 2))
+        self.freqs = np.fft.rfftfreq(nfft, 1.0 / rate)
+        self._carry = np.empty((channels, 0))
+        self._work = np.empty((channels, 0, nfft))
+        self._spec = np.empty((channels, 0, len(self.freqs)), dtype=np.complex128)
+        self.reset()
+
+    def reset(self):
+        self._carry = np.empty((self.channels, 0))
+        # (Pxx per channel, Pxy channel c vs ch0) diganti sekaligus agar pembaca
+        # di thread lain selalu melihat pasangan yang konsisten
+        self._state = (np.zeros((self.channels, len(self.freqs))),
+                       np.zeros((self.channels, len(self.freqs)), dtype=np.complex128))
+        self.segments = 0
+
+    def feed(self, block):
+        """Tambah blok (channels, n); return jumlah segmen baru yang di-FFT"""
+        block = np.asarray(block).reshape(self.channels, -1)
+        data = np.concatenate((self._carry, block), axis=1)
+        if data.shape[1] < self.nfft:
+            self._carry = data
+            return 0
+
+        segments = sliding_window_view(data, self.nfft, axis=1)[:, ::self.hop]
+        k = segments.shape[1]
+        self._carry = data[:, k * self.hop:]
+
+        if k > self._work.shape[1]:
+            self._work = np.empty((self.channels, k, self.nfft))
+            self._spec = np.empty((self.channels, k, len(self.freqs)), dtype=np.complex128)
+        work, spec = self._work[:, :k], self._spec[:, :k]
+        # Buang DC per segmen (offset 2048 dan offset ADC), lalu window
+        np.subtract(segments, segments.mean(axis=2, keepdims=True), out=work)
+        work *= self.window
+        if RFFT_HAS_OUT:
+            np.fft.rfft(work, axis=2, out=spec)
+        else:
+            spec[...] = np.fft.rfft(work, axis=2)
+
+        pxx = np.mean(spec.real ** 2 + spec.imag ** 2, axis=1) * self._scale
+        pxy = np.mean(spec * np.conj(spec[:1]), axis=1) * self._scale
+
+        # Rata-rata kumulatif sampai AVERAGES segmen, sesudahnya eksponensial
+        alpha = max(k / (self.segments + k), 1.0 - (1.0 - 1.0 / self.averages) ** k)
+        old_pxx, old_pxy = self._state
+        self._state = (old_pxx + alpha * (pxx - old_pxx), old_pxy + alpha * (pxy - old_pxy))
+        self.segments += k
+        return k
+
+    def psd(self):
+        """Return (freqs, Pxx) shape (channels, bins) dalam LSB^2/Hz"""
+        return self.freqs, self._state[0]
+
+    def transfer(self, channel=1, min_coherence=MIN_COHERENCE):
+        """Return (freqs, H, coherence) channel terhadap channel 0
+
+        Bin dengan koherensi di bawah `min_coherence` diisi NaN.
+        """
+        pxx, pxy = self._state
+        with np.errstate(divide='ignore', invalid='ignore'):
+            h = pxy[channel] / pxx[0]
+            coherence = np.abs(pxy[channel]) ** 2 / (pxx[0] * pxx[channel])
+        h[~(coherence >= min_coherence)] = np.nan
+        return self.freqs, h, coherence
+
+
+if __name__ == "__main__":
+    from fir_model import FirHpfModel, frequency_response
+
+    # White noise melewati model bit-exact FIR_HPF, bandingkan dengan respons teoritis
+    # (batas error diuji di tests/test_spectrum.py)
+    rng = np.random.default_rng(0)
+    seconds = 10
+    ch0 = np.clip(2048 + rng.normal(0, 300, SAMPLE_RATE * seconds), 0, 4095).astype(np.int64)
+    ch1 = FirHpfModel().process(ch0)
+
+    analyzer = SpectrumAnalyzer(averages=1 << 20)
+    block = SAMPLE_RATE // 20
+    t0 = time.perf_counter()
+    for i in range(0, len(ch0), block):
+        analyzer.feed(np.vstack((ch0[i:i + block], ch1[i:i + block])))
+    elapsed = time.perf_counter() - t0
+    print(f"{analyzer.segments} segmen FFT untuk {seconds} s data: {elapsed * 1000:.1f} ms "
+          f"({elapsed / seconds * 100:.2f}% waktu real-time)")
+
+    freqs, h, coherence = analyzer.transfer()
+    theory = frequency_response(freqs, SAMPLE_RATE)
+    # Model tanpa delay tambahan, jadi fase juga bisa dibandingkan (stopband < 1.5 kHz dilewati)
+    band = (freqs > 1500) & (freqs < 9500)
+    err_db = np.abs(20 * np.log10(np.abs(h[band]) / np.abs(theory[band])))
+    err_phase = np.abs(np.angle(h[band] / theory[band], deg=True))
+    print(f"Passband 1.5..9.5 kHz: error magnitude maks {err_db.max():.2f} dB, "
+          f"fase maks {err_phase.max():.1f} derajat, koherensi min {coherence[band].min():.3f}")
@@ -0,0 +1,537 @@
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import socket
+import struct
+import threading
+import time
+import numpy as np
+from capture import open_source, read_samples
+from ring_buffer import RingBuffer
+from trigger import Trigger
+
+# --------- Config ---------
+HOST = '127.0.0.1'          # '0.0.0.0' agar bisa diakses dari LAN
+PORT = 5555                 # TCP dan WebSocket di port yang sama
+CLIENT_QUEUE = 64           # Pesan maksimal yang menunggu per client (lebih: pesan tertua dibuang)
+SEND_BUFFER = 65536         # Byte - buffer kirim socket per client (membatasi latency client lambat)
+SEGMENT_RATE = 20           # Segmen ter-trigger maksimal per detik per client (default)
+SEGMENT_LENGTH = 250        # Panjang segmen default (sampel setelah decimation)
+# --------------------------
+
+# Pesan biner: header + data int16 (channels, count) C-order
+#   magic, kind, channels, decimation, start (index sampel sumber), count, dropped (pesan dibuang untuk client ini)
+HEADER = struct.Struct('<4sBBHqII')
+MAGIC = b'FIRS'
+KIND_STREAM = 0             # Sampel (decimation 'pick')
+KIND_MINMAX = 1             # Pasangan min, max per bucket decimation (count = 2 x bucket)
+KIND_SEGMENT = 2            # Segmen ter-trigger (start = index sampel sumber awal window)
+KIND_SEGMENT_MINMAX = 3
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def pack_message(kind, decimation, start, data, dropped=0):
+    data = np.ascontiguousarray(data, dtype=np.int16)
+    return HEADER.pack(MAGIC, kind, data.shape[0], decimation, start, data.shape[1], dropped) + data.tobytes()
+
+
+def unpack_message(message):
+    """Return (kind, decimation, start, dropped, data (channels, count))"""
+    magic, kind, channels, decimation, start, count, dropped = HEADER.unpack_from(message)
+    if magic != MAGIC:
+        raise ValueError("Bukan pesan stream_server")
+    data = np.frombuffer(message, dtype=np.int16, offset=HEADER.size).reshape(channels, count)
+    return kind, decimation, start, dropped, data
+
+
+def _minmax(data, n):
+    """(channels, k * n) -> (channels, 2k): min, max bergantian per bucket"""
+    buckets = data.reshape(data.shape[0], -1, n)
+    out = np.empty((data.shape[0], buckets.shape[1], 2), dtype=np.int16)
+    out[:, :, 0] = buckets.min(axis=2)
+    out[:, :, 1] = buckets.max(axis=2)
+    return out.reshape(data.shape[0], -1)
+
+
+class ClientView:
+    """Setting dan state satu client: decimation, mode dan trigger sendiri
+
+    Konfigurasi (JSON, bisa dikirim ulang kapan saja):
+      decimate  : N >= 1, bucket sejajar index sampel absolut
+      mode      : 'pick' (setiap sampel ke-N) atau 'minmax' (min dan max per N sampel)
+      stream    : kirim blok kontinu (default true)
+      trigger   : null atau {level, slope, hysteresis, holdoff, pre, length, channel, rate}
+    Trigger dicari pada sampel asli, segmen dikirim setelah decimation.
+    """
+
+    def __init__(self, config=None):
+        self.configure(config or {})
+
+    def configure(self, config):
+        """Terapkan konfigurasi; jika tidak valid raise ValueError/TypeError dan setting lama tetap dipakai"""
+        if not isinstance(config, dict):
+            raise TypeError(f"konfigurasi harus object JSON, bukan {type(config).__name__}")
+        decimate = max(1, min(int(config.get('decimate', 1)), 65535))
+        mode = config.get('mode', 'pick')
+        if mode not in ('pick', 'minmax'):
+            raise ValueError(f"mode tidak dikenal: {mode}")
+        stream = bool(config.get('stream', True))
+
+        settings = config.get('trigger')
+        trigger = None
+        if settings:
+            if not isinstance(settings, dict):
+                raise TypeError("trigger harus object JSON atau null")
+            slope = settings.get('slope', 'rising')
+            if slope not in ('rising', 'falling'):
+                raise ValueError(f"slope tidak dikenal: {slope}")
+            trigger = Trigger(int(settings.get('level', 2048)), slope,
+                              int(settings.get('hysteresis', 16)), int(settings.get('holdoff', 0)),
+                              int(settings.get('pre', 0)) * decimate)
+            trigger_channel = int(settings.get('channel', 0))
+            segment_raw = int(settings.get('length', SEGMENT_LENGTH)) * decimate
+            segment_interval = 1.0 / max(float(settings.get('rate', SEGMENT_RATE)), 1e-3)
+
+        # Semua setting valid, baru diterapkan sekaligus
+        self.decimate, self.mode, self.stream = decimate, mode, stream
+        self._carry = None
+        self._carry_start = 0
+        self.trigger = trigger
+        if trigger is not None:
+            self.trigger_channel = trigger_channel
+            self.segment_raw = segment_raw
+            self.segment_interval = segment_interval
+            self._ring = None
+            self._last_segment = None
+            self._next_segment = 0.0
+
+    def process(self, block, start, now):
+        """Return list pesan (tanpa header dropped) untuk blok sampel asli mulai index `start`"""
+        messages = []
+        if self.stream:
+            out = self._decimate_stream(block, start)
+            if out is not None:
+                messages.append(out)
+        if self.trigger is not None:
+            out = self._segment(block, start, now)
+            if out is not None:
+                messages.append(out)
+        return messages
+
+    def _decimate_stream(self, block, start):
+        n = self.decimate
+        if n == 1:
+            return KIND_STREAM, 1, start, block
+        if self.mode == 'pick':
+            # Sampel dengan index absolut kelipatan N: tanpa state antar blok
+            offset = (-start) % n
+            picked = block[:, offset::n]
+            return (KIND_STREAM, n, start + offset, picked) if picked.shape[1] else None
+
+        # minmax: bucket [kN, (k+1)N), sisa bucket disimpan untuk blok berikutnya
+        if self._carry is not None and self._carry_start + self._carry.shape[1] == start:
+            data = np.concatenate((self._carry, block), axis=1)
+            data_start = self._carry_start
+        else:
+            data, data_start = block, start
+        offset = (-data_start) % n
+        full = (data.shape[1] - offset) // n
+        end = offset + full * n
+        self._carry = data[:, end:].copy()
+        self._carry_start = data_start + end
+        if full <= 0:
+            return None
+        return KIND_MINMAX, n, data_start + offset, _minmax(data[:, offset:end], n)
+
+    def _segment(self, block, start, now):
+        if self._ring is None or self._ring.channels != block.shape[0]:
+            self._ring = RingBuffer(3 * self.segment_raw, block.shape[0])
+        self._ring.append(block)
+        if now < self._next_segment or len(self._ring) < self.segment_raw:
+            return None
+        window, window_start = self._ring.latest(len(self._ring))
+        point = self.trigger.locate(window[min(self.trigger_channel, block.shape[0] - 1)],
+                                    self.segment_raw, window_start)
+        if point is None or self.trigger.last_trigger == self._last_segment:
+            return None
+        self._last_segment = self.trigger.last_trigger
+        self._next_segment = now + self.segment_interval
+        segment = window[:, point:point + self.segment_raw]
+        if self.decimate == 1:
+            return KIND_SEGMENT, 1, window_start + point, segment
+        if self.mode == 'pick':
+            return KIND_SEGMENT, self.decimate, window_start + point, segment[:, ::self.decimate]
+        return KIND_SEGMENT_MINMAX, self.decimate, window_start + point, _minmax(segment, self.decimate)
+
+
+class _Client:
+    def __init__(self, peer, websocket):
+        self.peer = peer
+        self.websocket = websocket
+        self.view = ClientView()
+        self.queue = asyncio.Queue(CLIENT_QUEUE)
+        self.dropped = 0            # Pesan yang dibuang karena client lambat
+        self.sent = 0
+
+    def offer(self, message):
+        """Masukkan pesan tanpa pernah menunggu; jika antrian penuh, pesan tertua dibuang"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+
+class StreamServer:
+    """Server fan-out: blok sampel yang sudah di-decode sekali dikirim ke banyak client
+
+    Client TCP mengirim konfigurasi JSON per baris; client WebSocket
+    (GET + Upgrade di port yang sama) mengirim JSON sebagai pesan teks.
+    Server mengirim pesan biner HEADER + int16 (TCP: diawali panjang
+    uint32 little-endian, WebSocket: satu frame biner per pesan).
+
+    `publish` dipanggil dari thread reader dan hanya menjadwalkan
+    pekerjaan ke event loop, sehingga client yang lambat tidak pernah
+    menahan reader. Setiap client punya antrian sendiri sepanjang
+    CLIENT_QUEUE; jika penuh, pesan tertua dibuang dan dihitung di header.
+    """
+
+    def __init__(self, host=HOST, port=PORT):
+        self.host = host
+        self.port = port
+        self.clients = set()
+        self.published = 0          # Sampel yang sudah dipublish
+        self.loop = None
+        self._server = None
+        self._handlers = {}         # Task handler client -> writer (ditutup saat shutdown)
+        self._ready = threading.Event()
+
+    def start(self):
+        """Jalankan event loop di thread daemon, return setelah socket siap"""
+        threading.Thread(target=self._run, daemon=True).start()
+        self._ready.wait()
+        return self
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._server = self.loop.run_until_complete(asyncio.start_server(self._handle, self.host, self.port))
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self.loop.run_forever()
+        self.loop.close()
+
+    def close(self):
+        if self.loop is not None and self.loop.is_running():
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result(2.0)
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+    async def _shutdown(self):
+        """Tutup koneksi client dan tunggu handler selesai sendiri (EOF), baru sisanya dibatalkan"""
+        self._server.close()
+        for writer in list(self._handlers.values()):
+            writer.close()
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=1.0)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def publish(self, block, start):
+        """Kirim blok (channels, n) dengan index sampel pertama `start` (aman dari thread lain)"""
+        self.published = start + block.shape[1]
+        if self.clients:
+            self.loop.call_soon_threadsafe(self._publish, block, start)
+
+    def _publish(self, block, start):
+        now = time.monotonic()
+        for client in list(self.clients):
+            try:
+                for kind, decimation, first, data in client.view.process(block, start, now):
+                    client.offer((kind, decimation, first, data))
+            except Exception as e:
+                print(f"Client {client.peer}: {e}")
+                client.view = ClientView()
+
+    async def _handle(self, reader, writer):
+        self._handlers[asyncio.current_task()] = writer
+        try:
+            await self._serve_client(reader, writer)
+        except asyncio.CancelledError:
+            pass    # Shutdown: task ini dimiliki server, selesai tanpa traceback di callback asyncio
+        finally:
+            del self._handlers[asyncio.current_task()]
+            writer.close()
+
+    async def _serve_client(self, reader, writer):
+        peer = writer.get_extra_info('peername')
+        writer.get_extra_info('socket').setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER)
+        writer.transport.set_write_buffer_limits(SEND_BUFFER)
+        try:
+            first = await reader.readline()
+        except (ConnectionError, asyncio.LimitOverrunError):
+            writer.close()
+            return
+        websocket = first.startswith(b"GET ")
+        client = _Client(peer, websocket)
+        if websocket:
+            if not await _ws_handshake(reader, writer):
+                writer.close()
+                return
+        else:
+            self._configure(client, first)
+        self.clients.add(client)
+        sender = asyncio.ensure_future(self._send_loop(client, writer))
+        try:
+            while True:
+                if websocket:
+                    text = await _ws_read(reader, writer)
+                else:
+                    text = await reader.readline()
+                if not text:
+                    break
+                self._configure(client, text)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.clients.discard(client)
+            sender.cancel()
+            writer.close()
+
+    def _configure(self, client, text):
+        text = text.strip()
+        if not text:
+            return
+        try:
+            client.view.configure(json.loads(text))
+        except (ValueError, TypeError, OverflowError) as e:
+            print(f"Konfigurasi client {client.peer} tidak valid: {e}")
+
+    async def _send_loop(self, client, writer):
+        try:
+            while True:
+                kind, decimation, start, data = await client.queue.get()
+                message = pack_message(kind, decimation, start, data, client.dropped)
+                if client.websocket:
+                    writer.write(_ws_frame(message))
+                else:
+                    writer.write(struct.pack('<I', len(message)) + message)
+                client.sent += 1
+                # Hanya coroutine client ini yang menunggu socket, reader dan client lain jalan terus
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+
+
+async def _ws_handshake(reader, writer):
+    """Handshake WebSocket (RFC 6455) setelah baris GET sudah dibaca"""
+    key = None
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'sec-websocket-key':
+            key = value.strip().encode()
+    if key is None:
+        writer.write(b"HTTP/1.1 400 Bad Request\r\n\r\n")
+        return False
+    accept = base64.b64encode(hashlib.sha1(key + WS_GUID).digest())
+    writer.write(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                 b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+    await writer.drain()
+    return True
+
+
+def _ws_frame(payload, opcode=0x2):
+    n = len(payload)
+    if n < 126:
+        header = struct.pack('!BB', 0x80 | opcode, n)
+    elif n < 1 << 16:
+        header = struct.pack('!BBH', 0x80 | opcode, 126, n)
+    else:
+        header = struct.pack('!BBQ', 0x80 | opcode, 127, n)
+    return header + payload
+
+
+async def _ws_read(reader, writer):
+    """Baca satu pesan teks/biner dari client (ping dijawab), return b'' jika ditutup"""
+    while True:
+        b0, b1 = await reader.readexactly(2)
+        opcode, n = b0 & 0x0F, b1 & 0x7F
+        if n == 126:
+            n = struct.unpack('!H', await reader.readexactly(2))[0]
+        elif n == 127:
+            n = struct.unpack('!Q', await reader.readexactly(8))[0]
+        mask = await reader.readexactly(4) if b1 & 0x80 else b"\0\0\0\0"
+        payload = np.frombuffer(await reader.readexactly(n), dtype=np.uint8)
+        payload = (payload ^ np.resize(np.frombuffer(mask, dtype=np.uint8), n)).tobytes()
+        if opcode == 0x8:
+            return b""
+        if opcode == 0x9:
+            writer.write(_ws_frame(payload, 0xA))
+            continue
+        if opcode in (0x1, 0x2):
+            return payload
+
+
+class StreamClient:
+    """Client TCP sederhana (blocking) untuk StreamServer"""
+
+    def __init__(self, host=HOST, port=PORT, config=None, timeout=5.0, recv_buffer=None):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        if recv_buffer:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, recv_buffer)
+        self.sock.settimeout(timeout)
+        self.sock.connect((host, port))
+        self.configure(config or {})
+
+    def configure(self, config):
+        self.sock.sendall(json.dumps(config).encode() + b"\n")
+
+    def _read(self, n):
+        buf = bytearray()
+        while len(buf) < n:
+            part = self.sock.recv(n - len(buf))
+            if not part:
+                raise ConnectionError("Server menutup koneksi")
+            buf += part
+        return bytes(buf)
+
+    def receive(self):
+        """Return (kind, decimation, start, dropped, data (channels, count))"""
+        size = struct.unpack('<I', self._read(4))[0]
+        return unpack_message(self._read(size))
+
+    def close(self):
+        self.sock.close()
+
+
+def acquire(ser, decoder, server, stats=None, recorder=None, stop=None):
+    """Loop reader: baca serial, decode sekali, publish ke semua client"""
+    seq = 0
+    while stop is None or not stop.is_set():
+        try:
+            received, waiting, block = read_samples(ser, decoder, recorder)
+            if block is None:
+                continue
+            if stats is not None:
+                stats.record(received, block.shape[1], waiting)
+            if block.shape[1]:
+                server.publish(block, seq)
+                seq += block.shape[1]
+        except Exception as e:
+            print(f"UART error: {e}")
+            if stats is not None:
+                stats.error(e)
+            decoder.reset()
+            time.sleep(0.01)
+
+
+def loopback_test(seconds=3.0, speed=1.0):
+    """Emulator -> server -> beberapa client lewat loopback, termasuk satu client yang tidak membaca
+
+    Return (results, slow_dropped, gaps): results[nama] = (sampel/s, segmen/s, dibuang),
+    gaps[nama] = daftar (start, expected) blok kontinu yang tidak bersambung.
+    """
+    from frame_decoder import StreamDecoder
+    from link_stats import LinkStats
+
+    ser, cleanup = open_source(None, 2000000, emulate=True, speed=speed, frame_format='packed')
+    server = StreamServer(port=0).start()
+    decoder = StreamDecoder()
+    stats = LinkStats(decoder, expected_rate=20000 * speed)
+    stop = threading.Event()
+    threading.Thread(target=acquire, args=(ser, decoder, server, stats, None, stop), daemon=True).start()
+
+    configs = {"full": {}, "minmax/50": {"decimate": 50, "mode": "minmax"},
+               "trigger/4": {"decimate": 4, "stream": False, "trigger": {"level": 2048, "length": 250}}}
+    results = {}
+    gaps = {name: [] for name in configs}
+
+    def run(name, config):
+        client = StreamClient(port=server.port, config=config)
+        samples, segments, dropped, last = 0, 0, 0, None
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            kind, decimation, start, dropped, data = client.receive()
+            if kind in (KIND_SEGMENT, KIND_SEGMENT_MINMAX):
+                segments += 1
+                continue
+            # Blok kontinu harus bersambung (tanpa sampel hilang jika client tidak tertinggal)
+            if last is not None and kind == KIND_STREAM and decimation == 1 and start != last:
+                gaps[name].append((start, last))
+            last = start + data.shape[1]
+            samples += data.shape[1] * decimation // (2 if kind == KIND_MINMAX else 1)
+        client.close()
+        results[name] = (samples / seconds, segments / seconds, dropped)
+
+    # Client lambat: buffer terima kecil dan tidak pernah membaca
+    slow = StreamClient(port=server.port, recv_buffer=4096)
+    threads = [threading.Thread(target=run, args=item) for item in configs.items()]
+    t0 = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - t0
+    peer = slow.sock.getsockname()
+    slow_dropped = sum(c.dropped for c in list(server.clients) if c.peer == peer)
+    slow.close()
+    stop.set()
+    server.close()
+    cleanup()
+
+    link = stats.snapshot()
+    print(f"Loopback {elapsed:.1f} s, speed {speed}x, format {link.get('format')}: "
+          f"sumber {link['samples'] / elapsed:,.0f} sampel/s")
+    for name, (rate, segments, dropped) in results.items():
+        print(f"  {name:<10} {rate:>10,.0f} sampel/s  {segments:5.1f} segmen/s  dibuang {dropped}  "
+              f"tidak bersambung {len(gaps[name])}")
+    print(f"  client lambat: {slow_dropped} pesan dibuang, reader tetap berjalan")
+    return results, slow_dropped, gaps
+
+
+if __name__ == "__main__":
+    from frame_decoder import StreamDecoder
+    from link_stats import LinkStats
+
+    parser = argparse.ArgumentParser(description="Server fan-out sampel ter-decode (TCP + WebSocket)")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--serial", default="COM3", help="Port serial board FPGA")
+    parser.add_argument("--baud", type=int, default=2000000)
+    parser.add_argument("--replay", help="File capture sebagai pengganti port serial")
+    parser.add_argument("--replay-speed", type=float, default=1.0)
+    parser.add_argument("--emulate", action="store_true", help="Gunakan fpga_emulator lewat pty")
+    parser.add_argument("--speed", type=float, default=1.0, help="Pengali laju emulator")
+    parser.add_argument("--format", default='framing', choices=['framing', 'packed'], help="Format emulator")
+    parser.add_argument("--record", help="Rekam byte UART ke file capture")
+    parser.add_argument("--loopback-test", action="store_true", help="Uji emulator -> server -> client")
+    args = parser.parse_args()
+
+    if args.loopback_test:
+        loopback_test(speed=args.speed)
+    else:
+        ser, cleanup = open_source(args.serial, args.baud, args.replay, args.replay_speed,
+                                   args.emulate, args.speed, args.format)
+        recorder = None
+        if args.record:
+            from capture import CaptureWriter
+            recorder = CaptureWriter(args.record, rate=args.baud / 10)
+        server = StreamServer(args.host, args.port).start()
+        decoder = StreamDecoder()
+        stats = LinkStats(decoder)
+        print(f"Stream server di {args.host}:{server.port} (TCP: JSON per baris, WebSocket: ws://host:port/)")
+        try:
+            acquire(ser, decoder, server, stats, recorder)
+        except KeyboardInterrupt:
+            print("Stopping...")
+        finally:
+            server.close()
+            cleanup()
+            if recorder is not None:
+                recorder.close()
+            print(stats.summary())
@@ -0,0 +1,91 @@
+import errno
+import os
+import threading
+import numpy as np
+import archive
+from archive import ArchiveReader, ArchiveWriter
+
+RATE = 20000
+T0_NS = 1_700_000_000 * 10 ** 9
+
+
+def write_archive(directory, data, block=333, **kwargs):
+    writer = ArchiveWriter(str(directory), channels=data.shape[0], rate=RATE, **kwargs)
+    for i in range(0, data.shape[1], block):
+        part = data[:, i:i + block]
+        writer.write(part, T0_NS + (i + part.shape[1] - 1) * 10 ** 9 // RATE)
+    writer.close()
+    return writer
+
+
+def sine_data(seconds):
+    rng = np.random.default_rng(0)
+    t = np.arange(RATE * seconds)
+    ch0 = np.clip(2048 + 1800 * np.sin(2 * np.pi * 1000 * t / RATE) + rng.normal(0, 8, len(t)), 0, 4095)
+    return np.vstack((ch0, 4095 - ch0)).astype(np.int16)
+
+
+def test_roundtrip_with_rotation(tmp_path):
+    data = sine_data(10)
+    writer = write_archive(tmp_path, data, chunk_samples=16384, rotate_bytes=1 << 18)
+    assert writer.samples_written == data.shape[1] and writer.dropped_samples == 0
+    assert len(writer.files) > 1
+    assert sum(os.path.getsize(f) for f in writer.files) < data.nbytes
+
+    reader = ArchiveReader(str(tmp_path))
+    out, index, times = reader.query_index(0, data.shape[1])
+    assert np.array_equal(out, data) and np.array_equal(index, np.arange(data.shape[1]))
+    assert (np.diff(times) >= 0).all()
+    reader.close()
+
+
+def test_time_query_reads_only_overlapping_chunks(tmp_path):
+    data = sine_data(10)
+    write_archive(tmp_path, data, chunk_samples=16384)
+    reader = ArchiveReader(str(tmp_path))
+    a, b = T0_NS + 4 * 10 ** 9, T0_NS + 5 * 10 ** 9
+    out, index, times = reader.query(a, b, channels=[1])
+    assert index[0] == 4 * RATE and index[-1] == 5 * RATE
+    assert np.array_equal(out[0], data[1, index])
+    assert (times >= a).all() and (times <= b).all()
+    # Hanya chunk yang beririsan dengan range yang didekompresi
+    assert reader.chunks_read == len(np.unique(index // 16384)) < 10
+    summary = reader.overview(a, b)
+    assert len(summary) == reader.chunks_read and summary['max'][:, 1].max() >= out[0].max()
+    reader.close()
+
+
+def test_unclosed_file_index_rebuilt(tmp_path):
+    data = sine_data(2)
+    writer = write_archive(tmp_path, data, chunk_samples=8192)
+    path = writer.files[-1]
+    with open(path, "r+b") as f:
+        f.truncate(f.seek(0, 2) - 16)       # Footer hilang (proses mati sebelum close)
+    reader = ArchiveReader(str(tmp_path))
+    out, _, _ = reader.query_index(0, data.shape[1])
+    # Index ditelusuri ulang dari header chunk; index lama yang tertinggal tidak dianggap chunk
+    assert np.array_equal(out, data)
+    reader.close()
+
+
+def test_close_does_not_hang_when_writer_died(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "QUEUE_BLOCKS", 4)
+    writer = ArchiveWriter(str(tmp_path), channels=2, rate=RATE, chunk_samples=100)
+
+    def full_disk(*args):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    writer._flush = full_disk
+    block = np.zeros((2, 100), dtype=np.int16)
+    for i in range(50):
+        writer.write(block, T0_NS + i)
+    closer = threading.Thread(target=writer.close, daemon=True)
+    closer.start()
+    closer.join(5.0)
+    assert not closer.is_alive()
+    assert isinstance(writer.error, OSError) and writer.error.errno == errno.ENOSPC
+    # Blok sesudah writer mati dibuang, bukan diantri selamanya
+    dropped = writer.dropped_samples
+    assert dropped > 0
+    writer.write(block)
+    assert writer.dropped_samples == dropped + 100
@@ -0,0 +1,105 @@
+import errno
+import threading
+import numpy as np
+import capture
+from capture import KIND_CHANNELS, CaptureFile, CaptureWriter, ReplaySerial, read_samples
+from frame_decoder import FramingDecoder, StreamDecoder, encode_frames
+from ring_buffer import RingBuffer
+import scope
+
+
+def write_capture(path, chunks, **kwargs):
+    writer = CaptureWriter(str(path), **kwargs)
+    for chunk in chunks:
+        writer.write(chunk)
+    writer.close()
+    return str(path)
+
+
+def test_raw_roundtrip_through_decoder(tmp_path):
+    data0 = np.arange(50000) % 4096
+    stream = encode_frames(data0, 4095 - data0)
+    path = write_capture(tmp_path / "raw.cap", [stream[i:i + 1000] for i in range(0, len(stream), 1000)])
+
+    replay = ReplaySerial(path, speed=0)
+    assert not replay.blocks
+    decoder = FramingDecoder()
+    out = []
+    while True:
+        chunk = replay.read(max(1, replay.in_waiting))
+        if not chunk:
+            break
+        out.append(decoder.feed(chunk)[0])
+    replay.close()
+    assert np.array_equal(np.concatenate(out), data0)
+
+
+def test_index_rebuilt_without_footer(tmp_path):
+    path = write_capture(tmp_path / "raw.cap", [b"a" * 100, b"b" * 50])
+    with open(path, "r+b") as f:
+        f.truncate(f.seek(0, 2) - 16)       # Footer hilang (proses mati sebelum close)
+    cap = CaptureFile(path)
+    assert cap.total_items == 150 and len(cap.index) == 2
+    cap.close()
+
+
+def test_channel_capture_replays_blocks(tmp_path):
+    data = np.arange(3 * 2000, dtype=np.int16).reshape(3, 2000)
+    path = write_capture(tmp_path / "ch.cap", [data[:, i:i + 300] for i in range(0, 2000, 300)],
+                         kind=KIND_CHANNELS, channels=3, rate=20000)
+
+    replay = ReplaySerial(path, speed=0)
+    assert replay.blocks and replay.in_waiting == 2000
+    ring = RingBuffer(4000, channels=3)
+    decoder = StreamDecoder()
+    while True:
+        received, _, block = read_samples(replay, decoder, size=512)
+        if block is None:
+            break
+        assert received == 0 and block.shape[1] <= 512
+        ring.append(block)
+    replay.close()
+    assert np.array_equal(ring.latest(2000)[0], data)
+    assert decoder.frame_count == 0
+
+
+def test_scope_replay_accepts_channel_capture(tmp_path, capsys):
+    t = np.arange(20000)
+    ch0 = (2048 + 1000 * np.sin(2 * np.pi * 100 * t / 20000)).astype(np.int16)
+    path = write_capture(tmp_path / "ch.cap", [np.vstack([ch0, ch0])], kind=KIND_CHANNELS, channels=2, rate=20000)
+    scope.main(["replay", path])
+    assert "20,000 sampel" in capsys.readouterr().out
+
+
+class FullDisk:
+    """File yang gagal ditulis seperti disk penuh"""
+
+    def __init__(self, file):
+        self._file = file
+
+    def tell(self):
+        return self._file.tell()
+
+    def write(self, data):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    def close(self):
+        self._file.close()
+
+
+def test_close_does_not_hang_when_writer_died(tmp_path, monkeypatch):
+    monkeypatch.setattr(capture, "QUEUE_CHUNKS", 4)
+    writer = CaptureWriter(str(tmp_path / "full.cap"))
+    writer._file = FullDisk(writer._file)
+    for _ in range(20):
+        writer.write(b"x" * 100)
+    closer = threading.Thread(target=writer.close, daemon=True)
+    closer.start()
+    closer.join(5.0)
+    assert not closer.is_alive()
+    assert isinstance(writer.error, OSError) and writer.error.errno == errno.ENOSPC
+    # Chunk sesudah writer mati dibuang, bukan diantri selamanya
+    dropped = writer.dropped_chunks
+    assert dropped > 0
+    writer.write(b"y")
+    assert writer.dropped_chunks == dropped + 1
@@ -0,0 +1,21 @@
+import numpy as np
+import dynamic_wave_plotter as dwp
+
+
+def test_generator_uses_one_parameter_row_per_wave(monkeypatch):
+    monkeypatch.setattr(dwp, "WAVE_COUNT", 3)
+    monkeypatch.setattr(dwp, "time_counter", 0.0)
+    monkeypatch.setattr(dwp, "wave_params", [dict(params) for params in dwp.wave_params])
+    dwp.init_state()
+    dwp.generate_dynamic_waves(400)
+
+    block, _ = dwp.wave_buffers.latest(400)
+    assert block.shape == (3, 400)
+    t = dwp.TIME_STEP * np.arange(1, 401)
+    for row, params in zip(block, dwp.wave_params[:3]):
+        freq = params['base_freq'] + np.sin(t * params['freq_rate']) * 0.5
+        expected = np.clip(dwp.OFFSET + dwp.AMPLITUDE * np.sin(2 * np.pi * freq * t + params['phase']), 0, 4095)
+        assert np.array_equal(row, expected.astype(np.int64).astype(row.dtype))
+        assert params['freq'] == freq[-1]
+    # Gelombang yang tidak ditampilkan tidak ikut diperbarui
+    assert dwp.wave_params[3]['freq'] == dwp.wave_params[3]['base_freq']
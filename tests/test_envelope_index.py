@@ -0,0 +1,79 @@
+import numpy as np
+from envelope_index import EnvelopeIndex
+
+FACTOR = 8
+
+
+def build(n, sizes=(1000,), seed=0):
+    # Append dengan ukuran blok bergantian agar melintasi batas blok piramida
+    rng = np.random.default_rng(seed)
+    data = rng.integers(0, 4096, (2, n)).astype(np.int16)
+    index = EnvelopeIndex(2, FACTOR)
+    i = k = 0
+    while i < n:
+        size = sizes[k % len(sizes)]
+        index.append(data[:, i:i + size])
+        i += size
+        k += 1
+    return data, index
+
+
+def test_levels_match_brute_force_after_unaligned_appends():
+    n = FACTOR ** 5 + 123
+    data, index = build(n, sizes=(7, 13, 1, 500, 4095))
+    assert len(index) == n and index.levels == 6
+    for level in range(1, index.levels):
+        size = FACTOR ** level
+        done = n // size
+        blocks = data[:, :done * size].reshape(2, done, size)
+        assert index._mins[level - 1].count == done
+        assert np.array_equal(index._mins[level - 1].data[:, :done], blocks.min(axis=2))
+        assert np.array_equal(index._maxs[level - 1].data[:, :done], blocks.max(axis=2))
+
+
+def test_query_exact_on_aligned_columns():
+    n = 3 * FACTOR ** 5
+    data, index = build(n, sizes=(333, 1000))
+    cols = 96
+    # Setiap kolom tepat beberapa blok level 0..4: hasil harus sama persis
+    for level in range(5):
+        stop = cols * FACTOR ** level
+        x, lo, hi = index.query(0, stop, cols)
+        assert len(x) == min(cols, stop)
+        assert np.array_equal(lo, np.minimum.reduceat(data[:, :stop], x, axis=1))
+        assert np.array_equal(hi, np.maximum.reduceat(data[:, :stop], x, axis=1))
+
+
+def test_query_never_hides_peaks():
+    n = 20000 * 30
+    data, index = build(n, sizes=(1000, 77))
+    for start, stop, cols in ((0, n, 1200), (12345, 12345 + 500000, 1200), (777, 1777, 1200),
+                              (n - 5000, n, 1200), (100, 110, 50), (5, n - 3, 333)):
+        x, lo, hi = index.query(start, stop, cols)
+        assert len(x) <= cols
+        assert x[0] == start and np.all(np.diff(x) > 0)
+        # Blok paling lebar satu kolom, jadi setiap sampel tercakup oleh kolomnya atau kolom sebelumnya
+        exact_lo = np.minimum.reduceat(data[:, start:stop], x - start, axis=1)
+        exact_hi = np.maximum.reduceat(data[:, start:stop], x - start, axis=1)
+        near_lo = np.minimum(lo, np.concatenate((lo[:, :1], lo[:, :-1]), axis=1))
+        near_hi = np.maximum(hi, np.concatenate((hi[:, :1], hi[:, :-1]), axis=1))
+        assert np.all(near_lo <= exact_lo) and np.all(near_hi >= exact_hi)
+        # Puncak global tetap terlihat
+        assert lo.min() <= data[:, start:stop].min() and hi.max() >= data[:, start:stop].max()
+
+
+def test_query_unfinished_tail_and_raw_zoom():
+    n = FACTOR ** 3 + 5
+    data = np.random.default_rng(1).integers(0, 4096, (2, n)).astype(np.int16)
+    data[0, n - 2] = 5000
+    data[1, n - 2] = -1
+    index = EnvelopeIndex(2, FACTOR)
+    for i in range(0, n, 3):
+        index.append(data[:, i:i + 3])
+    # Ekor yang belum menjadi blok lengkap tetap ikut dalam envelope
+    x, lo, hi = index.query(0, n, 16)
+    assert hi[0, -1] == 5000 and lo[1, -1] == -1
+    # Lebih sedikit sampel dari kolom: sampel mentah
+    x, lo, hi = index.query(10, 30, 100)
+    assert np.array_equal(x, np.arange(10, 30)) and np.array_equal(lo, data[:, 10:30])
+    assert np.array_equal(lo, hi)
@@ -0,0 +1,39 @@
+import os
+import numpy as np
+import fir_design
+from fir_design import best, candidates, evaluate, passes, quantize, sweep, synthetic_input, vhdl_source
+from fir_model import COEFFS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_vhdl_source_regenerates_fir_hpf():
+    # Generator VHDL harus menghasilkan ulang FIR_HPF.vhd dari koefisien aslinya (tanpa spasi di akhir baris)
+    with open(os.path.join(ROOT, "FIR_HPF.vhd")) as f:
+        original = [line.rstrip() for line in f.read().splitlines()]
+    assert vhdl_source(COEFFS, 16, 15, 28).splitlines() == original
+
+
+def test_quantize_uses_full_coefficient_range():
+    coeffs_q, frac = quantize(np.array([0.9, -0.3, 0.05]), 12)
+    assert frac == 11 and coeffs_q.tolist() == [1843, -614, 102]
+    assert np.abs(coeffs_q).max() <= (1 << 11) - 1
+
+
+def test_sweep_parallel_matches_serial_and_uses_cache(tmp_path):
+    x = synthetic_input(seconds=0.05)
+    items = candidates(taps=(21, 51), cutoffs=(1000.0,), windows=('hamming',), bits=(12, 16))
+    cache = str(tmp_path / "cache.json")
+    results, computed = sweep(items, x, cache_path=cache, workers=2)
+    assert computed == len(items)
+    assert results == [evaluate(c, x, fir_design.SAMPLE_RATE) for c in items]
+    assert sweep(items, x, cache_path=cache)[1] == 0
+
+
+def test_best_ranks_by_generated_multipliers():
+    base = {"stopband_db": 50.0, "ripple_db": 0.1, "wraps": 0, "error_rms": 0.5, "bits": 12, "acc_bits": 24}
+    results = [dict(base, multipliers=33), dict(base, multipliers=29, bits=16),
+               dict(base, multipliers=21, stopband_db=30.0)]
+    assert [passes(r) for r in results] == [True, True, False]
+    assert best(results)["multipliers"] == 29
+    assert best(results[2:]) is None
@@ -0,0 +1,41 @@
+import os
+import numpy as np
+from fir_model import COEFFS, FirHpfModel, FirVerifier, frequency_response, read_vhdl_coefficients, reference_fir
+from frame_decoder import FramingDecoder, encode_frames
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_coefficients_match_vhdl():
+    assert np.array_equal(read_vhdl_coefficients(os.path.join(ROOT, "FIR_HPF.vhd")), COEFFS)
+
+
+def test_model_bit_exact_across_block_boundaries():
+    x = np.random.default_rng(0).integers(0, 4096, 3000)
+    model = FirHpfModel()
+    y = np.concatenate([model.process(x[i:i + 97]) for i in range(0, len(x), 97)])
+    assert np.array_equal(y, reference_fir(x))
+
+
+def test_highpass_response():
+    stop = np.abs(frequency_response(np.linspace(0, 500, 50), 20000))
+    passband = np.abs(frequency_response(np.linspace(2000, 9000, 50), 20000))
+    assert stop.max() < 0.01
+    assert 0.8 < passband.min() and passband.max() < 1.2
+
+
+def test_verifier_locks_delay_and_counts_mismatches():
+    fs = 20000
+    t = np.arange(fs * 2)
+    ch0 = (2048 + 1800 * np.sin(2 * np.pi * 1000 * t / fs)).astype(np.int64)
+    ch1 = np.concatenate((np.full(3, 2048), FirHpfModel().process(ch0)[:-3]))
+    ch1[5000:5010] ^= 1
+    stream = encode_frames(ch0, ch1)
+
+    decoder = FramingDecoder()
+    verifier = FirVerifier()
+    chunk = len(stream) // 100
+    for i in range(0, len(stream), chunk):
+        verifier.feed(*decoder.feed(stream[i:i + chunk]))
+    assert verifier.delay == 3 and verifier.mismatches == 10
+    assert "delay 3" in verifier.status()
@@ -0,0 +1,122 @@
+import numpy as np
+from frame_decoder import (FramingDecoder, PackedDecoder, PairDecoder, StreamDecoder, PACKED_SETS,
+                           crc8, encode_frames, encode_packed, encode_pairs, packed_frame_size,
+                           throughput_test, packed_throughput_test, pair_throughput_test)
+
+# Decoder harus jauh lebih cepat dari line rate 2 Mbaud agar thread reader tidak tertinggal
+MIN_MARGIN = 10
+
+
+def feed_chunks(decoder, stream, size):
+    return [decoder.feed(bytes(stream[i:i + size])) for i in range(0, len(stream), size)]
+
+
+def test_framing_roundtrip_chunked():
+    rng = np.random.default_rng(0)
+    data0 = rng.integers(0, 4096, 5000)
+    data1 = rng.integers(0, 4096, 5000)
+    decoder = FramingDecoder()
+    out = feed_chunks(decoder, encode_frames(data0, data1), 4093)
+    assert np.array_equal(np.concatenate([d0 for d0, _ in out]), data0)
+    assert np.array_equal(np.concatenate([d1 for _, d1 in out]), data1)
+    assert decoder.frame_count == 5000
+    assert decoder.resync_count == 0 and decoder.dropped_bytes == 0 and decoder.bad_frames == 0
+
+
+def test_framing_resync():
+    data0 = np.arange(1000) % 4096
+    data1 = (4095 - np.arange(1000)) % 4096
+    stream = bytearray(encode_frames(data0, data1))
+    del stream[601]                 # Byte hilang di frame ke-100
+    stream[1204] = 0x00             # Marker 'E' frame ke-200 rusak
+    stream[3000:3000] = b"\x53\x00\x45"   # Sisipan byte sampah
+
+    decoder = FramingDecoder()
+    out0 = np.concatenate([d0 for d0, _ in feed_chunks(decoder, stream, 7)])   # Chunk ganjil: frame terpotong
+    assert decoder.resync_count >= 2
+    assert np.all(np.isin(out0, data0))
+    assert len(out0) >= len(data0) - 4
+    # Tepat: frame 100, 200, frame 500 yang disisipi, dan 'S' sampah sisipan
+    assert decoder.frame_count == 997 and decoder.bad_frames == 4
+
+
+def test_framing_throughput():
+    assert throughput_test(seconds=2.0) >= MIN_MARGIN
+
+
+def test_packed_lost_frames_and_crc():
+    channels, sets, n_frames = 4, PACKED_SETS, 2000
+    rng = np.random.default_rng(0)
+    data = rng.integers(0, 4096, (channels, n_frames * sets))
+    stream = bytearray(encode_packed(data, sets))
+    size = packed_frame_size(channels, sets)
+    del stream[300 * size:303 * size]       # 3 frame hilang
+    stream[997 * size + 7] ^= 0x10          # Payload frame 1000 korup -> CRC salah, dibuang
+    stream[1500 * size:1500 * size] = b"\xa5\x5a\x00"   # Sync palsu
+
+    decoder = StreamDecoder()
+    out = np.concatenate(feed_chunks(decoder, stream, 1000), axis=1)
+
+    kept = np.ones(n_frames, dtype=bool)
+    kept[[300, 301, 302, 1000]] = False
+    expected = data.reshape(channels, n_frames, sets)[:, kept].reshape(channels, -1)
+    assert decoder.format == 'packed' and decoder.channels == channels
+    assert decoder.lost_frames == 4 and decoder.crc_errors == 1
+    assert np.array_equal(out, expected)
+
+
+def test_packed_throughput():
+    assert packed_throughput_test(seconds=2.0) >= MIN_MARGIN
+
+
+def test_stream_decoder_fixed_format():
+    data = np.arange(100) % 4096
+    decoder = StreamDecoder('framing')
+    out = decoder.feed(encode_frames(data, data[::-1]))
+    # Tanpa deteksi: frame pertama langsung keluar
+    assert decoder.format == 'framing' and np.array_equal(out[0], data)
+    assert StreamDecoder('packed').format == 'packed'
+
+
+def test_pair_realign():
+    rng = np.random.default_rng(0)
+    values = rng.integers(0, 4096, 100000)
+    stream = bytearray(encode_pairs(values))
+    del stream[20001]                   # Byte LOW sampel 10000 hilang
+    stream[100000:100000] = b"\x12"     # Sisipan byte di sampel ~50000
+    stream[150001] ^= 0x03              # Noise di byte LOW, alignment tetap
+
+    decoder = PairDecoder()
+    out = np.concatenate(feed_chunks(decoder, stream, 333))
+    assert decoder.realign_count >= 2 and decoder.corrupt_pairs >= 1
+    # Semua sampel setelah realign kembali benar: 1000 sampel terakhir identik
+    assert np.array_equal(out[-1000:], values[-1000:])
+    assert len(out) >= len(values) - 8
+
+
+def test_pair_throughput():
+    assert pair_throughput_test(seconds=2.0) >= MIN_MARGIN
+
+
+def test_packed_false_sync_overlapping_real_frame():
+    # Sampah sebelum frame 50 membentuk kandidat sync + INFO + CRC valid yang overlap frame asli
+    channels, sets, n_frames = 2, PACKED_SETS, 100
+    rng = np.random.default_rng(0)
+    data = rng.integers(0, 4096, (channels, n_frames * sets))
+    stream = bytearray(encode_packed(data, sets))
+    size = packed_frame_size(channels, sets)
+    t, g = 50 * size, 8
+    info = ((channels - 1) << 4) | (sets - 1)
+    for seq in range(256):
+        candidate = stream[:t] + bytes([0xA5, 0x5A, seq, info, 1, 2, 3, 4]) + stream[t:]
+        body = np.frombuffer(bytes(candidate[t + 2:t + size - 1]), dtype=np.uint8)
+        if crc8(body[None, :])[0] == candidate[t + size - 1]:
+            break
+    else:
+        raise AssertionError("CRC kandidat palsu tidak bisa dibuat")
+
+    decoder = PackedDecoder()
+    out = decoder.feed(bytes(candidate))
+    # Frame asli yang bersambung dipilih, kandidat palsu dibuang
+    assert np.array_equal(out, data)
+    assert decoder.lost_frames == 0 and decoder.dropped_bytes == g
@@ -0,0 +1,24 @@
+import os
+import subprocess
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_output(modules, backends):
+    """Output proses baru yang meng-import `modules` lalu mencetak backend yang ikut ter-import"""
+    code = (f"import sys; import {', '.join(modules)}; "
+            f"print(','.join(m for m in {backends!r} if m in sys.modules))")
+    return subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True,
+                          check=True, timeout=60).stdout
+
+
+@pytest.mark.parametrize("modules, backends", [
+    (("dynamic_wave_plotter", "phosphor"), ("pygame", "serial")),
+    (("dual_plotter", "optimized_plotter"), ("matplotlib", "serial", "pygame")),
+    (("scope",), ("numpy", "matplotlib", "pygame", "serial")),
+])
+def test_import_has_no_backend(modules, backends):
+    # Tidak ada backend yang ter-import dan tidak ada output (banner pygame) saat import
+    assert import_output(modules, backends) == "\n"
@@ -0,0 +1,61 @@
+import json
+import time
+import urllib.error
+import urllib.request
+import numpy as np
+import pytest
+from frame_decoder import StreamDecoder, encode_frames
+from link_stats import METRIC_PREFIX, LinkStats, MetricsExporter
+
+
+def decoded_stats():
+    data = np.random.default_rng(0).integers(0, 4096, (2, 5000))
+    stream = bytearray(encode_frames(data[0], data[1]))
+    del stream[601]                 # Byte hilang: satu frame rusak, decoder resync
+    decoder = StreamDecoder()
+    stats = LinkStats(decoder)
+    for i in range(0, len(stream), 4096):
+        chunk = bytes(stream[i:i + 4096])
+        stats.record(len(chunk), decoder.feed(chunk).shape[1])
+    return stats, len(stream)
+
+
+def test_snapshot_reads_decoder_counters():
+    stats, size = decoded_stats()
+    s = stats.snapshot()
+    assert s["bytes_received"] == size and s["samples"] == s["frame_count"] == 4999
+    assert s["resync_count"] >= 1 and s["format"] == "framing"
+    assert "frame 4999" in stats.summary(s)
+
+
+def test_stall_backlog_and_error():
+    stats = LinkStats(stall_time=0.01, backlog_level=100)
+    stats.record(10, 0)
+    time.sleep(0.03)
+    stats.record(10, 0, waiting=200)
+    stats.error(OSError("port hilang"))
+    s = stats.snapshot()
+    assert (s["stalls"], s["backlog_high"], s["errors"]) == (1, 1, 1)
+    assert "backlog 1" in stats.summary(s)
+    assert s["longest_stall_s"] >= 0.03 and stats.last_error == "port hilang"
+    assert "frame_count" not in s      # Tanpa decoder tidak ada counter frame
+
+
+def test_exporter_http_and_file(tmp_path):
+    stats, _ = decoded_stats()
+    path = str(tmp_path / "metrics.json")
+    exporter = MetricsExporter(stats, path=path, port=0, interval=60)
+    try:
+        url = f"http://127.0.0.1:{exporter.port}"
+        with urllib.request.urlopen(url + "/metrics") as response:
+            text = response.read().decode()
+        assert f"{METRIC_PREFIX}frame_count 4999" in text
+        assert f'{METRIC_PREFIX}info{{format="framing"}} 1' in text
+        with urllib.request.urlopen(url + "/metrics.json") as response:
+            assert json.load(response)["frame_count"] == 4999
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(url + "/lain")
+    finally:
+        exporter.close()
+    with open(path) as f:
+        assert json.load(f)["samples"] == 4999
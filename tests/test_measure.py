@@ -0,0 +1,49 @@
+import numpy as np
+from fir_model import FirHpfModel
+from measure import SAMPLE_RATE, Measurements
+
+
+def feed_blocks(meas, data, block=SAMPLE_RATE // 20):
+    for i in range(0, data.shape[1], block):
+        meas.feed(data[:, i:i + block])
+
+
+def test_window_stats_and_frequency():
+    # Sinus + noise melewati model FIR_HPF, diukur per blok 50 ms
+    rng = np.random.default_rng(0)
+    f0 = 1234.5
+    t = np.arange(SAMPLE_RATE * 2)
+    ch0 = np.clip(np.rint(2048 + 1200 * np.sin(2 * np.pi * f0 * t / SAMPLE_RATE) + rng.normal(0, 4, len(t))),
+                  0, 4095).astype(np.int64)
+    data = np.vstack((ch0, FirHpfModel().process(ch0)))
+    meas = Measurements(2)
+    feed_blocks(meas, data)
+
+    stats = meas.stats()
+    tail = data[:, -stats['n']:]
+    assert np.allclose(stats['mean'], tail.mean(axis=1))
+    assert np.array_equal(stats['vpp'], np.ptp(tail, axis=1))
+    assert np.allclose(stats['ac_rms'], tail.std(axis=1))
+    assert abs(meas.frequency(0)[0] - f0) < 0.5
+    assert "freq" in meas.summary(1)
+
+
+def test_phase_of_delayed_channel():
+    t = np.arange(SAMPLE_RATE)
+    f0, lag = 500.0, 5
+    ch0 = np.rint(2048 + 1000 * np.sin(2 * np.pi * f0 * t / SAMPLE_RATE)).astype(np.int64)
+    ch1 = np.rint(2048 + 500 * np.sin(2 * np.pi * f0 * (t - lag) / SAMPLE_RATE)).astype(np.int64)
+    meas = Measurements(2)
+    feed_blocks(meas, np.vstack((ch0, ch1)))
+
+    delay, phase, gain = meas.phase(0, 1)
+    assert abs(delay * SAMPLE_RATE - lag) < 0.1
+    assert abs(phase - 360 * f0 * lag / SAMPLE_RATE) < 1
+    assert abs(gain - 0.5) < 0.01
+
+
+def test_no_crossings_on_flat_input():
+    meas = Measurements(1)
+    meas.feed(np.full(1000, 2048))
+    assert meas.frequency(0) == (None, None)
+    assert meas.summary(0).endswith("freq -")
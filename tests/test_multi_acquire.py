@@ -0,0 +1,14 @@
+import pytest
+from multi_acquire import ALIGN_ERROR, SAMPLE_RATE, alignment_test
+
+
+@pytest.mark.parametrize("count, frame_format", [(3, 'framing'), (2, 'packed')])
+def test_boards_aligned_on_shared_timebase(count, frame_format):
+    stagger = 0.2
+    errors, lags = alignment_test(count, stagger=stagger, seconds=1.5, frame_format=frame_format)
+    assert len(errors) == count
+    # Latency pty + BLOCK_INTERVAL emulator: error harus jauh di bawah satu periode blok
+    assert max(abs(e) for e in errors) < ALIGN_ERROR * SAMPLE_RATE
+    # Semua board membawa noise yang sama: lag dari isi data = selisih waktu mulai
+    assert None not in lags
+    assert all(abs(lag - i * stagger * SAMPLE_RATE) < ALIGN_ERROR * SAMPLE_RATE for i, lag in enumerate(lags))
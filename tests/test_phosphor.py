@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from phosphor import PhosphorDisplay, phosphor_lut
+
+WIDTH, HEIGHT = 100, 64
+
+
+def row_of(value):
+    return (HEIGHT - 1) - int(value * HEIGHT / 4096)
+
+
+def test_flat_segment_hits_one_pixel_per_column():
+    display = PhosphorDisplay(WIDTH, HEIGHT, (100, 255, 100))
+    display.add(np.full(250, 1000))
+    display.add(np.full((2, 40), 1000))
+    assert display.segments == 3
+    # Setiap kolom mendapat tepat satu hit per segmen di baris nilai itu
+    expected = np.zeros((HEIGHT, WIDTH))
+    expected[row_of(1000)] = 3
+    assert np.array_equal(display.hist, expected)
+
+
+def test_step_marks_vertical_edge_and_ramp_covers_every_column():
+    display = PhosphorDisplay(WIDTH, HEIGHT, (100, 255, 100))
+    step = np.where(np.arange(2 * WIDTH) < WIDTH, 500, 3500)
+    display.add(step)
+    hits = display.hist
+    # Kolom tepi berisi garis dari nilai rendah sampai tinggi, kolom lain satu pixel
+    edge = np.flatnonzero((hits > 0).sum(axis=0) > 1)
+    assert len(edge) == 1
+    assert np.array_equal(np.flatnonzero(hits[:, edge[0]]), np.arange(row_of(3500), row_of(500) + 1))
+    assert hits.sum(axis=0)[np.arange(WIDTH) != edge[0]].tolist() == [1] * (WIDTH - 1)
+
+    display.clear()
+    display.add(np.linspace(0, 4095, 2 * WIDTH)[None, :])
+    assert np.all(display.hist.sum(axis=0) >= 1)
+
+
+def test_decay_and_pixels_lut():
+    display = PhosphorDisplay(WIDTH, HEIGHT, (100, 255, 100), decay=0.5)
+    display.add(np.full(250, 2048))
+    display.decay()
+    display.decay()
+    assert np.allclose(display.hist[row_of(2048)], 0.25)
+    assert display.hist.sum() == pytest.approx(0.25 * WIDTH)
+
+    lut = phosphor_lut((100, 255, 100))
+    pixels = display.pixels()
+    # Layout (x, y) untuk surfarray; puncak histogram memakai warna LUT terakhir (putih)
+    assert pixels.shape == (WIDTH, HEIGHT, 3)
+    assert np.array_equal(pixels[:, row_of(2048)], np.broadcast_to(lut[-1], (WIDTH, 3)))
+    assert not pixels[:, 0].any()
+
+
+def test_render_with_dummy_video_driver(monkeypatch):
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+    pygame = pytest.importorskip("pygame")
+    pygame.display.init()
+    try:
+        screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        display = PhosphorDisplay(WIDTH, HEIGHT, (100, 255, 100))
+        display.add(np.full(250, 2048))
+        display.render(screen, (0, 0), additive=False)
+        assert screen.get_at((10, row_of(2048)))[:3] == tuple(display.lut[-1])
+        assert screen.get_at((10, 0))[:3] == (0, 0, 0)
+    finally:
+        pygame.display.quit()
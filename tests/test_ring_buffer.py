@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from ring_buffer import RingBuffer
+
+
+def stream(n, start=0):
+    # Dua channel dengan nilai = sequence (dan negatifnya) agar posisi mudah dicek
+    seq = np.arange(start, start + n)
+    return np.vstack((seq, -seq)).astype(np.int16)
+
+
+def test_block_larger_than_capacity_keeps_newest():
+    ring = RingBuffer(100, channels=2)
+    ring.append(stream(30))
+    ring.append(stream(250, 30))
+    assert ring.total == 280 and len(ring) == 100
+    window, start = ring.latest(100)
+    assert start == 180 and np.array_equal(window, stream(100, 180))
+
+
+def test_mirror_keeps_windows_contiguous_across_wrap():
+    ring = RingBuffer(64, channels=2)
+    total = 0
+    for n in (7, 50, 33, 64, 1, 63, 20):
+        ring.append(stream(n, total))
+        total += n
+        # Setiap window yang masih tersimpan berupa slice kontinu dengan isi yang benar
+        for start in range(max(0, total - 64), total):
+            for length in (1, total - start):
+                view = ring.window(start, length)
+                assert view.base is not None
+                assert np.array_equal(view, stream(length, start))
+
+
+def test_single_channel_and_empty_append():
+    ring = RingBuffer(10)
+    ring.append(np.arange(15, dtype=np.int16))
+    ring.append(np.empty(0, dtype=np.int16))
+    window, start = ring.latest(10)
+    assert ring.total == 15 and start == 5 and np.array_equal(window[0], np.arange(5, 15))
+
+
+def test_latest_and_window_bounds():
+    ring = RingBuffer(50, channels=2)
+    ring.append(stream(120))
+    window, start = ring.latest(20)
+    assert start == 100 and np.array_equal(window, stream(20, 100))
+    with pytest.raises(ValueError):
+        ring.latest(51)
+    with pytest.raises(ValueError):
+        ring.window(69, 10)         # Sudah tertimpa
+    with pytest.raises(ValueError):
+        ring.window(115, 10)        # Belum ditulis
+
+
+def test_since_reports_new_samples_and_lost():
+    ring = RingBuffer(50, channels=2)
+    ring.append(stream(30))
+    block, start, lost = ring.since(0)
+    assert (start, lost) == (0, 0) and np.array_equal(block, stream(30))
+    seq = start + block.shape[1]
+
+    block, start, lost = ring.since(seq)
+    assert block.shape == (2, 0) and (start, lost) == (30, 0)
+
+    # Reader tertinggal: sampel yang tertimpa dilewati dan dihitung di lost
+    ring.append(stream(80, 30))
+    block, start, lost = ring.since(seq)
+    assert (start, lost) == (60, 30) and np.array_equal(block, stream(50, 60))
+
+
+def test_lost_since_and_is_valid_after_overwrite():
+    ring = RingBuffer(50, channels=2)
+    ring.append(stream(40))
+    assert ring.lost_since(0) == 0 and ring.is_valid(0)
+    view = ring.window(10, 20)
+    ring.append(stream(25, 40))
+    # Sampel 0..14 tertimpa; window yang dimulai di 10 tidak lagi valid
+    assert ring.lost_since(0) == 15 and ring.lost_since(20) == 0
+    assert not ring.is_valid(10) and ring.is_valid(15)
+    assert not np.array_equal(view, stream(20, 10))
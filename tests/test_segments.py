@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from segments import SegmentMemory
+
+LENGTH, CHANNELS, COUNT = 50, 2, 16
+
+
+def fill(memory, n, seed=0):
+    rng = np.random.default_rng(seed)
+    added = []
+    for i in range(n):
+        seg = (2048 + 1500 * np.sin(np.arange(LENGTH) / 5 + rng.normal(0, 0.05))
+               + rng.normal(0, 20, (CHANNELS, LENGTH))).astype(np.int16)
+        memory.add(seg, 100 + i)
+        added.append(seg)
+    return added
+
+
+@pytest.mark.parametrize("n", [5, COUNT, COUNT + 7, 3 * COUNT + 1])
+def test_average_envelope_history_match_direct(n):
+    memory = SegmentMemory(COUNT, LENGTH, CHANNELS)
+    added = fill(memory, n)
+    # Setelah wraparound hanya COUNT segmen terakhir yang dihitung
+    recent = np.array(added[-COUNT:])
+    assert len(memory) == min(n, COUNT) and memory.total == n
+    assert np.allclose(memory.average(), recent.mean(axis=0))
+    lo, hi = memory.envelope()
+    assert np.array_equal(lo, recent.min(axis=0)) and np.array_equal(hi, recent.max(axis=0))
+    for back in range(len(memory)):
+        data, sequence = memory.segment(back)
+        assert np.array_equal(data, added[-1 - back]) and sequence == 100 + n - 1 - back
+    with pytest.raises(IndexError):
+        memory.segment(len(memory))
+
+
+def test_clear_resets_average():
+    memory = SegmentMemory(COUNT, LENGTH, CHANNELS)
+    fill(memory, COUNT + 3)
+    memory.clear()
+    assert len(memory) == 0
+    added = fill(memory, 2, seed=1)
+    assert np.allclose(memory.average(), np.mean(added, axis=0))
+
+
+def test_persistence_decay_weights():
+    decay = 0.5
+    memory = SegmentMemory(4, LENGTH, 1, bins=16, decay=decay)
+    # Segmen konstan: level ke-k jatuh di bin k (4096 / 16 = 256 LSB per bin)
+    for level in range(6):
+        memory.add(np.full((1, LENGTH), level * 256 + 10, dtype=np.int16))
+    hist = memory.persistence()
+    assert hist.shape == (1, 16, LENGTH)
+    # Setelah wraparound tersisa level 2..5; terbaru berbobot 1, lalu decay^umur
+    expected = np.zeros(16)
+    expected[[5, 4, 3, 2]] = decay ** np.arange(4)
+    assert np.allclose(hist[0], expected[:, None])
+
+
+def test_persistence_infinite_and_empty():
+    memory = SegmentMemory(4, LENGTH, 1, bins=16, decay=1.0)
+    assert not memory.persistence().any()
+    for _ in range(3):
+        memory.add(np.full((1, LENGTH), 4095, dtype=np.int16))
+    memory.add(np.zeros((1, LENGTH), dtype=np.int16))
+    hist = memory.persistence()
+    # Tanpa decay bobot = jumlah hit, dinormalisasi ke puncak
+    assert np.allclose(hist[0, 15], 1.0) and np.allclose(hist[0, 0], 1 / 3)
@@ -0,0 +1,96 @@
+import os
+import threading
+import time
+import numpy as np
+from capture import CaptureWriter
+from frame_decoder import PACKED_SETS, encode_packed
+from shm_ring import SharedRingBuffer, start_acquisition_process
+
+
+def test_attach_sees_producer_samples():
+    ring = SharedRingBuffer(100, channels=2, name=f"test_ring_{os.getpid()}")
+    try:
+        consumer = SharedRingBuffer.attach(ring.name)
+        ring.append(np.arange(300, dtype=np.int16).reshape(2, 150))
+        block, start, lost = consumer.since(0)
+        assert (start, lost) == (50, 50)
+        assert np.array_equal(block[0], np.arange(50, 150))
+        consumer.close()
+    finally:
+        ring.close()
+
+
+def test_wait_wakes_on_append_without_polling():
+    ring = SharedRingBuffer(100, channels=1, name=f"test_wait_{os.getpid()}")
+    consumer = SharedRingBuffer.attach(ring.name)
+    try:
+        assert not consumer.wait(0, timeout=0.05)
+        timer = threading.Timer(0.2, ring.append, args=(np.ones(10, dtype=np.int16),))
+        timer.start()
+        t0 = time.monotonic()
+        assert consumer.wait(0, timeout=5.0)
+        assert time.monotonic() - t0 < 1.0
+        timer.join()
+        # Data sudah ada: tidak menunggu, notifikasi lama tidak membangunkan wait berikutnya
+        assert consumer.wait(0, timeout=5.0)
+        assert not consumer.wait(consumer.total, timeout=0.05)
+    finally:
+        consumer.close()
+        ring.close()
+
+
+def test_acquisition_process_passes_format_to_child(tmp_path):
+    n = 256 * PACKED_SETS * 4
+    data0 = np.arange(n) % 4096
+    path = str(tmp_path / "packed.cap")
+    writer = CaptureWriter(path, rate=200000)
+    writer.write(encode_packed(np.vstack([data0, 4095 - data0])))
+    writer.close()
+
+    process, name = start_acquisition_process(None, 2000000, 1000, name=f"test_acq_{os.getpid()}",
+                                              replay=path, frame_format='packed')
+    try:
+        assert process.args[-2:] == ["--format", "packed"]
+        ring = SharedRingBuffer.attach(name)
+        assert ring.wait(999, timeout=5.0)
+        window, _ = ring.latest(1000)
+        assert np.array_equal(window[1], 4095 - window[0])
+        ring.close()
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def test_concurrent_waiters_each_get_notified():
+    ring = SharedRingBuffer(100, channels=1, name=f"test_waiters_{os.getpid()}")
+    consumers = [SharedRingBuffer.attach(ring.name) for _ in range(3)]
+    woke = {}
+
+    def waiter(i, consumer):
+        t0 = time.monotonic()
+        assert consumer.wait(0, timeout=5.0)
+        woke[i] = time.monotonic() - t0
+
+    try:
+        threads = [threading.Thread(target=waiter, args=item) for item in enumerate(consumers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.2)
+        ring.append(np.ones(10, dtype=np.int16))
+        for thread in threads:
+            thread.join()
+        assert sorted(woke) == [0, 1, 2] and max(woke.values()) < 1.0
+        # Setiap consumer punya slot sendiri; close satu consumer tidak melepas slot consumer lain
+        slots = [c._slot for c in consumers]
+        assert len(set(slots)) == 3
+        consumers[0].close()
+        assert ring._header[slots[0]] == 0 and all(ring._header[s] != 0 for s in slots[1:])
+        timer = threading.Timer(0.2, ring.append, args=(np.ones(10, dtype=np.int16),))
+        timer.start()
+        t0 = time.monotonic()
+        assert consumers[1].wait(10, timeout=5.0) and time.monotonic() - t0 < 1.0
+        timer.join()
+    finally:
+        for consumer in consumers[1:]:
+            consumer.close()
+        ring.close()
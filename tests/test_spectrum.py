@@ -0,0 +1,34 @@
+import numpy as np
+from fir_model import FirHpfModel, frequency_response
+from spectrum import SAMPLE_RATE, SpectrumAnalyzer
+
+
+def test_transfer_matches_fir_hpf_theory():
+    # White noise melewati model bit-exact FIR_HPF (tanpa delay tambahan, fase ikut dibandingkan)
+    rng = np.random.default_rng(0)
+    ch0 = np.clip(2048 + rng.normal(0, 300, SAMPLE_RATE * 10), 0, 4095).astype(np.int64)
+    ch1 = FirHpfModel().process(ch0)
+
+    analyzer = SpectrumAnalyzer(averages=1 << 20)
+    block = SAMPLE_RATE // 20
+    for i in range(0, len(ch0), block):
+        analyzer.feed(np.vstack((ch0[i:i + block], ch1[i:i + block])))
+
+    freqs, h, coherence = analyzer.transfer()
+    theory = frequency_response(freqs, SAMPLE_RATE)
+    band = (freqs > 1500) & (freqs < 9500)
+    assert np.abs(20 * np.log10(np.abs(h[band]) / np.abs(theory[band]))).max() < 0.5
+    assert np.abs(np.angle(h[band] / theory[band], deg=True)).max() < 5
+    assert coherence[band].min() > 0.9
+
+
+def test_psd_peak_and_partial_segments():
+    analyzer = SpectrumAnalyzer(channels=1, nfft=1024)
+    t = np.arange(SAMPLE_RATE)
+    tone = 2048 + 1000 * np.sin(2 * np.pi * 2500 * t / SAMPLE_RATE)
+    # Blok lebih kecil dari satu segmen disimpan sampai segmen lengkap
+    assert analyzer.feed(tone[:1000]) == 0 and analyzer.segments == 0
+    analyzer.feed(tone[1000:])
+    assert analyzer.segments == (len(tone) - 1024) // analyzer.hop + 1
+    freqs, pxx = analyzer.psd()
+    assert abs(freqs[np.argmax(pxx[0, 1:]) + 1] - 2500) <= freqs[1]
@@ -0,0 +1,76 @@
+import logging
+import time
+import numpy as np
+import pytest
+from stream_server import KIND_STREAM, ClientView, StreamClient, StreamServer, loopback_test
+
+
+def test_loopback_full_rate_and_slow_client():
+    results, slow_dropped, gaps = loopback_test()
+    assert results["full"][0] > 0.9 * 20000
+    # Client yang mengikuti laju sumber menerima blok kontinu yang bersambung
+    assert gaps["full"] == []
+    assert results["trigger/4"][1] > 0
+    # Client yang tidak membaca hanya kehilangan pesannya sendiri
+    assert slow_dropped > 0
+
+
+def test_publish_roundtrip():
+    server = StreamServer(port=0).start()
+    client = StreamClient(port=server.port)
+    try:
+        while not server.clients:
+            time.sleep(0.01)
+        block = np.arange(200, dtype=np.int16).reshape(2, 100)
+        server.publish(block, 1000)
+        kind, decimation, start, dropped, data = client.receive()
+        assert (kind, decimation, start, dropped) == (KIND_STREAM, 1, 1000, 0)
+        assert np.array_equal(data, block)
+    finally:
+        client.close()
+        server.close()
+
+
+def test_close_with_connected_clients_is_clean(caplog):
+    server = StreamServer(port=0).start()
+    clients = [StreamClient(port=server.port) for _ in range(3)]
+    while len(server.clients) < 3:
+        time.sleep(0.01)
+    with caplog.at_level(logging.ERROR, logger="asyncio"):
+        server.close()
+    for client in clients:
+        client.close()
+    assert not caplog.records
+
+
+def test_invalid_config_keeps_previous_view():
+    view = ClientView({"decimate": 4, "mode": "minmax", "trigger": {"level": 1000, "length": 50}})
+    before = dict(vars(view))
+    for config in ([1], 5, "pick", None, {"mode": "median"}, {"decimate": "x"},
+                   {"decimate": 2, "trigger": {"slope": "up"}}, {"trigger": [1]},
+                   {"trigger": {"length": "panjang"}}):
+        with pytest.raises((ValueError, TypeError)):
+            view.configure(config)
+        # Tidak ada setting yang setengah diterapkan
+        assert vars(view) == before
+    view.configure({"decimate": 2})
+    assert (view.decimate, view.mode, view.trigger) == (2, "pick", None)
+
+
+def test_invalid_config_does_not_drop_client():
+    server = StreamServer(port=0).start()
+    client = StreamClient(port=server.port)
+    try:
+        for text in (b"[1]", b"5", b'{"mode": "median"}', b"bukan json", b'{"decimate": 1e999}'):
+            client.sock.sendall(text + b"\n")
+        client.configure({"decimate": 10})
+        # Handler client tetap hidup dan konfigurasi valid terakhir diterapkan
+        deadline = time.monotonic() + 2.0
+        while time.monotonic() < deadline and not any(c.view.decimate == 10 for c in list(server.clients)):
+            time.sleep(0.01)
+        server.publish(np.arange(200, dtype=np.int16).reshape(2, 100), 0)
+        kind, decimation, start, dropped, data = client.receive()
+        assert (kind, decimation, start) == (KIND_STREAM, 10, 0) and data.shape == (2, 10)
+    finally:
+        client.close()
+        server.close()
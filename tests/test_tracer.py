@@ -0,0 +1,37 @@
+import json
+import threading
+import time
+from tracer import Tracer
+
+
+def test_wrap_records_spans_in_fixed_ring():
+    tracer = Tracer(1000)
+    assert tracer.capacity == 1024
+    size = tracer._events.nbytes
+    traced = tracer.wrap(lambda x: x + 1, "work")
+    assert [traced(i) for i in range(3000)][-1] == 3000
+    events = tracer.events()
+    # Ring berukuran tetap: hanya span terbaru yang tersimpan, memori tidak bertambah
+    assert len(events) == tracer.capacity
+    assert tracer._events.nbytes == size
+    assert (events[:, 0] == tracer.stage("work")).all()
+    assert (events[:, 2] >= events[:, 1]).all() and (events[1:, 1] >= events[:-1, 1]).all()
+    assert tracer.summary(events)["work"]["count"] == tracer.capacity
+
+
+def test_span_threads_and_chrome_trace(tmp_path):
+    tracer = Tracer(256)
+    with tracer.span("blok"):
+        time.sleep(0.002)
+    worker = threading.Thread(target=tracer.wrap(time.sleep, "sleep"), args=(0.001,))
+    worker.start()
+    worker.join()
+
+    summary = tracer.summary()
+    assert summary["blok"]["p50_us"] >= 2000 and summary["sleep"]["count"] == 1
+    path = tmp_path / "trace.json"
+    tracer.finish(str(path))
+    trace = json.loads(path.read_text())["traceEvents"]
+    spans = [e for e in trace if e["ph"] == "X"]
+    assert [e["name"] for e in spans] == ["blok", "sleep"]
+    assert spans[0]["tid"] != spans[1]["tid"]
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from trigger import Trigger, find_edges, find_trigger_point_legacy
+
+
+def noisy_cosine(samples, periods=2.5, noise=8.0, seed=0):
+    rng = np.random.default_rng(seed)
+    n = samples * 3
+    t = np.arange(n)
+    signal = 2048 - 1500 * np.cos(2 * np.pi * periods * t / samples) + rng.normal(0, noise, n)
+    return np.clip(signal, 0, 4095).astype(np.int16)
+
+
+@pytest.mark.parametrize("samples", [250, 1000, 10000])
+@pytest.mark.parametrize("slope", ['rising', 'falling'])
+def test_oldest_without_hysteresis_matches_legacy(samples, slope):
+    data = noisy_cosine(samples)
+    trigger = Trigger(level=2048, slope=slope, hysteresis=0, select='oldest')
+    assert trigger.locate(data, samples) == find_trigger_point_legacy(data.tolist(), 2048, slope, samples)
+
+
+def test_hysteresis_rejects_noise_edges():
+    data = noisy_cosine(1000, noise=30.0)
+    # 7.5 periode dalam buffer: tepat 7 atau 8 edge rising sebenarnya
+    assert len(find_edges(data, 2048, 'rising', 0)) > 8
+    assert len(find_edges(data, 2048, 'rising', 200)) in (7, 8)
+    assert len(find_edges(np.full(100, 1000), 2048)) == 0
+
+
+def test_newest_edge_holdoff_and_pre_trigger():
+    data = np.tile(np.r_[np.zeros(50), np.full(50, 4000)], 10)    # Edge rising di 50, 150, ...
+    trigger = Trigger(2048, pre_trigger=10, holdoff=250)
+    # Holdoff dari edge pertama: 50, 350, 650 valid, edge terbaru 650
+    assert trigger.locate(data, 100) == 650 - 10
+    assert trigger.last_trigger == 650
+    # Data yang sama bergeser 100 sampel: hanya edge >= 650 + 250 yang lolos
+    assert trigger.locate(data, 100, start_seq=100) == 850 - 10
+    assert trigger.last_trigger == 950
+    assert trigger.locate(data, 100) is None
+
+
+def test_locate_all_after_and_holdoff():
+    data = np.tile(np.r_[np.zeros(50), np.full(50, 4000)], 10)
+    trigger = Trigger(2048, holdoff=150)
+    assert trigger.locate_all(data, 100).tolist() == [50, 250, 450, 650, 850]
+    assert trigger.locate_all(data, 100, start_seq=1000, after=1450).tolist() == [650, 850]
+    assert trigger.last_trigger is None
@@ -0,0 +1,162 @@
+import numpy as np
+import time
+from collections import deque
+
+
+def find_edges(data, level, slope='rising', hysteresis=0):
+    """Cari semua indeks edge dalam data (vectorized)
+
+    Edge rising terjadi saat sinyal mencapai `level` setelah sebelumnya
+    berada di bawah `level - hysteresis` (falling: kebalikannya). Dengan
+    hysteresis = 0 hasilnya sama dengan find_trigger_point lama.
+    """
+    data = np.asarray(data)
+    if len(data) < 2:
+        return np.empty(0, dtype=np.intp)
+
+    if slope == 'rising':
+        armed = data < level - hysteresis
+        fired = data >= level
+    else:  # falling
+        armed = data > level + hysteresis
+        fired = data <= level
+
+    if hysteresis == 0:
+        # Setiap sampel pasti armed atau fired, cukup bandingkan dua sampel berurutan
+        return np.flatnonzero(armed[:-1] & fired[1:]) + 1
+
+    # Hanya sampel yang berada di luar band hysteresis yang mengubah state
+    # (-1 = armed, +1 = fired). Edge = fired pertama setelah armed.
+    changes = np.flatnonzero(armed | fired)
+    state = fired[changes]
+    return changes[1:][state[1:] & ~state[:-1]]
+
+
+class Trigger:
+    """Trigger engine: hysteresis, holdoff, posisi pre-trigger dan pilihan edge
+
+    `select='newest'` memilih edge valid terbaru (latency tampilan paling
+    kecil), `select='oldest'` meniru perilaku find_trigger_point lama.
+    Holdoff dihitung dalam sampel terhadap trigger terakhir menggunakan
+    sequence number dari RingBuffer.
+    """
+
+    def __init__(self, level=2048, slope='rising', hysteresis=0, holdoff=0,
+                 pre_trigger=0, select='newest'):
+        self.level = level
+        self.slope = slope
+        self.hysteresis = hysteresis
+        self.holdoff = holdoff
+        self.pre_trigger = pre_trigger
+        self.select = select
+        self.last_trigger = None    # Sequence number trigger terakhir
+
+    def locate(self, data, length, start_seq=0):
+        """Return indeks awal window sepanjang `length` dalam data, atau None
+
+        `start_seq` adalah sequence number dari data[0] (lihat RingBuffer.latest).
+        """
+        edges = find_edges(data, self.level, self.slope, self.hysteresis)
+
+        # Edge harus punya cukup sampel sebelum (pre-trigger) dan sesudahnya
+        lo = self.pre_trigger
+        hi = len(data) - length + self.pre_trigger
+        edges = edges[(edges >= lo) & (edges <= hi)]
+        if len(edges) == 0:
+            return None
+
+        edges_seq = edges + start_seq
+        if self.holdoff > 0:
+            edges_seq = self._apply_holdoff(edges_seq, self.last_trigger)
+            if len(edges_seq) == 0:
+                return None
+
+        trigger_seq = int(edges_seq[-1] if self.select == 'newest' else edges_seq[0])
+        self.last_trigger = trigger_seq
+        return trigger_seq - start_seq - self.pre_trigger
+
+    def locate_all(self, data, length, start_seq=0, after=None):
+        """Indeks awal window untuk semua edge valid dengan sequence > `after`
+
+        Untuk akumulasi setiap segmen ter-trigger (persistence). Tidak
+        mengubah `last_trigger`; holdoff dihitung terhadap `after`.
+        """
+        edges = find_edges(data, self.level, self.slope, self.hysteresis)
+        lo = self.pre_trigger
+        hi = len(data) - length + self.pre_trigger
+        edges_seq = edges[(edges >= lo) & (edges <= hi)] + start_seq
+        if after is not None:
+            edges_seq = edges_seq[edges_seq > after]
+        if self.holdoff > 0:
+            edges_seq = self._apply_holdoff(edges_seq, after)
+        return edges_seq - start_seq - self.pre_trigger
+
+    def _apply_holdoff(self, edges_seq, last):
+        """Buang edge yang datang kurang dari `holdoff` sampel setelah trigger sebelumnya"""
+        if last is not None:
+            edges_seq = edges_seq[edges_seq >= last + self.holdoff]
+        if len(edges_seq) > 1 and np.any(np.diff(edges_seq) < self.holdoff):
+            keep = []
+            next_free = edges_seq[0]
+            for e in edges_seq.tolist():
+                if e >= next_free:
+                    keep.append(e)
+                    next_free = e + self.holdoff
+            edges_seq = np.asarray(keep)
+        return edges_seq
+
+
+def find_trigger_point_legacy(data, level, slope, samples_to_show):
+    """Salinan find_trigger_point lama (loop Python) untuk perbandingan benchmark"""
+    if len(data) < 2:
+        return None
+
+    for i in range(1, len(data) - samples_to_show):
+        if slope == 'rising':
+            if data[i-1] < level and data[i] >= level:
+                return i
+        else:  # falling
+            if data[i-1] > level and data[i] <= level:
+                return i
+    return None
+
+
+def benchmark(samples_to_show=1000, periods=2.5, noise=8.0, repeat=200):
+    """Microbenchmark trigger baru vs find_trigger_point lama"""
+    rng = np.random.default_rng(0)
+    n = samples_to_show * 3
+    t = np.arange(n)
+    signal = 2048 - 1500 * np.cos(2 * np.pi * periods * t / samples_to_show) + rng.normal(0, noise, n)
+    data = np.clip(signal, 0, 4095).astype(np.int16)
+    data_list = data.tolist()
+    data_deque = deque(data_list, maxlen=n)
+
+    # Worst case: tidak ada edge sama sekali (loop lama menelusuri seluruh buffer)
+    flat = np.full(n, 1000, dtype=np.int16)
+    flat_list = flat.tolist()
+
+    cases = [
+        ("legacy (edge pertama)", lambda: find_trigger_point_legacy(data_list, 2048, 'rising', samples_to_show)),
+        ("legacy + list(deque)", lambda: find_trigger_point_legacy(list(data_deque), 2048, 'rising', samples_to_show)),
+        ("legacy, tanpa edge", lambda: find_trigger_point_legacy(flat_list, 2048, 'rising', samples_to_show)),
+        ("find_edges", lambda: find_edges(data, 2048, 'rising', 16)),
+        ("Trigger newest + hyst", lambda: Trigger(2048, hysteresis=16).locate(data, samples_to_show)),
+        ("Trigger tanpa edge", lambda: Trigger(2048, hysteresis=16).locate(flat, samples_to_show)),
+    ]
+
+    print(f"Buffer {n} sampel, SAMPLES_TO_SHOW = {samples_to_show}")
+    for name, fn in cases:
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        elapsed = (time.perf_counter() - t0) / repeat
+        print(f"  {name:<24} {elapsed * 1e6:9.1f} us")
+
+    # Dengan noise, trigger tanpa hysteresis menghasilkan banyak edge palsu
+    print(f"  Edge tanpa hysteresis: {len(find_edges(data, 2048, 'rising', 0))}, "
+          f"dengan hysteresis 32: {len(find_edges(data, 2048, 'rising', 32))}")
+
+
+if __name__ == "__main__":
+    for samples in (250, 1000, 10000):
+        benchmark(samples)